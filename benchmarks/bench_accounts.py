@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""!
+Benchmark many accounts with independent clients and with AccountManager.
+
+Every account reads a ticker, the order book and its wallet balances,
+concurrently, from a local MockCobinhoodServer. Reported are the requests
+and connections the server saw, wall time, and memory held per account.
+
+    python -m benchmarks.bench_accounts [--accounts N] [--latency SECONDS]
+"""
+
+from __future__ import print_function
+import argparse
+import gc
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import cobinhood
+from cobinhood.testing import MockCobinhoodServer, payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def workload(client):
+    client.get_ticker("BTC-USDT")
+    client.get_order_book("BTC-USDT")
+    client.get_wallet_balances()
+
+
+def independent(base_url, api_keys):
+    clients = [cobinhood.Cobinhood(api_key, base_url=base_url)
+               for api_key in api_keys]
+
+    def run(function):
+        with ThreadPoolExecutor(32) as executor:
+            return list(executor.map(function, clients))
+
+    def close():
+        for client in clients:
+            client.close()
+    return clients, run, close
+
+
+def managed(base_url, api_keys):
+    manager = cobinhood.AccountManager(base_url=base_url, max_workers=32,
+                                       pool_maxsize=32)
+    for api_key in api_keys:
+        manager.client(api_key)
+    return manager, lambda function: manager.fan_out(function), manager.close
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    api_keys = ["key{0}".format(index) for index in range(args.accounts)]
+    print("{0} accounts, {1:.0f} ms latency".format(args.accounts,
+                                                     args.latency * 1000))
+    for name, build in (("independent", independent),
+                        ("AccountManager", managed)):
+        with MockCobinhoodServer(payloads.api_routes(),
+                                 latency=args.latency) as server:
+            gc.collect()
+            tracemalloc.start()
+            held, run, close = build(server.url + "/{version}/{fn_call}?",
+                                     api_keys)
+            start = _timer()
+            run(workload)
+            elapsed = _timer() - start
+            gc.collect()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            close()
+            print("{0:<15} {1:>5} requests {2:>5} connections {3:>8.0f} ms "
+                  "{4:>7.1f} KiB/account".format(
+                      name, server.request_count, server.connection_count,
+                      elapsed * 1000, memory / 1024.0 / args.accounts))
+            del held
+
+
+if __name__ == "__main__":
+    main()
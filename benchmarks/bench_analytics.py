@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""!
+Benchmark VWAP, trade flow imbalance and 1 minute OHLC over recent trades
+of 10 to 1000 trading pairs.
+
+Compares a pure Python loop per pair, cobinhood.analytics in this process
+on raw responses and on TRADE_DTYPE arrays decoded beforehand, and
+cobinhood.analytics in a process pool. The process pool only pays off
+with several cpus; the cpu count is printed with the results.
+
+    python -m benchmarks.bench_analytics [--trades N] [--processes N]
+"""
+
+from __future__ import print_function
+import argparse
+import multiprocessing
+import time
+
+from cobinhood import analytics, columnar
+from cobinhood.testing import payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def python_metrics(trades, interval):
+    """!
+    Reference implementation over the raw trade dicts.
+    """
+    volume = notional = flow = 0.0
+    bars = {}
+    for trade in reversed(trades["result"]["trades"]):
+        price, size = float(trade["price"]), float(trade["size"])
+        volume += size
+        notional += price * size
+        flow += size if trade["maker_side"] == "ask" else -size
+        start = trade["timestamp"] // interval * interval
+        bar = bars.get(start)
+        if bar is None:
+            bars[start] = [price, price, price, price, size]
+        else:
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3] = price
+            bar[4] += size
+    return {"vwap": notional / volume, "imbalance": flow / volume,
+            "volume": volume, "ohlc": sorted(bars.items())}
+
+
+def best(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = _timer()
+        function()
+        times.append(_timer() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trades", type=int, default=200)
+    parser.add_argument("--processes", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    interval = analytics.DEFAULT_INTERVAL
+
+    print("{0} trades per pair, {1} cpus, pool of {2} processes".format(
+        args.trades, multiprocessing.cpu_count(), max(args.processes, 2)))
+    print("{0:>6} {1:>12} {2:>12} {3:>12} {4:>12}".format(
+        "pairs", "python ms", "numpy ms", "arrays ms", "pool ms"))
+    for pairs in (10, 100, 1000):
+        batches = dict(("P{0}".format(index),
+                        payloads.trades(args.trades, seed=index))
+                       for index in range(pairs))
+        python = best(lambda: dict(
+            (pair, python_metrics(trades, interval))
+            for pair, trades in batches.items()), args.repeat)
+        serial = best(lambda: analytics.analyze(batches, processes=0),
+                      args.repeat)
+        arrays = dict((pair, columnar.trades_to_array(trades))
+                      for pair, trades in batches.items())
+        decoded = best(lambda: analytics.analyze(arrays, processes=0),
+                       args.repeat)
+        pooled = best(lambda: analytics.analyze(
+            batches, processes=max(args.processes, 2)), args.repeat)
+        print("{0:>6} {1:>12.1f} {2:>12.1f} {3:>12.1f} {4:>12.1f}".format(
+            pairs, python * 1000, serial * 1000, decoded * 1000,
+            pooled * 1000))
+
+
+if __name__ == "__main__":
+    main()
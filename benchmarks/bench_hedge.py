@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""!
+Benchmark tail latency with and without hedged requests.
+
+Calls go to an in-process perform whose latency is usually short but
+occasionally long, the shape that hedging is meant to cut.
+
+    python -m benchmarks.bench_hedge [--calls N] [--hedge-after SECONDS]
+"""
+
+from __future__ import print_function
+import argparse
+import random
+import time
+
+import cobinhood
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def make_perform(fast, slow, slow_fraction, seed=0):
+    """!
+    @return: perform sleeping slow seconds for slow_fraction of the calls
+        and fast seconds otherwise.
+    """
+    rng = random.Random(seed)
+
+    def perform(request_url, auth_token, request_type):
+        time.sleep(slow if rng.random() < slow_fraction else fast)
+        return {"success": True, "result": {}}
+    return perform
+
+
+def latencies(cob, calls):
+    samples = []
+    for _ in range(calls):
+        start = _timer()
+        cob.get_ticker("BTC-USDT")
+        samples.append(_timer() - start)
+    return sorted(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--hedge-after", type=float, default=0.01)
+    args = parser.parse_args()
+
+    for name, policy in (
+            ("no hedging", None),
+            ("hedge_after={0}".format(args.hedge_after),
+             cobinhood.RetryPolicy(hedge_after=args.hedge_after))):
+        perform = make_perform(0.002, 0.1, 0.05)
+        if policy is not None:
+            perform = cobinhood.RetryingTransport(perform, policy)
+        with cobinhood.Cobinhood(perform=perform) as cob:
+            samples = latencies(cob, args.calls)
+        print("{0:<20} p50 {1:>7.2f} ms  p99 {2:>7.2f} ms".format(
+            name, samples[len(samples) // 2] * 1000,
+            samples[int(len(samples) * 0.99) - 1] * 1000))
+
+
+if __name__ == "__main__":
+    main()
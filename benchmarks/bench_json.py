@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""!
+Benchmark response decoding on recorded-size payloads.
+
+Compares the stdlib path used by requests.Response.json() (decode to text,
+then parse) with the decoders HTTPTransport can use, and with raw bytes.
+
+    python -m benchmarks.bench_json [--repeat N]
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import timeit
+
+import requests
+
+from cobinhood import transport
+from cobinhood.testing import payloads
+
+PAYLOADS = [
+    ("order_book_1000", payloads.order_book(1000)),
+    ("trades_1000", payloads.trades(1000)),
+    ("candles_5000", payloads.candles(5000)),
+    ("ledger_1000", payloads.ledger(1000)),
+]
+
+
+def response_json(body):
+    """!
+    Decode the way request_api_call does, through requests.Response.json().
+    """
+    response = requests.models.Response()
+    response._content = body
+    response.headers["Content-Type"] = "application/json"
+    return response.json()
+
+
+def decoders():
+    """!
+    @return: list of (name, decoder) available in this environment.
+    """
+    found = [("Response.json()", response_json),
+             ("text + json.loads", lambda body: json.loads(body.decode("utf-8"))),
+             ("json.loads(bytes)", json.loads)]
+    for module in ("orjson", "ujson"):
+        try:
+            found.append((module + ".loads", __import__(module).loads))
+        except ImportError:
+            pass
+    found.append(("raw_bytes", transport.raw_bytes))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print("default decoder: {0}.{1}".format(transport.json_loads.__module__,
+                                            transport.json_loads.__name__))
+    for name, payload in PAYLOADS:
+        body = json.dumps(payload).encode("utf-8")
+        print("{0} ({1} bytes)".format(name, len(body)))
+        for decoder_name, decoder in decoders():
+            seconds = min(timeit.repeat(lambda: decoder(body), number=args.repeat,
+                                        repeat=3)) / args.repeat
+            print("  {0:<22} {1:>9.3f} ms".format(decoder_name, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
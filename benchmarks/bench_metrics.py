@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""!
+Benchmark the per-call overhead of metrics.
+
+Calls go through an in-process perform returning a fixed response, so the
+numbers are the client's own cost with metrics disabled and enabled.
+
+    python -m benchmarks.bench_metrics [--calls N]
+"""
+
+from __future__ import print_function
+import argparse
+import timeit
+
+import cobinhood
+
+RESPONSE = {"success": True, "result": {"ticker": {}}}
+
+
+def perform(request_url, auth_token, request_type):
+    return RESPONSE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, metrics in (("metrics=None", None), ("metrics=True", True)):
+        cob = cobinhood.Cobinhood(perform=perform, metrics=metrics)
+        seconds = min(timeit.repeat(lambda: cob.get_ticker("BTC-USDT"),
+                                    number=args.calls, repeat=3))
+        print("{0:<14} {1:>8.3f} us/call".format(
+            name, seconds / args.calls * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""!
+Compare memory per record and numeric parse cost of dicts and typed records.
+
+    python -m benchmarks.bench_models [--records N]
+"""
+
+from __future__ import print_function
+import argparse
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+from cobinhood import models
+
+
+def make_trades(count):
+    """!
+    @return: list of trade dicts shaped like get_recent_trades results.
+    """
+    return [{"id": "{0:032x}".format(index),
+             "trading_pair_id": "BTC-USDT",
+             "price": "{0}.{1:08d}".format(10000 + index % 500, index),
+             "size": "0.{0:08d}".format(index % 99999999),
+             "maker_side": "bid" if index % 2 else "ask",
+             "timestamp": 1504459806124 + index}
+            for index in range(count)]
+
+
+def bytes_per_record(build, count):
+    """!
+    @return: bytes allocated per record by build().
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return float(after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+    count = args.records
+
+    source = make_trades(count)
+    # Both representations share the payload strings, so this compares the
+    # container each one adds on top of them.
+    dict_bytes = bytes_per_record(
+        lambda: [dict(trade) for trade in source], count)
+    model_bytes = bytes_per_record(
+        lambda: [models.Trade.from_dict(trade) for trade in source], count)
+    print("{0:<28} {1:>10.1f} bytes/record".format("dict", dict_bytes))
+    print("{0:<28} {1:>10.1f} bytes/record".format("Trade record", model_bytes))
+
+    trades = source[:10000]
+    typed = [models.Trade.from_dict(trade) for trade in trades]
+
+    def dict_notional():
+        return sum(Decimal(t["price"]) * Decimal(t["size"]) for t in trades)
+
+    def model_notional():
+        return sum(t.price * t.size for t in typed)
+
+    # The first Trade pass parses and caches; later passes reuse the Decimals.
+    for name, fn in (("dict + Decimal() per pass", dict_notional),
+                     ("Trade lazy Decimal", model_notional)):
+        seconds = min(timeit.repeat(fn, number=5, repeat=3)) / 5
+        print("{0:<28} {1:>10.2f} ms per 10k notional pass".format(name, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""!
+Benchmark re-quoting a ladder of orders serially and with the bulk calls.
+
+A re-quote cancels every order of the ladder and places its replacement.
+Orders go over HTTPTransport to a local MockCobinhoodServer answering after
+a fixed latency, like the exchange's order endpoints.
+
+    python -m benchmarks.bench_orders [--orders N] [--latency SECONDS]
+"""
+
+from __future__ import print_function
+import argparse
+import time
+
+import cobinhood
+from cobinhood.testing import MockCobinhoodServer, payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def ladder(levels, mid=10000.0, step=5.0):
+    """!
+    @return: place_orders payloads for levels bids and asks around mid.
+    """
+    orders = []
+    for level in range(1, levels // 2 + 1):
+        for side, sign in (("bid", -1), ("ask", 1)):
+            orders.append({"trading_pair_id": "BTC-USDT", "side": side,
+                           "type": "limit", "price": mid + sign * level * step,
+                           "size": "0.01"})
+    return orders
+
+
+def serial(cob, order_ids, orders):
+    for order_id in order_ids:
+        cob.cancel_order(order_id)
+    for order in orders:
+        cob.place_order(order["trading_pair_id"], order["side"],
+                        order["type"], order["price"], order["size"])
+
+
+def bulk(cob, order_ids, orders, concurrency):
+    cob.cancel_orders(order_ids, concurrency)
+    cob.place_orders(orders, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    orders = ladder(args.orders)
+    order_ids = ["{0:032x}".format(index) for index in range(len(orders))]
+    with MockCobinhoodServer(payloads.api_routes(),
+                             latency=args.latency) as server:
+        base_url = server.url + "/{version}/{fn_call}?"
+        timings = {}
+        for name, requote in (
+                ("serial", lambda cob: serial(cob, order_ids, orders)),
+                ("bulk", lambda cob: bulk(cob, order_ids, orders,
+                                          args.concurrency))):
+            with cobinhood.Cobinhood(api_key="key", base_url=base_url,
+                                     max_workers=args.concurrency) as cob:
+                requote(cob)
+                start = _timer()
+                for _ in range(args.rounds):
+                    requote(cob)
+                timings[name] = (_timer() - start) / args.rounds
+
+    print("{0} order ladder re-quote at {1:.0f} ms latency".format(
+        len(orders), args.latency * 1000))
+    for name in ("serial", "bulk"):
+        print("{0:<8} {1:>9.1f} ms".format(name, timings[name] * 1000))
+    print("speedup  {0:>9.1f}x".format(timings["serial"] / timings["bulk"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""!
+Benchmark request volume and fill detection latency of order polling.
+
+Runs on a simulated clock against a simulated account: every re-quote
+places a batch of orders, most fills happen within seconds of placing and
+a few much later. Fixed interval polling that fetches the trades of every
+open order is compared with OrderTracker.
+
+    python -m benchmarks.bench_ordertracker [--hours H] [--interval SECONDS]
+"""
+
+from __future__ import print_function
+import argparse
+import heapq
+import random
+
+import cobinhood
+from cobinhood.testing import success
+
+
+class SimulatedAccount(object):
+    """!
+    Open orders filling at scheduled times on a simulated clock.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.orders = {}
+        self.fills = []
+        self.filled_at = {}
+        self.requests = 0
+        self._ids = 0
+
+    def add(self, fill_in):
+        self._ids += 1
+        order_id = str(self._ids)
+        self.orders[order_id] = {"id": order_id, "state": "open",
+                                 "filled": "0", "size": "1"}
+        if fill_in is not None:
+            heapq.heappush(self.fills, (self.clock[0] + fill_in, order_id))
+
+    def advance(self, now):
+        self.clock[0] = now
+        while self.fills and self.fills[0][0] <= now:
+            at, order_id = heapq.heappop(self.fills)
+            self.orders[order_id].update(state="filled", filled="1")
+            self.filled_at[order_id] = at
+
+    def cancel_open(self):
+        for order in self.orders.values():
+            if order["state"] == "open":
+                order["state"] = "cancelled"
+        self.fills = []
+
+    def open_orders(self):
+        return [dict(order) for order in self.orders.values()
+                if order["state"] == "open"]
+
+    def iter_all_orders(self, limit, prefetch):
+        self.requests += 1
+        return iter(self.open_orders())
+
+    def get_order(self, order_id):
+        self.requests += 1
+        return success({"order": dict(self.orders[order_id])})
+
+    def get_trades_order(self, order_id):
+        self.requests += 1
+        return success({"trades": []})
+
+
+def schedule(hours, requote_every, orders, seed=7):
+    """!
+    @return: list of (time, fill delays) re-quotes; a delay of None never
+        fills.
+    """
+    rng = random.Random(seed)
+    quotes = []
+    now = 0.0
+    while now < hours * 3600:
+        delays = []
+        for _ in range(orders):
+            roll = rng.random()
+            delays.append(rng.uniform(0, 3) if roll < 0.3 else
+                          rng.uniform(3, requote_every) if roll < 0.4 else None)
+        quotes.append((now, delays))
+        now += requote_every
+    return quotes
+
+
+def run_fixed(quotes, interval, end):
+    """!
+    Poll get_all_orders and get_trades_order of every open order at a
+    fixed interval, diffing the lists.
+    """
+    clock = [0.0]
+    account = SimulatedAccount(clock)
+    detected = {}
+    known = {}
+    now, index = 0.0, 0
+    while now < end:
+        while index < len(quotes) and quotes[index][0] <= now:
+            account.advance(quotes[index][0])
+            account.cancel_open()
+            for delay in quotes[index][1]:
+                account.add(delay)
+            index += 1
+        account.advance(now)
+        current = dict((order["id"], order)
+                       for order in account.iter_all_orders(50, False))
+        for order_id in current:
+            account.get_trades_order(order_id)
+        for order_id in known:
+            if order_id not in current:
+                account.get_order(order_id)
+                if order_id in account.filled_at:
+                    detected[order_id] = now
+        known = current
+        now += interval
+    return account, detected
+
+
+def run_tracker(quotes, end, min_interval, max_interval):
+    clock = [0.0]
+    account = SimulatedAccount(clock)
+    tracker = cobinhood.OrderTracker(account, min_interval=min_interval,
+                                     max_interval=max_interval,
+                                     timer=lambda: clock[0])
+    detected = {}
+    tracker.subscribe(lambda event: detected.setdefault(
+        event.order_id, clock[0]) if event.kind == "filled" else None)
+    now, index = 0.0, 0
+    while now < end:
+        while index < len(quotes) and quotes[index][0] <= now:
+            account.advance(quotes[index][0])
+            account.cancel_open()
+            for delay in quotes[index][1]:
+                account.add(delay)
+            tracker.touch()
+            index += 1
+        account.advance(now)
+        tracker.poll()
+        now += tracker.next_poll()
+        if index < len(quotes):
+            now = min(now, quotes[index][0])
+    return account, detected
+
+
+def report(name, hours, account, detected):
+    delays = sorted(detected[order_id] - account.filled_at[order_id]
+                    for order_id in detected)
+    print("{0:<22} {1:>8.0f} req/h  fill latency p50 {2:>5.2f} s  "
+          "p99 {3:>5.2f} s".format(
+              name, account.requests / hours, delays[len(delays) // 2],
+              delays[int(len(delays) * 0.99) - 1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--requote", type=float, default=60)
+    parser.add_argument("--orders", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    quotes = schedule(args.hours, args.requote, args.orders)
+    end = args.hours * 3600
+    for interval in (args.interval, args.interval * 5):
+        report("fixed {0:g} s".format(interval), args.hours,
+               *run_fixed(quotes, interval, end))
+    report("OrderTracker", args.hours,
+           *run_tracker(quotes, end, args.interval / 4, args.interval * 5))
+
+
+if __name__ == "__main__":
+    main()
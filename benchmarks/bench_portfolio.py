@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""!
+Benchmark revaluing a portfolio in USD and BTC after each price update.
+
+The baseline walks every balance against the prices on each update, with
+conversion paths computed once; Portfolio revalues only the positions whose
+path uses the updated trading pair.
+
+    python -m benchmarks.bench_portfolio [--pairs N] [--balances N]
+"""
+
+from __future__ import print_function
+import argparse
+import random
+import time
+
+import cobinhood
+from cobinhood.testing import payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+TARGETS = ("USD", "BTC")
+
+
+def full_revaluation(portfolio, paths):
+    """!
+    Value every balance in every target from scratch.
+    """
+    totals = {}
+    for target in TARGETS:
+        total = 0.0
+        for currency, amount in portfolio.balances.items():
+            rate = 1.0
+            for pair_id, inverse in paths[target][currency] or ():
+                price = portfolio.prices[pair_id]
+                rate = rate / price if inverse else rate * price
+            total += amount * rate
+        totals[target] = total
+    return totals
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--balances", type=int, default=50)
+    parser.add_argument("--updates", type=int, default=20000)
+    args = parser.parse_args()
+
+    portfolio = cobinhood.Portfolio(payloads.trading_pairs(args.pairs),
+                                    TARGETS)
+    portfolio.load_trading_statistics(payloads.stats(args.pairs))
+    portfolio.load_balances(payloads.balances(args.balances))
+    paths = dict((target, dict(
+        (currency, portfolio.path(currency, target))
+        for currency in portfolio.balances)) for target in TARGETS)
+    rng = random.Random(1)
+    pair_ids = list(portfolio.prices)
+    ticks = [(rng.choice(pair_ids), rng.uniform(0.0001, 10000))
+             for _ in range(args.updates)]
+
+    full, incremental = [], []
+    for pair_id, price in ticks:
+        start = _timer()
+        portfolio.prices[pair_id] = price
+        full_revaluation(portfolio, paths)
+        full.append(_timer() - start)
+    revaluations = portfolio.revaluations
+    for pair_id, price in ticks:
+        start = _timer()
+        portfolio.set_price(pair_id, price * 1.01)
+        portfolio.total("USD")
+        portfolio.total("BTC")
+        incremental.append(_timer() - start)
+
+    print("{0} trading pairs, {1} balances, {2} updates, USD and BTC".format(
+        args.pairs, len(portfolio.balances), args.updates))
+    for name, samples in (("full", full), ("incremental", incremental)):
+        print("{0:<12} mean {1:>7.2f} us  p99 {2:>7.2f} us".format(
+            name, sum(samples) / len(samples) * 1e6,
+            percentile(samples, 0.99) * 1e6))
+    print("revaluations per update: {0:.2f} incremental, {1} full".format(
+        (portfolio.revaluations - revaluations) / float(args.updates),
+        len(portfolio.balances) * len(TARGETS)))
+
+
+if __name__ == "__main__":
+    main()
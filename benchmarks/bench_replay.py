@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""!
+Benchmark replay of a recorded session against the recording itself.
+
+A session of ticker, order book and trades calls is recorded through a
+perform with network-like latency, then replayed with speed None.
+
+    python -m benchmarks.bench_replay [--calls N] [--latency SECONDS]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import cobinhood
+from cobinhood.testing import payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+PAIRS = ["BTC-USDT", "ETH-USDT", "COB-ETH", "ETH-BTC"]
+
+
+def make_perform(latency):
+    """!
+    @return: perform answering after latency seconds with realistic bodies.
+    """
+    bodies = {"tickers": payloads.ticker(), "orderbooks": payloads.order_book(),
+              "trades": payloads.trades()}
+
+    def perform(request_url, auth_token, request_type):
+        time.sleep(latency)
+        return bodies[request_url.split("/")[5]]
+    return perform
+
+
+def session(cob, calls):
+    """!
+    Strategy-like loop polling every pair.
+    """
+    for index in range(calls):
+        pair = PAIRS[index % len(PAIRS)]
+        cob.get_ticker(pair)
+        cob.get_order_book(pair)
+        cob.get_recent_trades(pair)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--replays", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "session.jsonl.gz")
+    try:
+        start = _timer()
+        with cobinhood.Cobinhood(perform=cobinhood.RecordingTransport(
+                make_perform(args.latency), path), cache_ttls={}) as cob:
+            session(cob, args.calls)
+        recorded = _timer() - start
+
+        replay = cobinhood.ReplayTransport(path)
+        cob = cobinhood.Cobinhood(perform=replay, cache_ttls={})
+        start = _timer()
+        for _ in range(args.replays):
+            replay.rewind()
+            session(cob, args.calls)
+        replayed = (_timer() - start) / args.replays
+        size = os.path.getsize(path)
+    finally:
+        shutil.rmtree(directory)
+
+    print("{0} calls per session, recording {1:.1f} KiB".format(
+        args.calls * 3, size / 1024.0))
+    print("recorded  {0:>9.2f} ms".format(recorded * 1000))
+    print("replayed  {0:>9.2f} ms  ({1:.0f}x faster)".format(
+        replayed * 1000, recorded / replayed))
+
+
+if __name__ == "__main__":
+    main()
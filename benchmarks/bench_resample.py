@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""!
+Benchmark keeping 5m, 1h and 1d bars up to date from 1 minute candles.
+
+The baseline re-aggregates the whole candle history into every timeframe
+with NumPy on each refresh; CandleResampler merges the refreshed candle
+into its open bars. The initial load compares backfill with one update per
+candle.
+
+    python -m benchmarks.bench_resample [--history N] [--refreshes N]
+"""
+
+from __future__ import print_function
+import argparse
+import time
+
+from cobinhood import CandleResampler, columnar
+from cobinhood.resample import DEFAULT_TIMEFRAMES
+from cobinhood.testing import payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def aggregate(candles, timeframes):
+    """!
+    Re-aggregate every candle into every timeframe.
+    """
+    numpy = columnar.numpy
+    array = columnar.candles_to_array(candles)
+    timestamps = array["timestamp"]
+    bars = {}
+    for timeframe in timeframes:
+        bucket = timestamps - timestamps % timeframe
+        starts = numpy.concatenate(
+            ([0], numpy.flatnonzero(numpy.diff(bucket)) + 1))
+        ends = numpy.append(starts[1:], len(array)) - 1
+        bars[timeframe] = (bucket[starts], array["open"][starts],
+                           numpy.maximum.reduceat(array["high"], starts),
+                           numpy.minimum.reduceat(array["low"], starts),
+                           array["close"][ends],
+                           numpy.add.reduceat(array["volume"], starts))
+    return bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=10000)
+    parser.add_argument("--refreshes", type=int, default=500)
+    args = parser.parse_args()
+    columnar._require_numpy()
+
+    candles = payloads.candles(args.history + args.refreshes)["result"][
+        "candles"]
+    history, refreshes = candles[:args.history], candles[args.history:]
+
+    start = _timer()
+    resampler = CandleResampler()
+    for candle in history:
+        resampler.update(candle)
+    updates = _timer() - start
+    start = _timer()
+    resampler = CandleResampler()
+    resampler.backfill(history)
+    backfill = _timer() - start
+
+    window = list(history)
+    start = _timer()
+    for candle in refreshes:
+        window = window[1:] + [candle]
+        aggregate(window, DEFAULT_TIMEFRAMES)
+    full = (_timer() - start) / args.refreshes
+    start = _timer()
+    for candle in refreshes:
+        resampler.update(candle)
+    incremental = (_timer() - start) / args.refreshes
+
+    print("{0} candles of history, 3 timeframes".format(args.history))
+    print("load: update per candle {0:.1f} ms, backfill {1:.1f} ms".format(
+        updates * 1000, backfill * 1000))
+    print("refresh: re-aggregate {0:.1f} us, incremental {1:.1f} us "
+          "({2:.0f}x faster)".format(full * 1e6, incremental * 1e6,
+                                     full / incremental))
+
+
+if __name__ == "__main__":
+    main()
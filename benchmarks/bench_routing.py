@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""!
+Benchmark the per-call overhead of building and dispatching requests.
+
+Compares the generic _query_api path (fn_dict, str.format and urlencode on
+every call) with the compiled routes backing the public methods, using an
+in-process perform so only client overhead is measured.
+
+    python -m benchmarks.bench_routing [--calls N]
+"""
+
+from __future__ import print_function
+import argparse
+import timeit
+
+import cobinhood
+from cobinhood.endpoints import compile_routes
+
+RESPONSE = {"success": True, "result": {}}
+
+
+def perform(request_url, auth_token, request_type):
+    return RESPONSE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    cob = cobinhood.Cobinhood(perform=perform, cache_ttls={})
+    route = compile_routes(cobinhood.BASE_URL_V1, cobinhood.API_V1)[
+        "get_order_book"]
+    cases = [
+        ("url: _request_url", lambda: cob._request_url(
+            {cobinhood.API_V1: "market/orderbooks/{0}".format("BTC-USDT")},
+            {"limit": 50})),
+        ("url: compiled route", lambda: route.url(("BTC-USDT",), (50,))),
+        ("call: _query_api", lambda: cob._query_api(
+            fn_dict={cobinhood.API_V1: "market/orderbooks/{0}".format(
+                "BTC-USDT")},
+            extension={"limit": 50})),
+        ("call: get_order_book", lambda: cob.get_order_book("BTC-USDT", 50)),
+    ]
+    for name, call in cases:
+        seconds = min(timeit.repeat(call, number=args.calls, repeat=3))
+        print("{0:<24} {1:>8.3f} us/call".format(
+            name, seconds / args.calls * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""!
+Benchmark streaming throughput and reconnect time against the local stand-in.
+
+    python -m benchmarks.bench_stream [--pairs N] [--messages N]
+"""
+
+from __future__ import print_function
+import argparse
+import asyncio
+import time
+
+import cobinhood
+from cobinhood.testing.stream import MockStreamServer
+
+
+async def measure(pairs, messages):
+    """!
+    Publish ticker updates for many pairs and time their delivery.
+
+    @param pairs: number of subscribed trading pairs.
+    @param messages: number of updates to publish.
+    @return: (events per second, seconds to reconnect and resubscribe).
+    """
+    async with MockStreamServer() as server:
+        stream = cobinhood.CobinhoodStream(server.url, reconnect_delay=0.01,
+                                           queue_size=messages)
+        channels = [stream.subscribe_ticker("P{0}-USDT".format(index))
+                    for index in range(pairs)]
+        async with stream:
+            await stream.wait_ready(10)
+            start = time.time()
+            for index in range(messages):
+                await server.publish(channels[index % pairs], [index, "1.0"])
+            while stream.event_count < messages:
+                await asyncio.sleep(0.001)
+            rate = messages / (time.time() - start)
+
+            start = time.time()
+            await server.drop_connections()
+            while stream.connection_count < 2:
+                await asyncio.sleep(0.001)
+            await stream.wait_ready(10)
+            return rate, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+    loop = asyncio.new_event_loop()
+    rate, reconnect = loop.run_until_complete(measure(args.pairs, args.messages))
+    loop.close()
+    print("{0:<24} {1:>10.1f} events/s".format("throughput", rate))
+    print("{0:<24} {1:>10.1f} ms".format("reconnect+resubscribe", reconnect * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""!
+Benchmark calls per second with and without connection reuse.
+
+Runs against a local MockCobinhoodServer so the numbers reflect client and
+handshake overhead rather than the exchange.
+
+    python -m benchmarks.bench_transport [--calls N]
+"""
+
+from __future__ import print_function
+import argparse
+import time
+
+import cobinhood
+from cobinhood.testing import MockCobinhoodServer
+
+
+def calls_per_second(perform, url, calls):
+    """!
+    Time a number of sequential calls through a perform callable.
+
+    @param perform: callable with the request_api_call signature.
+    @param url: url to request.
+    @param calls: number of calls to make.
+    @return: calls per second.
+    """
+    perform(url, "", "get")
+    start = time.time()
+    for _ in range(calls):
+        perform(url, "", "get")
+    return calls / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    with MockCobinhoodServer() as server:
+        url = server.url + "/v1/system/time"
+        results = [
+            ("request_api_call", cobinhood.request_api_call),
+            ("HTTPTransport(keep_alive=False)",
+             cobinhood.HTTPTransport(keep_alive=False)),
+            ("HTTPTransport()", cobinhood.HTTPTransport()),
+        ]
+        for name, perform in results:
+            rate = calls_per_second(perform, url, args.calls)
+            print("{0:<34} {1:>10.1f} calls/s".format(name, rate))
+
+
+if __name__ == "__main__":
+    main()
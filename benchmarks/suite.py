@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""!
+Offline benchmark suite for every endpoint and transport mode.
+
+Starts a local MockCobinhoodServer serving every /v1 route Cobinhood uses with
+realistic payload sizes, then measures throughput, p50/p99 latency and peak
+memory of each public method through each transport. Results are printed as a
+table, and written as JSON with --output so runs can be compared:
+
+    python -m benchmarks.suite --output run.json
+    python -m benchmarks.suite --baseline run.json --tolerance 0.2
+
+With --baseline the exit status is 1 when any endpoint is slower than the
+baseline by more than the tolerance.
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import cobinhood
+from cobinhood.testing import MockCobinhoodServer, payloads
+
+_timer = getattr(time, "perf_counter", time.time)
+
+PAIR = "BTC-USDT"
+
+# (name, function of a client making one call) for every public endpoint.
+ENDPOINTS = [
+    ("get_system_time", lambda client: client.get_system_time()),
+    ("get_system_info", lambda client: client.get_system_info()),
+    ("get_currencies", lambda client: client.get_currencies()),
+    ("get_all_trading_pairs", lambda client: client.get_all_trading_pairs()),
+    ("get_order_book", lambda client: client.get_order_book(PAIR)),
+    ("get_trading_statistics", lambda client: client.get_trading_statistics()),
+    ("get_ticker", lambda client: client.get_ticker(PAIR)),
+    ("get_recent_trades", lambda client: client.get_recent_trades(PAIR)),
+    ("get_candles", lambda client: client.get_candles(PAIR)),
+    ("get_order", lambda client: client.get_order("order")),
+    ("get_trades_order", lambda client: client.get_trades_order("order")),
+    ("get_all_orders", lambda client: client.get_all_orders()),
+    ("get_order_history", lambda client: client.get_order_history()),
+    ("get_trade", lambda client: client.get_trade("trade")),
+    ("get_trade_history", lambda client: client.get_trade_history()),
+    ("get_wallet_balances", lambda client: client.get_wallet_balances()),
+    ("get_ledger_entries", lambda client: client.get_ledger_entries()),
+    ("get_deposit_addresses", lambda client: client.get_deposit_addresses()),
+    ("get_withdrawal_addresses",
+     lambda client: client.get_withdrawal_addresses()),
+    ("get_withdrawal", lambda client: client.get_withdrawal("withdrawal")),
+    ("get_all_withdrawals", lambda client: client.get_all_withdrawals()),
+    ("get_deposit", lambda client: client.get_deposit("deposit")),
+    ("get_all_deposits", lambda client: client.get_all_deposits()),
+]
+
+# (name, function returning a perform callable) for every transport mode.
+TRANSPORTS = [
+    ("request_api_call", lambda: cobinhood.request_api_call),
+    ("HTTPTransport", lambda: cobinhood.HTTPTransport()),
+    ("HTTPTransport(raw_bytes)",
+     lambda: cobinhood.HTTPTransport(decoder=cobinhood.raw_bytes)),
+]
+
+
+def percentile(samples, fraction):
+    """!
+    @param samples: sorted list of numbers.
+    @param fraction: percentile as a fraction - Ex: 0.99
+    @return: nearest-rank percentile of the samples.
+    """
+    index = min(len(samples) - 1, max(0, int(round(fraction * len(samples))) - 1))
+    return samples[index]
+
+
+def measure(call, client, calls, memory_calls):
+    """!
+    Benchmark one endpoint on one client.
+
+    Latency and memory are measured in separate passes so tracemalloc does
+    not slow down the timed calls.
+
+    @param call: function of a client making one call.
+    @param client: Cobinhood instance.
+    @param calls: number of timed calls.
+    @param memory_calls: number of calls traced for peak memory.
+    @return: dict with calls_per_second, p50_ms, p99_ms and peak_bytes.
+    """
+    response = call(client)
+    if isinstance(response, bytes):
+        response = json.loads(response.decode("utf-8"))
+    if not response.get("success"):
+        raise cobinhood.ExceptionCobinhood(response.get("error", response))
+    samples = []
+    start = _timer()
+    for _ in range(calls):
+        before = _timer()
+        call(client)
+        samples.append(_timer() - before)
+    elapsed = _timer() - start
+    samples.sort()
+
+    tracemalloc.start()
+    try:
+        for _ in range(memory_calls):
+            call(client)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"calls_per_second": calls / elapsed,
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "peak_bytes": peak}
+
+
+def run(calls, memory_calls, endpoints=None, transports=None):
+    """!
+    Run the suite against a fresh mock server.
+
+    @param calls: number of timed calls per endpoint and transport.
+    @param memory_calls: number of calls traced for peak memory.
+    @param endpoints: names of endpoints to run, all when None.
+    @param transports: names of transports to run, all when None.
+    @return: dict of transport name to dict of endpoint name to result.
+    """
+    results = {}
+    with MockCobinhoodServer(payloads.api_routes()) as server:
+        base_url = server.url + "/{version}/{fn_call}?"
+        for transport_name, factory in TRANSPORTS:
+            if transports and transport_name not in transports:
+                continue
+            # The response cache is disabled so every call reaches the
+            # transport.
+            client = cobinhood.Cobinhood(perform=factory(), base_url=base_url,
+                                         cache_ttls={})
+            with client:
+                results[transport_name] = {}
+                for name, call in ENDPOINTS:
+                    if endpoints and name not in endpoints:
+                        continue
+                    results[transport_name][name] = measure(
+                        call, client, calls, memory_calls)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """!
+    Find endpoints that regressed against a baseline run.
+
+    @param results: results of this run.
+    @param baseline: results of the baseline run.
+    @param tolerance: allowed relative slowdown - Ex: 0.2 for 20%.
+    @return: list of (transport, endpoint, metric, baseline, current).
+    """
+    regressions = []
+    for transport_name, endpoints in results.items():
+        for name, current in endpoints.items():
+            previous = baseline.get(transport_name, {}).get(name)
+            if previous is None:
+                continue
+            if current["calls_per_second"] < \
+                    previous["calls_per_second"] * (1 - tolerance):
+                regressions.append((transport_name, name, "calls_per_second",
+                                    previous["calls_per_second"],
+                                    current["calls_per_second"]))
+            for metric in ("p99_ms", "peak_bytes"):
+                if current[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append((transport_name, name, metric,
+                                        previous[metric], current[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--memory-calls", type=int, default=20)
+    parser.add_argument("--endpoint", action="append",
+                        help="run only this endpoint, may be repeated")
+    parser.add_argument("--transport", action="append",
+                        help="run only this transport, may be repeated")
+    parser.add_argument("--output", help="write results as JSON to a file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(args.calls, args.memory_calls, args.endpoint, args.transport)
+    for transport_name, endpoints in results.items():
+        print(transport_name)
+        for name, result in endpoints.items():
+            print("  {0:<26} {1:>9.1f} calls/s  p50 {2:>7.3f} ms  "
+                  "p99 {3:>7.3f} ms  peak {4:>9d} B".format(
+                      name, result["calls_per_second"], result["p50_ms"],
+                      result["p99_ms"], result["peak_bytes"]))
+
+    if args.output:
+        report = {"python": platform.python_version(),
+                  "version": getattr(cobinhood, "__version__", None),
+                  "calls": args.calls, "results": results}
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for transport_name, name, metric, previous, current in regressions:
+            print("REGRESSION {0} {1} {2}: {3:.3f} -> {4:.3f}".format(
+                transport_name, name, metric, previous, current))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
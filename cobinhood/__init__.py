@@ -1 +1,45 @@
+import sys
+
 from .cobinhood import *
+from .accounts import AccountManager
+from .cache import TTLCache
+from .exceptions import DeadlineExceeded, FatalError, RetryableError
+from .metrics import Metrics
+from .orderbook import OrderBook
+from .ordertracker import OrderEvent, OrderTracker
+from .portfolio import Portfolio
+from .ratelimit import PriorityScheduler, TokenBucket
+from .replay import RecordingTransport, ReplayTransport
+from .resample import CandleResampler
+from .retry import RetryingTransport, RetryPolicy
+from .singleflight import SingleFlight
+from .store import MarketStore
+from .transport import raw_bytes
+
+# asyncio backends, imported on first access where the interpreter allows it.
+_LAZY = {
+    "AsyncCobinhood": "async_cobinhood",
+    "AsyncSingleFlight": "async_singleflight",
+    "AsyncHTTPTransport": "async_transport",
+    "CobinhoodStream": "stream",
+    "StreamEvent": "stream",
+}
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        module = _LAZY.get(name)
+        if module is None:
+            raise AttributeError(
+                "module {0!r} has no attribute {1!r}".format(__name__, name))
+        import importlib
+        value = getattr(importlib.import_module("." + module, __name__), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY))
+elif sys.version_info >= (3, 6):
+    from .async_cobinhood import AsyncCobinhood
+    from .async_singleflight import AsyncSingleFlight
+    from .async_transport import AsyncHTTPTransport
+    from .stream import CobinhoodStream, StreamEvent
@@ -0,0 +1,281 @@
+"""!
+@file       accounts.py
+
+@brief      Clients for many api keys sharing one connection pool.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import threading
+from collections import OrderedDict
+
+from .cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTLS, TTLCache
+from .cobinhood import (API_V1, BASE_URL_V1, DEFAULT_MAX_WORKERS, Cobinhood,
+                        error_response)
+from .endpoints import ENDPOINTS
+from .exceptions import ExceptionCobinhood
+from .metrics import Metrics
+from .ratelimit import (ACCOUNT, DEFAULT_BUDGETS, DEFAULT_GLOBAL_BUDGET,
+                        DEFAULT_MAX_WAIT, PriorityScheduler)
+from .singleflight import SingleFlight
+from .transport import DEFAULT_POOL_MAXSIZE, HTTPTransport
+
+# Seconds a call of a group may stay queued. Account reads are dropped too,
+# so a throttled key cannot hold its callers forever.
+DEFAULT_ACCOUNT_MAX_WAIT = dict(DEFAULT_MAX_WAIT)
+DEFAULT_ACCOUNT_MAX_WAIT[ACCOUNT] = 10.0
+
+# Batch calls of one account running at once on the shared worker pool.
+DEFAULT_MAX_WORKERS_PER_KEY = 4
+
+# Clients kept before the least recently used one is dropped.
+DEFAULT_MAX_CLIENTS = 1000
+
+
+def _public_ttls(cache_ttls, api_version):
+    """!
+    @return: cache_ttls without the endpoints that need an api key, whose
+        responses must not be shared between accounts.
+    """
+    private = set(endpoint.path for endpoint in
+                  ENDPOINTS.get(api_version, {}).values() if endpoint.auth)
+    return dict((path, ttl) for path, ttl in cache_ttls.items()
+                if path not in private)
+
+
+class _KeyExecutor(object):
+    """!
+    Slice of a shared executor running at most limit tasks at once.
+
+    submit blocks the calling thread, not a pool worker, while the slice is
+    full, so the calls of a throttled account waiting for tokens cannot
+    occupy the whole pool.
+    """
+
+    def __init__(self, executor, limit):
+        self.executor = executor
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def submit(self, function, *args, **kwargs):
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(function, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        self._slots.release()
+
+    def shutdown(self, wait=True):
+        """!
+        The shared executor is shut down by the manager only.
+        """
+
+
+class _SharedPerform(object):
+    """!
+    Perform shared by the clients of a manager.
+
+    Calls go through to the wrapped perform, but close does nothing, so
+    closing one client, or leaving its with block, does not close the
+    connection pool of every account.
+    """
+
+    def __init__(self, perform):
+        self.perform = perform
+
+    def __call__(self, *args):
+        return self.perform(*args)
+
+    def close(self):
+        """!
+        The shared perform is closed by the manager only.
+        """
+
+
+class AccountManager(object):
+    """!
+    Cobinhood clients for many api keys in one process.
+
+    Every client goes through one perform, so all accounts share one
+    connection pool, and through its own PriorityScheduler, so each key
+    keeps its own rate budget. The clients also share a response cache for
+    public endpoints, a SingleFlight, under which identical public calls in
+    flight for several accounts are made once and charged to one budget,
+    compiled routes and the worker pool of batch calls, of which each
+    account may use max_workers_per_key workers at once. Clients are created
+    on first use and the least recently used is dropped past max_clients.
+    Closing a client leaves the shared perform open; close the manager to
+    close it.
+    """
+
+    def __init__(self, perform=None, api_version=API_V1, base_url=BASE_URL_V1,
+                 max_workers=DEFAULT_MAX_WORKERS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 budgets=DEFAULT_BUDGETS, global_budget=DEFAULT_GLOBAL_BUDGET,
+                 max_wait=DEFAULT_ACCOUNT_MAX_WAIT,
+                 cache_ttls=DEFAULT_CACHE_TTLS, cache_size=DEFAULT_CACHE_SIZE,
+                 typed=False, metrics=None,
+                 max_workers_per_key=DEFAULT_MAX_WORKERS_PER_KEY,
+                 max_clients=DEFAULT_MAX_CLIENTS):
+        """!
+        AccountManager initialization.
+
+        @param perform: callable with the request_api_call signature shared
+            by every account. Defaults to an HTTPTransport owned by the
+            manager.
+        @param api_version: api version of the clients.
+        @param base_url: url template of the clients.
+        @param max_workers: size of the worker pool shared by batch calls.
+        @param pool_maxsize: connections kept per host by the default
+            transport.
+        @param budgets: per key dict of group to (requests per second, burst),
+            see PriorityScheduler.
+        @param global_budget: per key (requests per second, burst) shared by
+            all groups.
+        @param max_wait: dict of group to seconds a call may stay queued.
+        @param cache_ttls: dict of fn_call to seconds responses are cached;
+            endpoints that need an api key are never cached.
+        @param cache_size: maximum number of cached responses.
+        @param typed: return typed records, see Cobinhood.
+        @param metrics: Metrics shared by every account, or True for a new
+            one. Disabled by default.
+        @param max_workers_per_key: batch calls of one account running at
+            once on the shared worker pool.
+        @param max_clients: clients kept before the least recently used one
+            is dropped, None for no limit. A dropped account starts again
+            with a full rate budget.
+        """
+        self.perform = perform if perform is not None else \
+            HTTPTransport(pool_maxsize=pool_maxsize)
+        self.api_version = api_version
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.budgets = budgets
+        self.global_budget = global_budget
+        self.max_wait = max_wait
+        self.cache_ttls = _public_ttls(cache_ttls, api_version)
+        self.cache = TTLCache(cache_size)
+        self.singleflight = SingleFlight()
+        self.typed = typed
+        self.metrics = Metrics() if metrics is True else metrics or None
+        self.max_workers_per_key = max_workers_per_key
+        self.max_clients = max_clients
+        self.evicted = 0
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Batch calls of the clients and fan_out get separate pools, so a
+        # function run by fan_out may itself make batch calls.
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._fan_out_executor = ThreadPoolExecutor(max_workers)
+        self._shared_perform = _SharedPerform(self.perform)
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.public = self._create(None)
+
+    def _create(self, api_key):
+        scheduler = PriorityScheduler(self._shared_perform, self.budgets,
+                                      self.global_budget, self.max_wait)
+        return Cobinhood(api_key, perform=scheduler,
+                         api_version=self.api_version, base_url=self.base_url,
+                         max_workers=self.max_workers,
+                         cache_ttls=self.cache_ttls, cache=self.cache,
+                         typed=self.typed, metrics=self.metrics,
+                         singleflight=self.singleflight,
+                         executor=_KeyExecutor(self._executor,
+                                               self.max_workers_per_key))
+
+    def client(self, api_key):
+        """!
+        Client of an account, created on first use.
+
+        @param api_key: api key of the account.
+        @return: Cobinhood instance.
+        """
+        with self._lock:
+            client = self._clients.pop(api_key, None)
+            if client is None:
+                client = self._create(api_key)
+                while self.max_clients is not None and \
+                        len(self._clients) >= self.max_clients:
+                    self._clients.popitem(last=False)
+                    self.evicted += 1
+            # Most recently used last.
+            self._clients[api_key] = client
+        return client
+
+    def remove(self, api_key):
+        """!
+        Forget an account and its rate budget.
+
+        @param api_key: api key of the account.
+        """
+        with self._lock:
+            self._clients.pop(api_key, None)
+
+    def api_keys(self):
+        """!
+        @return: api keys of the accounts with a client.
+        """
+        with self._lock:
+            return list(self._clients)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def fan_out(self, function, api_keys=None):
+        """!
+        Call a function with the client of many accounts concurrently.
+
+        @param function: function of a Cobinhood client - Ex:
+            lambda client: client.get_wallet_balances()
+        @param api_keys: api keys of the accounts, defaults to all of them.
+        @return: dict of api key to the function's result. A failed call
+            maps to a response with success set to false and the cause as
+            error_code.
+        """
+        api_keys = list(dict.fromkeys(self.api_keys() if api_keys is None
+                                      else api_keys))
+        submit = self._fan_out_executor.submit
+        futures = [(api_key, submit(function, self.client(api_key)))
+                   for api_key in api_keys]
+        results = {}
+        for api_key, future in futures:
+            try:
+                results[api_key] = future.result()
+            except ExceptionCobinhood as exception:
+                results[api_key] = error_response(exception)
+        return results
+
+    def stats(self):
+        """!
+        @return: dict with accounts, clients evicted past max_clients,
+            public calls saved by coalescing, cache hits and calls dropped
+            past their deadline.
+        """
+        with self._lock:
+            clients = list(self._clients.values()) + [self.public]
+        return {"accounts": len(clients) - 1,
+                "evicted": self.evicted,
+                "coalesced": self.singleflight.saved,
+                "cache_hits": self.cache.hits,
+                "dropped": sum(client.perform.dropped for client in clients)}
+
+    def close(self):
+        """!
+        Shut down the shared worker pool and close the shared perform.
+        """
+        self._executor.shutdown(wait=False)
+        self._fan_out_executor.shutdown(wait=False)
+        close = getattr(self.perform, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
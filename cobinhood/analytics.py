@@ -0,0 +1,182 @@
+"""!
+@file       analytics.py
+
+@brief      Vectorized trade analytics: VWAP, trade flow imbalance and OHLC.
+@author     Sachin Jayaram
+@date       2/2018
+
+Trades may be given as a get_recent_trades or get_trade_history response,
+a list of trades or a TRADE_DTYPE array. analyze computes every metric for
+many trading pairs in a few NumPy passes over all their trades at once, and
+spreads large batches over a process pool created on first use and shared
+by later calls.
+"""
+
+import threading
+from itertools import repeat
+
+from . import columnar
+
+DEFAULT_INTERVAL = 60000
+
+# Fewest trading pairs for which analyze uses a process pool by default.
+PARALLEL_MIN_PAIRS = 200
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _as_array(trades):
+    columnar._require_numpy()
+    if isinstance(trades, columnar.numpy.ndarray):
+        return trades
+    return columnar.trades_to_array(trades)
+
+
+def _metrics(trades, interval=DEFAULT_INTERVAL):
+    return _analyze_chunk([(None, trades)], interval)[0][1]
+
+
+def vwap(trades):
+    """!
+    @param trades: trades of one trading pair.
+    @return: volume weighted average price, nan without volume.
+    """
+    return _metrics(trades)["vwap"]
+
+
+def trade_flow_imbalance(trades):
+    """!
+    @param trades: trades of one trading pair.
+    @return: taker buy volume minus taker sell volume over the total volume,
+        from -1 to 1, nan without volume. A trade whose maker is an ask was
+        a taker buy.
+    """
+    return _metrics(trades)["imbalance"]
+
+
+def ohlc(trades, interval=DEFAULT_INTERVAL):
+    """!
+    @param trades: trades of one trading pair.
+    @param interval: bar length in milliseconds.
+    @return: CANDLE_DTYPE array with one bar per interval holding trades,
+        oldest first, timestamped at the start of the interval.
+    """
+    return _metrics(trades, interval)["ohlc"]
+
+
+def _analyze_chunk(items, interval):
+    """!
+    Compute the metrics of many trading pairs in one pass.
+
+    @param items: list of (trading pair id, trades).
+    @param interval: bar length in milliseconds.
+    @return: list of (trading pair id, metrics dict).
+    """
+    columnar._require_numpy()
+    numpy = columnar.numpy
+    arrays = [_as_array(trades) for _, trades in items]
+    pairs = len(arrays)
+    counts = numpy.array([len(array) for array in arrays], dtype=numpy.int64)
+    trades = numpy.concatenate(arrays) if arrays else \
+        numpy.empty(0, dtype=columnar.TRADE_DTYPE)
+    segment = numpy.repeat(numpy.arange(pairs), counts)
+    price, size = trades["price"], trades["size"]
+
+    volume = numpy.bincount(segment, size, pairs)
+    notional = numpy.bincount(segment, price * size, pairs)
+    # maker_side is -1 for asks, whose trades were taker buys.
+    flow = numpy.bincount(segment, -trades["maker_side"] * size, pairs)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        vwaps = notional / volume
+        imbalances = flow / volume
+
+    bucket = trades["timestamp"] // interval
+    order = numpy.lexsort((trades["timestamp"], bucket, segment))
+    bucket, bar_segment = bucket[order], segment[order]
+    price, size = price[order], size[order]
+    if len(order):
+        change = (numpy.diff(bucket) != 0) | (numpy.diff(bar_segment) != 0)
+        starts = numpy.concatenate(([0], numpy.flatnonzero(change) + 1))
+    else:
+        starts = numpy.empty(0, dtype=numpy.intp)
+    bars = numpy.empty(len(starts), dtype=columnar.CANDLE_DTYPE)
+    if len(starts):
+        ends = numpy.append(starts[1:], len(order))
+        bars["timestamp"] = bucket[starts] * interval
+        bars["open"] = price[starts]
+        bars["close"] = price[ends - 1]
+        bars["high"] = numpy.maximum.reduceat(price, starts)
+        bars["low"] = numpy.minimum.reduceat(price, starts)
+        bars["volume"] = numpy.add.reduceat(size, starts)
+    bounds = numpy.searchsorted(bar_segment[starts], numpy.arange(pairs + 1))
+
+    return [(pair, {"vwap": float(vwaps[index]),
+                    "imbalance": float(imbalances[index]),
+                    "volume": float(volume[index]),
+                    "count": int(counts[index]),
+                    "ohlc": bars[bounds[index]:bounds[index + 1]]})
+            for index, (pair, _) in enumerate(items)]
+
+
+def _get_pool():
+    """!
+    @return: module process pool with one worker per cpu, created on first
+        use and kept for later calls.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import cpu_count
+            _pool = ProcessPoolExecutor(cpu_count())
+        return _pool
+
+
+def analyze(batches, interval=DEFAULT_INTERVAL, processes=None,
+            executor=None):
+    """!
+    Compute VWAP, trade flow imbalance, volume and OHLC bars for many
+    trading pairs.
+
+    Pairs whose trades are a failure response, e.g. from
+    get_recent_trades_batch, are left out of the metrics and returned with
+    their error instead.
+
+    @param batches: dict of trading pair id to its trades, e.g. the result
+        of get_recent_trades_batch.
+    @param interval: OHLC bar length in milliseconds.
+    @param processes: number of chunks computed in parallel. 0 or 1 computes
+        in this process; None uses one per cpu for PARALLEL_MIN_PAIRS pairs
+        or more and computes smaller batches in this process.
+    @param executor: concurrent.futures executor running the chunks,
+        defaults to a module process pool reused across calls.
+    @return: tuple of two dicts. The first maps trading pair id to a dict
+        with vwap, imbalance (see trade_flow_imbalance), volume, count and
+        ohlc (see ohlc), the second maps failed trading pair ids to the
+        error of their response.
+    """
+    items, errors = [], {}
+    for pair, trades in batches.items():
+        if isinstance(trades, dict) and not trades.get("success", True):
+            errors[pair] = trades.get("error", trades)
+        else:
+            items.append((pair, trades))
+    if processes is None:
+        processes = 1
+        if len(items) >= PARALLEL_MIN_PAIRS:
+            from multiprocessing import cpu_count
+            processes = cpu_count()
+    processes = min(processes, len(items))
+    if processes <= 1:
+        return dict(_analyze_chunk(items, interval)), errors
+
+    if executor is None:
+        executor = _get_pool()
+    step = -(-len(items) // processes)
+    chunks = [items[start:start + step]
+              for start in range(0, len(items), step)]
+    results = {}
+    for chunk in executor.map(_analyze_chunk, chunks, repeat(interval)):
+        results.update(chunk)
+    return results, errors
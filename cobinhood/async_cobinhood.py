@@ -0,0 +1,208 @@
+"""!
+@file       async_cobinhood.py
+
+@brief      asyncio flavour of the cobinhood api wrapper.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import asyncio
+
+from .async_singleflight import AsyncSingleFlight
+from .async_transport import AsyncHTTPTransport
+from .cache import DEFAULT_CACHE_TTLS
+from .cobinhood import (API_V1, BASE_URL_V1, DEFAULT_MAX_WORKERS,
+                        DEFAULT_PAGE_SIZE, Cobinhood, error_response)
+from .exceptions import ExceptionCobinhood
+from .transport import json_loads
+
+
+class AsyncCobinhood(Cobinhood):
+    """!
+    Cobinhood client whose api methods return awaitables.
+
+    Every endpoint method is inherited from Cobinhood; only _execute and
+    the batch, conversion and pagination helpers are replaced, so both
+    clients always share the same endpoint definitions. The iter_ methods
+    return async generators.
+    """
+
+    def __init__(self, api_key=None, perform=None, api_version=API_V1,
+                 base_url=BASE_URL_V1, max_workers=DEFAULT_MAX_WORKERS,
+                 cache_ttls=DEFAULT_CACHE_TTLS, cache=None, typed=False,
+                 decoder=json_loads, metrics=None, singleflight=None):
+        """!
+        AsyncCobinhood class initialization.
+
+        @param perform coroutine function used to make the request, with the
+            same signature as request_api_call. Defaults to a pooled
+            keep-alive AsyncHTTPTransport owned by this instance.
+        @param api_version: default api_version set to v1
+        @param base_url: url template with version and fn_call fields.
+        @param max_workers: maximum concurrent calls made by batch methods.
+        @param cache_ttls: dict of fn_call to seconds its GET responses are
+            cached; an empty dict disables the response cache.
+        @param cache: TTLCache to store responses in.
+        @param typed: return records in results as typed Record instances.
+        @param decoder: function decoding response bodies in the default
+            transport.
+        @param metrics: Metrics recording per-endpoint call metrics, or True
+            for a new one.
+        @param singleflight: AsyncSingleFlight making concurrent identical
+            GET calls share one request, or True for a new one.
+        """
+        if perform is None:
+            perform = AsyncHTTPTransport(decoder=decoder)
+        if singleflight is True:
+            singleflight = AsyncSingleFlight()
+        super(AsyncCobinhood, self).__init__(
+            api_key=api_key,
+            perform=perform,
+            api_version=api_version,
+            base_url=base_url,
+            max_workers=max_workers,
+            cache_ttls=cache_ttls,
+            cache=cache,
+            typed=typed,
+            metrics=metrics,
+            singleflight=singleflight)
+
+    async def _execute(self, request_url, request_type, ttl, label,
+                       private=True, payload=None):
+        """!
+        Make a call, through the response cache, metrics and request
+        coalescing when they are enabled.
+
+        @param request_url: the generated url for making the api call.
+        @param request_type: request type [GET, PUT, POST, DELETE].
+        @param ttl: seconds to cache the response, None to not cache it.
+        @param label: endpoint label recorded in metrics.
+        @param private: whether the response depends on the api key.
+        @param payload: dict sent as the json body, None to send no body.
+        @return: json response from the cobinhood exchange.
+        """
+        key, response = self._cached(request_url, request_type, ttl, label,
+                                     private)
+        if response is not None:
+            return response
+        start = self._start_observation()
+        try:
+            response = await self._perform(request_url, request_type, private,
+                                           payload)
+        except Exception as exception:
+            error = self._failed(label, request_type, start, exception)
+            if error is exception:
+                raise
+            raise error
+        return self._completed(key, ttl, label, request_type, start, response)
+
+    async def _then(self, response, convert):
+        """!
+        Apply a conversion to the awaited response of an api method.
+
+        @param response: awaitable returned by an api method.
+        @param convert: function applied to the response.
+        @return: converted response.
+        """
+        return convert(await response)
+
+    async def _fan_out(self, method, keys, *args):
+        """!
+        Await a single-key api method for many keys concurrently.
+
+        @param method: bound api method taking the key as first argument.
+        @param keys: iterable of keys, e.g. trading pair ids.
+        @param args: extra arguments passed to every call.
+        @return: dict of key to response. A failed call maps to a response
+            with success set to false and the cause as error_code.
+        """
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def call(key):
+            async with limit:
+                try:
+                    return await method(key, *args)
+                except ExceptionCobinhood as exception:
+                    return error_response(exception)
+
+        keys = list(dict.fromkeys(keys))
+        responses = await asyncio.gather(*[call(key) for key in keys])
+        return dict(zip(keys, responses))
+
+    async def _bulk(self, method, calls, concurrency=None):
+        """!
+        Await an api method once per argument tuple concurrently.
+
+        @param method: bound api method.
+        @param calls: iterable of argument tuples, one per call.
+        @param concurrency: most calls in flight at once, defaults to
+            max_workers.
+        @return: list of responses in the order of calls. A failed call gets
+            a response with success set to false and the cause as
+            error_code.
+        """
+        limit = asyncio.Semaphore(concurrency or self.max_workers)
+
+        async def call(args):
+            async with limit:
+                try:
+                    return await method(*args)
+                except ExceptionCobinhood as exception:
+                    return error_response(exception)
+
+        return list(await asyncio.gather(*[call(args) for args in calls]))
+
+    async def _paginate(self, name, result_key, params=(),
+                        limit=DEFAULT_PAGE_SIZE, prefetch=True):
+        """!
+        Lazily iterate the records of a paginated list endpoint.
+
+        @param name: endpoint name - Ex: "get_order_history"
+        @param result_key: key of the record list in the result.
+        @param params: values of the query parameters before limit and page.
+        @param limit: number of records per page.
+        @param prefetch: request the next page while the current one is
+            consumed.
+        @return: async generator of records.
+        """
+        params = tuple(params) + (limit,)
+
+        def fetch(page):
+            return self._call(name, (), params + (page,))
+
+        page = 1
+        response = await fetch(page)
+        previous = None
+        while True:
+            records, previous = self._page_records(response, result_key,
+                                                   previous)
+            if records is None:
+                return
+            full = len(records) >= limit
+            task = None
+            if full and prefetch:
+                task = asyncio.ensure_future(fetch(page + 1))
+            for record in records:
+                yield record
+            if not full:
+                return
+            page += 1
+            response = await (task if task is not None else fetch(page))
+
+    async def close(self):
+        """!
+        Close the transport if it supports closing.
+        """
+        close = getattr(self.perform, "close", None)
+        if close is not None:
+            await close()
+
+    def __enter__(self):
+        raise TypeError("AsyncCobinhood closes asynchronously; use "
+                        "'async with' instead of 'with'")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,67 @@
+"""!
+@file       async_singleflight.py
+
+@brief      asyncio flavour of the coalescing of identical in-flight calls.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import asyncio
+
+
+class AsyncSingleFlight(object):
+    """!
+    Registry making concurrent awaited calls with the same key share one
+    execution on an event loop.
+
+    Shared responses must not be modified.
+    """
+
+    def __init__(self):
+        """!
+        AsyncSingleFlight initialization.
+        """
+        self.requests = 0
+        self.saved = 0
+        self._in_flight = {}
+
+    async def do(self, key, function, *args):
+        """!
+        Await a call unless an identical one is in flight, then share its
+        outcome.
+
+        @param key: hashable key identifying identical calls.
+        @param function: coroutine function making the call.
+        @param args: arguments passed to function.
+        @return: response of the call.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.saved += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_event_loop().create_future()
+        self._in_flight[key] = future
+        self.requests += 1
+        try:
+            response = await function(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exception:
+            future.set_exception(exception)
+            # Mark the exception retrieved when nobody else awaits it.
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+        finally:
+            del self._in_flight[key]
+        return response
+
+    def stats(self):
+        """!
+        @return: dict with requests (calls executed), saved (calls answered
+            by a call already in flight) and in_flight.
+        """
+        return {"requests": self.requests, "saved": self.saved,
+                "in_flight": len(self._in_flight)}
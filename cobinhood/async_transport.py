@@ -0,0 +1,217 @@
+"""!
+@file       async_transport.py
+
+@brief      Pooled keep-alive asyncio HTTP/1.1 transport for the cobinhood api wrapper.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import asyncio
+import json
+import ssl
+import time
+from urllib.parse import urlsplit
+
+from .exceptions import ExceptionCobinhood
+from .metrics import record_response_size
+from .transport import (DEFAULT_CONNECT_TIMEOUT, DEFAULT_POOL_MAXSIZE,
+                        DEFAULT_READ_TIMEOUT, REQUEST_METHODS, json_loads)
+
+# Methods sent again on a fresh connection when a reused one fails. Others
+# may already have reached the server, e.g. placing an order twice.
+RESEND_METHODS = ("GET", "HEAD")
+
+
+class _Connection(object):
+    """!
+    A single keep-alive connection to a host.
+    """
+
+    __slots__ = ("reader", "writer", "reused")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+
+class _HostPool(object):
+    """!
+    Idle connections and a concurrency limit for one (scheme, host, port).
+    """
+
+    def __init__(self, maxsize):
+        self.idle = []
+        self.limit = asyncio.Semaphore(maxsize)
+
+
+class AsyncHTTPTransport(object):
+    """!
+    Awaitable transport that keeps connections to the cobinhood servers alive.
+
+    An instance can be passed as the perform argument of AsyncCobinhood. Each
+    host gets a pool of at most pool_maxsize connections shared by every
+    coroutine using the transport.
+    """
+
+    def __init__(self, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, keep_alive=True,
+                 ssl_context=None, decoder=json_loads):
+        """!
+        AsyncHTTPTransport initialization.
+
+        @param pool_maxsize: maximum number of connections per host.
+        @param connect_timeout: seconds to wait for a connection.
+        @param read_timeout: seconds to wait for the server to respond.
+        @param keep_alive: reuse connections between calls.
+        @param ssl_context: ssl context for https, defaults to the system one.
+        @param decoder: function decoding the response body bytes.
+        """
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        self.ssl_context = ssl_context
+        self.decoder = decoder
+        self._pools = {}
+
+    async def __call__(self, request_url, auth_token, request_type,
+                       payload=None):
+        """!
+        Make a request url call over a pooled connection.
+
+        @param request_url: the generated url for making the api call.
+        @param auth_token: api key sent in the Authorization header.
+        @param request_type: request type [GET, PUT, POST, DELETE].
+        @param payload: dict sent as the json body, None to send no body.
+        @return: decoded response from the cobinhood exchange.
+        """
+        method = REQUEST_METHODS.get(request_type)
+        if method is None:
+            raise ExceptionCobinhood("Error: invalid request type")
+        parts = urlsplit(request_url)
+        secure = parts.scheme == "https"
+        port = parts.port or (443 if secure else 80)
+        key = (secure, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        request = self._request_head(method, target, parts.netloc, auth_token,
+                                     body)
+
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(self.pool_maxsize)
+        async with pool.limit:
+            while True:
+                conn = await self._acquire(pool, key)
+                try:
+                    body, reusable = await asyncio.wait_for(
+                        self._exchange(conn, request), self.read_timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    # The server may close an idle keep-alive connection at
+                    # any time; only a fresh connection failing is an error,
+                    # unless the request may have been processed.
+                    if conn.reused and method in RESEND_METHODS:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                if reusable and self.keep_alive:
+                    conn.reused = True
+                    pool.idle.append(conn)
+                else:
+                    conn.close()
+                record_response_size(len(body))
+                return self.decoder(body)
+
+    def _request_head(self, method, target, host, auth_token, body=b""):
+        nonce = str(int(time.time() * 1000))
+        lines = [
+            "{0} {1} HTTP/1.1".format(method, target),
+            "Host: {0}".format(host),
+            "Authorization: {0}".format(auth_token),
+            "nonce: {0}".format(nonce),
+            "Accept: application/json",
+            "Accept-Encoding: identity",
+            "Connection: {0}".format("keep-alive" if self.keep_alive else "close"),
+        ]
+        if body:
+            lines.append("Content-Type: application/json")
+        if method != "GET":
+            lines.append("Content-Length: {0}".format(len(body)))
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _acquire(self, pool, key):
+        while pool.idle:
+            conn = pool.idle.pop()
+            if not conn.reader.at_eof():
+                return conn
+            conn.close()
+        secure, host, port = key
+        context = None
+        if secure:
+            context = self.ssl_context or ssl.create_default_context()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context),
+            self.connect_timeout)
+        return _Connection(reader, writer)
+
+    @staticmethod
+    async def _exchange(conn, request):
+        conn.writer.write(request)
+        await conn.writer.drain()
+        reader = conn.reader
+
+        status_line = await reader.readuntil(b"\r\n")
+        version = status_line.split(b" ", 1)[0]
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        reusable = headers.get("connection", "").lower() != "close" \
+            and version == b"HTTP/1.1"
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if not size:
+                    # Skip trailers up to the terminating blank line.
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        else:
+            body = await reader.read()
+            reusable = False
+        return body, reusable
+
+    async def close(self):
+        """!
+        Close every pooled connection.
+        """
+        for pool in self._pools.values():
+            while pool.idle:
+                pool.idle.pop().close()
+        self._pools.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,108 @@
+"""!
+@file       cache.py
+
+@brief      Bounded TTL response cache for the cobinhood api wrapper.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 256
+
+# Seconds to keep responses of slow-changing reference endpoints, by fn_call.
+DEFAULT_CACHE_TTLS = {
+    "system/info": 60,
+    "market/currencies": 300,
+    "market/trading_pairs": 300,
+    "market/stats": 5,
+}
+
+_timer = getattr(time, "monotonic", time.time)
+
+
+class TTLCache(object):
+    """!
+    Thread-safe mapping whose entries expire and whose size is bounded.
+
+    Each entry carries its own time to live. When the cache is full the
+    least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, timer=_timer):
+        """!
+        TTLCache initialization.
+
+        @param maxsize: maximum number of entries.
+        @param timer: clock returning seconds.
+        """
+        self.maxsize = maxsize
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """!
+        Look up a live entry and mark it as recently used.
+
+        @param key: entry key.
+        @param default: returned on a miss.
+        @return: cached value or default.
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None and entry[0] > self.timer():
+                self._data[key] = entry
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl):
+        """!
+        Store an entry, evicting the least recently used one if full.
+
+        @param key: entry key.
+        @param value: value to cache.
+        @param ttl: seconds the entry stays valid.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (self.timer() + ttl, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, prefix=None):
+        """!
+        Drop entries.
+
+        @param prefix: drop only keys starting with this string, all when None.
+        @return: number of entries dropped.
+        """
+        with self._lock:
+            if prefix is None:
+                count = len(self._data)
+                self._data.clear()
+                return count
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def stats(self):
+        """!
+        @return: dict with hits, misses, evictions, size and maxsize.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "size": len(self._data),
+                    "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
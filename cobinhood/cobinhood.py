@@ -8,27 +8,85 @@
 """
 
 from __future__ import print_function
-import requests
+import threading
 import time
 
+from .cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTLS, TTLCache
+from .columnar import (candles_to_array, order_book_to_arrays,
+                       trades_to_array)
+from .endpoints import API_V1, compile_routes
+from .exceptions import ExceptionCobinhood, FatalError, RetryableError
+from .metrics import Metrics, endpoint_label, take_response_size
+from .models import decode_response
+from .retry import is_retryable
+from .singleflight import SingleFlight
+from .transport import DEFAULT_POOL_MAXSIZE, HTTPTransport, json_loads
+
 try:
     from urllib import urlencode
 except ImportError:
     from urllib.parse import urlencode
 
-API_V1 = "v1"
-
 BASE_URL_V1 = "https://api.cobinhood.com/{version}/{fn_call}?"
 
+DEFAULT_MAX_WORKERS = DEFAULT_POOL_MAXSIZE
+
+DEFAULT_PAGE_SIZE = 50
+
 
-def request_api_call(request_url, auth_token, request_type):
+def error_response(exception):
+    """!
+    Build a cobinhood style failure response for an exception.
+
+    @param exception: exception raised by the failed call.
+    @return: response dict with success set to false.
+    """
+    return {"success": False, "error": {"error_code": str(exception)}}
+
+
+def _page_key(records):
+    """!
+    Identify a page by its first record, to notice an endpoint ignoring the
+    page parameter and serving the same page again.
+
+    @param records: records of a page, not empty.
+    @return: id of the first record, or the record itself without one.
+    """
+    record = records[0]
+    if isinstance(record, dict):
+        key = record.get("id")
+    else:
+        key = getattr(record, "id", None)
+    return record if key is None else key
+
+
+def _transport_error(exception):
+    """!
+    Wrap an exception raised by a perform callable.
+
+    @param exception: raised exception, kept as the __cause__ of the
+        returned error.
+    @return: RetryableError for transient failures, FatalError otherwise,
+        with the exception's type and message - Ex:
+        "Error: ReadTimeout: read timed out"
+    """
+    cls = RetryableError if is_retryable(exception) else FatalError
+    error = cls("Error: {0}: {1}".format(type(exception).__name__, exception))
+    error.__cause__ = exception
+    return error
+
+
+def request_api_call(request_url, auth_token, request_type, payload=None):
     """!
     Make a request url call to get the respective response from cobinhood servers.
 
     @param request_url: the generated url for making the api call.
     @param signapi: signed api.
     @param request_type: request type [GET, PUT, POST, DEELTE].
+    @param payload: dict sent as the json body, None to send no body.
     """
+    import requests
+
     nonce = str(int(time.time() * 1000))
     header = {"Authorization": auth_token, "nonce": nonce}
     if request_type == "get":
@@ -38,11 +96,13 @@ def request_api_call(request_url, auth_token, request_type):
     elif request_type == "post":
         return requests.post(
             request_url,
-            headers=header).json()
+            headers=header,
+            json=payload).json()
     elif request_type == "put":
         return requests.put(
             request_url,
-            headers=header).json()
+            headers=header,
+            json=payload).json()
     elif request_type == "delete":
         return requests.delete(
             request_url,
@@ -56,40 +116,463 @@ class Cobinhood(object):
     Cobinhood class definition to request information from Cobinhood exchange using api key.
     """
 
-    def __init__(self, api_key=None, perform=request_api_call, api_version=API_V1):
+    def __init__(self, api_key=None, perform=None, api_version=API_V1,
+                 base_url=BASE_URL_V1, max_workers=DEFAULT_MAX_WORKERS,
+                 cache_ttls=DEFAULT_CACHE_TTLS, cache=None, typed=False,
+                 decoder=json_loads, metrics=None, singleflight=None,
+                 executor=None):
         """!
         Cobinhood class initialization.
 
-        @param perform function call to call request_api_call.
+        @param perform function call used to make the request, with the same
+            signature as request_api_call. payload is only passed to calls
+            with a body, so performs taking three arguments work for every
+            other call. Defaults to a pooled keep-alive HTTPTransport owned
+            by this instance.
         @param api_version: default api_version set to v1
+        @param base_url: url template with version and fn_call fields.
+        @param max_workers: size of the worker pool used by batch methods.
+        @param cache_ttls: dict of fn_call to seconds its GET responses are
+            cached, with {name} placeholders for path parameters - Ex:
+            "market/tickers/{trading_pair_id}"; an empty dict disables the
+            response cache.
+        @param cache: TTLCache to store responses in, e.g. one shared with
+            other clients. Defaults to a new one per instance.
+        @param typed: return records in results as compact typed Record
+            instances from cobinhood.models instead of dicts.
+        @param decoder: function decoding response bodies in the default
+            transport, e.g. cobinhood.raw_bytes to get undecoded bytes.
+        @param metrics: Metrics recording per-endpoint counts, errors,
+            latencies and response sizes, e.g. one shared with other
+            clients, or True for a new one. Disabled by default.
+        @param singleflight: SingleFlight making concurrent identical GET
+            calls share one request and its response, e.g. one shared with
+            other clients, or True for a new one. Disabled by default.
+        @param executor: ThreadPoolExecutor running batch and bulk calls and
+            page prefetches, e.g. one shared with other clients; it is not
+            shut down by close. Defaults to a pool of max_workers threads
+            created on first use.
         """
         self.api_key = str(api_key) if api_key else ""
-        self.perform = perform
+        self.perform = perform if perform is not None else \
+            HTTPTransport(decoder=decoder)
         self.api_version = api_version
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.cache_ttls = dict(cache_ttls)
+        self.cache = cache if cache is not None else TTLCache(DEFAULT_CACHE_SIZE)
+        self.typed = typed
+        self.metrics = Metrics() if metrics is True else metrics or None
+        self.singleflight = SingleFlight() if singleflight is True else \
+            singleflight or None
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def api_version(self):
+        return self._api_version
+
+    @api_version.setter
+    def api_version(self, api_version):
+        self._api_version = api_version
+        self._routes = None
+
+    @property
+    def base_url(self):
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, base_url):
+        self._base_url = base_url
+        self._routes = None
+
+    def _get_executor(self):
+        """!
+        Get the worker pool for batch methods, creating it on first use.
 
-    def _query_api(self, fn_dict, extension=None, request_type="get"):
+        @return: ThreadPoolExecutor with max_workers threads.
+        """
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers)
+        return self._executor
+
+    def _fan_out(self, method, keys, *args):
         """!
-        Function to query the cobinhood exchange.
+        Call a single-key api method for many keys concurrently.
+
+        @param method: bound api method taking the key as first argument.
+        @param keys: iterable of keys, e.g. trading pair ids.
+        @param args: extra arguments passed to every call.
+        @return: dict of key to response. A failed call maps to a response
+            with success set to false and the cause as error_code.
+        """
+        executor = self._get_executor()
+        futures = [(key, executor.submit(method, key, *args))
+                   for key in dict.fromkeys(keys)]
+        results = {}
+        for key, future in futures:
+            try:
+                results[key] = future.result()
+            except ExceptionCobinhood as exception:
+                results[key] = error_response(exception)
+        return results
+
+    def _bulk(self, method, calls, concurrency=None):
+        """!
+        Call an api method once per argument tuple concurrently.
+
+        @param method: bound api method.
+        @param calls: iterable of argument tuples, one per call.
+        @param concurrency: most calls in flight at once, defaults to
+            max_workers.
+        @return: list of responses in the order of calls. A failed call gets
+            a response with success set to false and the cause as
+            error_code.
+        """
+        executor = self._get_executor()
+        limit = threading.BoundedSemaphore(concurrency or self.max_workers)
+
+        def call(args):
+            try:
+                return method(*args)
+            except ExceptionCobinhood as exception:
+                return error_response(exception)
+            finally:
+                limit.release()
+
+        futures = []
+        for args in calls:
+            limit.acquire()
+            futures.append(executor.submit(call, args))
+        return [future.result() for future in futures]
+
+    def _then(self, response, convert):
+        """!
+        Apply a conversion to the response of an api method.
+
+        @param response: value returned by an api method.
+        @param convert: function applied to the response.
+        @return: converted response.
+        """
+        return convert(response)
+
+    def _paginate(self, name, result_key, params=(), limit=DEFAULT_PAGE_SIZE,
+                  prefetch=True):
+        """!
+        Lazily iterate the records of a paginated list endpoint.
+
+        Pages are requested with page and limit parameters until a short page
+        is returned, or a page starting with the same record as the previous
+        one, as endpoints ignoring page return. Only the current page and,
+        with prefetch, the next one are held in memory.
+
+        @param name: endpoint name - Ex: "get_order_history"
+        @param result_key: key of the record list in the result.
+        @param params: values of the query parameters before limit and page.
+        @param limit: number of records per page.
+        @param prefetch: fetch the next page on the worker pool while the
+            current one is consumed.
+        @return: generator of records.
+        """
+        params = tuple(params) + (limit,)
+
+        def fetch(page):
+            return self._call(name, (), params + (page,))
+
+        page = 1
+        response = fetch(page)
+        previous = None
+        while True:
+            records, previous = self._page_records(response, result_key,
+                                                   previous)
+            if records is None:
+                return
+            full = len(records) >= limit
+            future = None
+            if full and prefetch:
+                future = self._get_executor().submit(fetch, page + 1)
+            for record in records:
+                yield record
+            if not full:
+                return
+            page += 1
+            response = future.result() if future is not None else fetch(page)
+
+    @staticmethod
+    def _page_records(response, result_key, previous):
+        """!
+        Check a page of a paginated endpoint.
+
+        @param response: response for the page.
+        @param result_key: key of the record list in the result.
+        @param previous: key of the previous page, None for the first.
+        @return: (records, key of this page). records is None when the page
+            repeats the previous one, as endpoints ignoring page serve.
+        """
+        if not response.get("success"):
+            raise ExceptionCobinhood(response.get("error", response))
+        records = response["result"].get(result_key) or []
+        if not records:
+            return records, None
+        key = _page_key(records)
+        if key == previous:
+            return None, previous
+        return records, key
+
+    def close(self):
+        """!
+        Shut down the batch worker pool and close the transport.
+        """
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown()
+            self._executor = None
+        close = getattr(self.perform, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request_url(self, fn_dict, extension=None):
+        """!
+        Build the request url for an api call.
 
         @param fn_dict: dict with api_version and function name.
         @param extension: parameters to append at the end of a request.
-        @param request_type: request type [GET, PUT, POST, DEELTE].
-        @return: json response from the cobinhood exchange.
+        @return: request url.
         """
         if not fn_dict or self.api_version not in fn_dict:
             raise ExceptionCobinhood("incorrect method call")
 
-        base_url = BASE_URL_V1
-        request_url = base_url.format(version=self.api_version,
-                                      fn_call=fn_dict[self.api_version])
+        request_url = self.base_url.format(version=self.api_version,
+                                           fn_call=fn_dict[self.api_version])
 
         if extension:
             request_url += urlencode(extension)
+        return request_url
 
+    def _query_api(self, fn_dict, extension=None, request_type="get"):
+        """!
+        Function to query the cobinhood exchange.
+
+        @param fn_dict: dict with api_version and function name.
+        @param extension: parameters to append at the end of a request.
+        @param request_type: request type [GET, PUT, POST, DEELTE].
+        @return: json response from the cobinhood exchange.
+        """
+        request_url = self._request_url(fn_dict, extension)
+        return self._execute(request_url, request_type,
+                             self._cache_ttl(fn_dict, request_type),
+                             endpoint_label(fn_dict[self.api_version]))
+
+    def _call(self, name, path_args=(), query_args=(), body_args=()):
+        """!
+        Call a registered endpoint through its compiled route.
+
+        @param name: endpoint name, see cobinhood.endpoints.ENDPOINTS.
+        @param path_args: values of the path parameters.
+        @param query_args: values of the query parameters; None leaves a
+            parameter out.
+        @param body_args: values of the payload fields, sent as strings;
+            None leaves a field out.
+        @return: json response from the cobinhood exchange.
+        """
+        routes = self._routes
+        if routes is None:
+            routes = self._routes = compile_routes(self._base_url,
+                                                   self._api_version)
+        route = routes[name]
+        method = route.method
+        payload = None
+        if route.body:
+            payload = dict((field, str(value)) for field, value
+                           in zip(route.body, body_args) if value is not None)
+        return self._execute(
+            route.url(path_args, query_args), method,
+            self.cache_ttls.get(route.path) if method == "get" else None,
+            route.label, route.auth, payload)
+
+    def _execute(self, request_url, request_type, ttl, label, private=True,
+                 payload=None):
+        """!
+        Make a call, through the response cache, metrics and request
+        coalescing when they are enabled.
+
+        @param request_url: the generated url for making the api call.
+        @param request_type: request type [GET, PUT, POST, DELETE].
+        @param ttl: seconds to cache the response, None to not cache it.
+        @param label: endpoint label recorded in metrics.
+        @param private: whether the response depends on the api key.
+        @param payload: dict sent as the json body, None to send no body.
+        @return: json response from the cobinhood exchange.
+        """
+        key, response = self._cached(request_url, request_type, ttl, label,
+                                     private)
+        if response is not None:
+            return response
+        start = self._start_observation()
         try:
+            response = self._perform(request_url, request_type, private,
+                                     payload)
+        except Exception as exception:
+            error = self._failed(label, request_type, start, exception)
+            if error is exception:
+                raise
+            raise error
+        return self._completed(key, ttl, label, request_type, start, response)
+
+    def _cached(self, request_url, request_type, ttl, label, private):
+        """!
+        Look a call up in the response cache.
+
+        @return: (cache key or None when the call is not cached, cached
+            response or None).
+        """
+        if not ttl:
+            return None, None
+        key = self._cache_key(request_url, private)
+        response = self.cache.get(key)
+        if response is not None and self.metrics is not None:
+            self.metrics.observe_cache_hit(label, request_type)
+        return key, response
+
+    def _perform(self, request_url, request_type, private, payload):
+        """!
+        Hand a call to perform, through request coalescing for GET calls.
+
+        @return: what perform returns, awaited by AsyncCobinhood.
+        """
+        if self.singleflight is not None and request_type == "get":
+            return self.singleflight.do(
+                (request_type, request_url, self.api_key if private else None),
+                self.perform, request_url, self.api_key, request_type)
+        if payload is None:
             return self.perform(request_url, self.api_key, request_type)
-        except:
-            raise ExceptionCobinhood("Error: request_url is incorrect")
+        return self.perform(request_url, self.api_key, request_type, payload)
+
+    def _failed(self, label, request_type, start, exception):
+        """!
+        Record a call that raised.
+
+        @return: exception to raise: ExceptionCobinhood as is, others
+            wrapped by _transport_error.
+        """
+        if isinstance(exception, ExceptionCobinhood):
+            if start is not None:
+                self._observe(label, request_type, start,
+                              error=type(exception).__name__)
+            return exception
+        if start is not None:
+            self._observe(label, request_type, start, error="transport_error")
+        return _transport_error(exception)
+
+    def _completed(self, key, ttl, label, request_type, start, response):
+        """!
+        Record, decode and cache the response of a call.
+
+        @return: response returned to the caller.
+        """
+        if start is not None:
+            self._observe(label, request_type, start, response)
+        if self.typed:
+            response = decode_response(response)
+        if key is not None:
+            self._cache_response(key, response, ttl)
+        return response
+
+    def _start_observation(self):
+        """!
+        @return: start time of a call recorded in metrics, None when metrics
+            are disabled.
+        """
+        if self.metrics is None:
+            return None
+        take_response_size()
+        return self.metrics.timer()
+
+    def _observe(self, label, request_type, start, response=None,
+                 error=None):
+        """!
+        Record a completed call in metrics.
+
+        @param label: endpoint label.
+        @param request_type: request type [GET, PUT, POST, DELETE].
+        @param start: value returned by _start_observation.
+        @param response: response of a call that did not raise.
+        @param error: error label of a call that raised.
+        """
+        elapsed = self.metrics.timer() - start
+        size = take_response_size()
+        if isinstance(response, bytes):
+            size = len(response)
+        elif isinstance(response, dict) and not response.get("success", True):
+            cause = response.get("error")
+            error = str(cause.get("error_code") if isinstance(cause, dict)
+                        else cause)
+        self.metrics.observe(label, request_type, elapsed, size, error)
+
+    def _cache_ttl(self, fn_dict, request_type):
+        """!
+        Seconds to cache the response of a call, None for uncached calls.
+
+        @param fn_dict: dict with api_version and function name.
+        @param request_type: request type [GET, PUT, POST, DELETE].
+        """
+        if request_type != "get":
+            return None
+        return self.cache_ttls.get(fn_dict[self.api_version])
+
+    def _cache_key(self, request_url, private):
+        """!
+        Cache key of a response. Responses of endpoints that need an api key
+        are keyed by it too, so clients sharing a cache never see each
+        other's private data; the url stays the prefix for invalidate_cache.
+        """
+        if private:
+            return "{0} {1}".format(request_url, self.api_key)
+        return request_url
+
+    def _cache_response(self, key, response, ttl):
+        """!
+        Cache a successful response. Cached responses are shared between
+        callers and must not be modified.
+        """
+        if isinstance(response, dict) and response.get("success"):
+            self.cache.set(key, response, ttl)
+
+    def invalidate_cache(self, fn_call=None):
+        """!
+        Drop cached responses.
+
+        @param fn_call: drop only responses of this function - Ex:
+            "market/currencies" or "market/tickers/{trading_pair_id}".
+            Drops everything when None.
+        @return: number of responses dropped.
+        """
+        if fn_call is None:
+            return self.cache.invalidate()
+        if "{" in fn_call:
+            head = self.base_url.format(version=self.api_version,
+                                        fn_call="{fn_call}")
+            return self.cache.invalidate(head.split("{fn_call}")[0] +
+                                         fn_call.split("{")[0])
+        return self.cache.invalidate(self.base_url.format(
+            version=self.api_version, fn_call=fn_call))
+
+    def cache_stats(self):
+        """!
+        @return: dict with hits, misses, evictions, size and maxsize of the
+            response cache.
+        """
+        return self.cache.stats()
 
     def get_system_time(self):
         """!
@@ -107,8 +590,7 @@ class Cobinhood(object):
 
         @return: system time as Unix timestamp in json format.
         """
-        return self._query_api(
-            fn_dict={API_V1: "system/time"})
+        return self._call("get_system_time")
 
     def get_system_info(self):
         """!
@@ -129,8 +611,7 @@ class Cobinhood(object):
 
         @return: system information in json format.
         """
-        return self._query_api(
-            fn_dict={API_V1: "system/info"})
+        return self._call("get_system_info")
 
     def get_currencies(self):
         """!
@@ -160,8 +641,7 @@ class Cobinhood(object):
 
         @return: info of all currencies available for trading.
         """
-        return self._query_api(
-            fn_dict={API_V1: "market/currencies"})
+        return self._call("get_currencies")
 
     def get_all_trading_pairs(self):
         """!
@@ -189,8 +669,7 @@ class Cobinhood(object):
 
         @return: info for all trading pairs available.
         """
-        return self._query_api(
-            fn_dict={API_V1: "market/trading_pairs"})
+        return self._call("get_all_trading_pairs")
 
     def get_order_book(self, trading_pair_id, limit=50):
         """!
@@ -221,9 +700,7 @@ class Cobinhood(object):
             beginning from the best price for both sides.
         @return: order book for the trading pair containing all asks/bids.
         """
-        return self._query_api(
-            fn_dict={API_V1: "market/orderbooks/{0}".format(trading_pair_id)},
-            extension={"limit": limit})
+        return self._call("get_order_book", (trading_pair_id,), (limit,))
 
     def get_trading_statistics(self):
         """!
@@ -251,8 +728,7 @@ class Cobinhood(object):
 
         @return: trading statistics.
         """
-        return self._query_api(
-            fn_dict={API_V1: "market/stats"})
+        return self._call("get_trading_statistics")
 
     def get_ticker(self, trading_pair_id):
         """!
@@ -280,8 +756,7 @@ class Cobinhood(object):
         @param trading_pair_id: string literal - Ex: "BTC-USDT"
         @return: ticker for specified trading pair.
         """
-        return self._query_api(
-            fn_dict={API_V1: "market/tickers/{0}".format(trading_pair_id)})
+        return self._call("get_ticker", (trading_pair_id,))
 
     def get_recent_trades(self, trading_pair_id, limit=20):
         """!
@@ -309,9 +784,7 @@ class Cobinhood(object):
         @param limit: limits number of trades beginning from the most recent.
         @return: most recent trades for the specific trading pairs.
         """
-        return self._query_api(
-            fn_dict={API_V1: "market/trades/{0}".format(trading_pair_id)},
-            extension={"limit": limit})
+        return self._call("get_recent_trades", (trading_pair_id,), (limit,))
 
     def get_candles(self, trading_pair_id):
         """!
@@ -339,8 +812,109 @@ class Cobinhood(object):
         @param trading_pair_id: string literal - Ex: "BTC-USDT"
         @return: charting candles.
         """
-        return self._query_api(
-            fn_dict={API_V1: "chart/candles/{0}".format(trading_pair_id)})
+        return self._call("get_candles", (trading_pair_id,))
+
+    def get_order_book_arrays(self, trading_pair_id, limit=50):
+        """!
+        Get the order book as NumPy arrays. Requires numpy.
+
+        V1 path-extension: /v1/market/orderbooks/trading_pair_id [GET].
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param limit: limits number of entries of asks/bids list.
+        @return: dict with sequence, and bids and asks structured arrays
+            with float64 price, int64 count and float64 size fields.
+        """
+        return self._then(self.get_order_book(trading_pair_id, limit),
+                          order_book_to_arrays)
+
+    def get_recent_trades_array(self, trading_pair_id, limit=20):
+        """!
+        Get the most recent trades as a NumPy structured array. Requires numpy.
+
+        V1 path-extension: /v1/market/trades/<trading_pair_id> [GET].
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param limit: limits number of trades beginning from the most recent.
+        @return: array with int64 timestamp, float64 price and size, and int8
+            maker_side (+1 bid, -1 ask) fields.
+        """
+        return self._then(self.get_recent_trades(trading_pair_id, limit),
+                          trades_to_array)
+
+    def get_candles_array(self, trading_pair_id):
+        """!
+        Get charting candles as a NumPy structured array. Requires numpy.
+
+        V1 path-extension: /v1/chart/candles/<trading_pair_id> [GET].
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @return: array with int64 timestamp and float64 open, high, low,
+            close and volume fields.
+        """
+        return self._then(self.get_candles(trading_pair_id), candles_to_array)
+
+    def get_tickers(self, trading_pair_ids):
+        """!
+        Get the tickers for many trading pairs concurrently.
+
+        Runs get_ticker for every trading pair on the batch worker pool.
+
+        {
+            "BTC-USDT": {
+                "success": true,
+                "result": {
+                    "ticker": { ... }
+                }
+            },
+            "XYZ-USDT": {
+                "success": false,
+                "error": {
+                    "error_code": "Error: ReadTimeout: read timed out"
+                }
+            }
+        }
+
+        @param trading_pair_ids: list of trading pair ids - Ex: ["BTC-USDT"]
+        @return: dict of trading pair id to get_ticker response.
+        """
+        return self._fan_out(self.get_ticker, trading_pair_ids)
+
+    def get_order_books(self, trading_pair_ids, limit=50):
+        """!
+        Get order books for many trading pairs concurrently.
+
+        Runs get_order_book for every trading pair on the batch worker pool.
+
+        @param trading_pair_ids: list of trading pair ids - Ex: ["BTC-USDT"]
+        @param limit: limits number of entries of asks/bids list,
+            beginning from the best price for both sides.
+        @return: dict of trading pair id to get_order_book response.
+        """
+        return self._fan_out(self.get_order_book, trading_pair_ids, limit)
+
+    def get_recent_trades_batch(self, trading_pair_ids, limit=20):
+        """!
+        Get the most recent trades for many trading pairs concurrently.
+
+        Runs get_recent_trades for every trading pair on the batch worker pool.
+
+        @param trading_pair_ids: list of trading pair ids - Ex: ["BTC-USDT"]
+        @param limit: limits number of trades beginning from the most recent.
+        @return: dict of trading pair id to get_recent_trades response.
+        """
+        return self._fan_out(self.get_recent_trades, trading_pair_ids, limit)
+
+    def get_candles_batch(self, trading_pair_ids):
+        """!
+        Get charting candles for many trading pairs concurrently.
+
+        Runs get_candles for every trading pair on the batch worker pool.
+
+        @param trading_pair_ids: list of trading pair ids - Ex: ["BTC-USDT"]
+        @return: dict of trading pair id to get_candles response.
+        """
+        return self._fan_out(self.get_candles, trading_pair_ids)
 
     def get_order(self, order_id):
         """!
@@ -368,8 +942,7 @@ class Cobinhood(object):
         @param order_id: id of the order.
         @return: information for a single order.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/orders/{0}".format(order_id)})
+        return self._call("get_order", (order_id,))
 
     def get_trades_order(self, order_id):
         """!
@@ -396,8 +969,7 @@ class Cobinhood(object):
         @param order_id: id of the order.
         @return: trades originating from the specific order.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/orders/{0}/trades".format(order_id)})
+        return self._call("get_trades_order", (order_id,))
 
     def get_all_orders(self, limit=20):
         """!
@@ -429,11 +1001,9 @@ class Cobinhood(object):
         @param limit: limits number of orders per page.
         @return: all current orders for user.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/orders"},
-            extension={"limit": limit})
+        return self._call("get_all_orders", (), (limit,))
 
-    def place_order(self):
+    def place_order(self, trading_pair_id, side, order_type, price, size):
         """!
         Place orders to ask or bid.
 
@@ -467,11 +1037,15 @@ class Cobinhood(object):
             }
         }
 
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param side: "bid" or "ask".
+        @param order_type: "limit", "market", "stop" or "stop_limit".
+        @param price: order price, None for market orders.
+        @param size: order size.
         @return: response after the order is placed.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/orders"},
-            request_type="post")
+        return self._call("place_order", (), (),
+                          (trading_pair_id, side, order_type, price, size))
 
     def modify_order(self, order_id, price, size):
         """!
@@ -486,10 +1060,7 @@ class Cobinhood(object):
         @param order_id: id of the order.
         @return: Response after modifying an order.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/orders/{0}".format(order_id)},
-            extension={"price": price, "size": size},
-            request_type="put")
+        return self._call("modify_order", (order_id,), (price, size))
 
     def cancel_order(self, order_id):
         """!
@@ -504,9 +1075,55 @@ class Cobinhood(object):
         @param order_id: id of the order.
         @return: Response after cancelling an order.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/orders/{0}".format(order_id)},
-            request_type="delete")
+        return self._call("cancel_order", (order_id,))
+
+    def place_orders(self, orders, concurrency=None):
+        """!
+        Place many orders concurrently.
+
+        Runs place_order for every order on the batch worker pool.
+
+        @param orders: list of dicts with the place_order payload fields -
+            Ex: {"trading_pair_id": "BTC-USDT", "side": "bid",
+            "type": "limit", "price": "5000.1", "size": "1.01"}
+        @param concurrency: most orders in flight at once, defaults to
+            max_workers.
+        @return: list of place_order responses in the order of orders.
+        """
+        return self._bulk(self.place_order, [
+            (order["trading_pair_id"], order["side"], order["type"],
+             order.get("price"), order["size"]) for order in orders],
+            concurrency)
+
+    def modify_orders(self, modifications, concurrency=None):
+        """!
+        Modify many orders concurrently.
+
+        Runs modify_order for every modification on the batch worker pool.
+
+        @param modifications: list of (order_id, price, size) tuples.
+        @param concurrency: most orders in flight at once, defaults to
+            max_workers.
+        @return: list of modify_order responses in the order of
+            modifications.
+        """
+        return self._bulk(self.modify_order, [tuple(modification) for
+                                              modification in modifications],
+                          concurrency)
+
+    def cancel_orders(self, order_ids, concurrency=None):
+        """!
+        Cancel many orders concurrently.
+
+        Runs cancel_order for every order on the batch worker pool.
+
+        @param order_ids: list of order ids.
+        @param concurrency: most orders in flight at once, defaults to
+            max_workers.
+        @return: list of cancel_order responses in the order of order_ids.
+        """
+        return self._bulk(self.cancel_order,
+                          [(order_id,) for order_id in order_ids], concurrency)
 
     def get_order_history(self, limit=50):
         """!
@@ -538,9 +1155,7 @@ class Cobinhood(object):
         @param limit: limits number of orders per page.
         @return: Order history for the current user.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/order_history"},
-            extension={"limit": limit})
+        return self._call("get_order_history", (), (limit,))
 
     def get_trade(self, trade_id):
         """!
@@ -565,8 +1180,7 @@ class Cobinhood(object):
         @param trade_id: trading id.
         @return: trade information of self.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/trades/{0}".format(trade_id)})
+        return self._call("get_trade", (trade_id,))
 
     def get_trade_history(self):
         """!
@@ -593,8 +1207,7 @@ class Cobinhood(object):
 
         @return: trade history for the current user.
         """
-        return self._query_api(
-            fn_dict={API_V1: "trading/trades"})
+        return self._call("get_trade_history")
 
     def get_wallet_balances(self):
         """!
@@ -640,8 +1253,7 @@ class Cobinhood(object):
 
         @return: balances of the current user.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/balances"})
+        return self._call("get_wallet_balances")
 
     def get_ledger_entries(self, currency="", limit=20):
         """!
@@ -689,9 +1301,7 @@ class Cobinhood(object):
         @param limit: Limits number of balances per page.
         @return balance history for the current user.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/balances"},
-            extension={"currency": currency, "limit": limit})
+        return self._call("get_ledger_entries", (), (currency, limit))
 
     def get_deposit_addresses(self, currency=""):
         """!
@@ -717,9 +1327,7 @@ class Cobinhood(object):
         @param currency: currency id.
         @return Wallet Deposit Addresses.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/deposit_addresses"},
-            extension={"currency": currency})
+        return self._call("get_deposit_addresses", (), (currency,))
 
     def get_withdrawal_addresses(self, currency=""):
         """!
@@ -747,9 +1355,7 @@ class Cobinhood(object):
         @param currency: currency id.
         @return Wallet Withdrawal Addresses.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/withdrawal_addresses"},
-            extension={"currency": currency})
+        return self._call("get_withdrawal_addresses", (), (currency,))
 
     def get_withdrawal(self, withdrawal_id):
         """!
@@ -782,8 +1388,7 @@ class Cobinhood(object):
         @param withdrawal_id: Withdrawal ID.
         @return Wallet Withdrawal Information.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/withdrawals/{0}".format(withdrawal_id)})
+        return self._call("get_withdrawal", (withdrawal_id,))
 
     def get_all_withdrawals(self, currency="", status="", limit=20):
         """!
@@ -818,9 +1423,7 @@ class Cobinhood(object):
         @param limit: Limits number of withdrawals per page.
         @return All Withdrawal.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/withdrawals"},
-            extension={"currency": currency, "status": status, "limit": limit})
+        return self._call("get_all_withdrawals", (), (currency, status, limit))
 
     def get_deposit(self, deposit_id):
         """!
@@ -851,8 +1454,7 @@ class Cobinhood(object):
         @param deposit_id: Deposit ID.
         @return Wallet Deposit Information.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/deposits/{0}".format(deposit_id)})
+        return self._call("get_deposit", (deposit_id,))
 
     def get_all_deposits(self):
         """!
@@ -885,26 +1487,89 @@ class Cobinhood(object):
 
         @return All Deposit.
         """
-        return self._query_api(
-            fn_dict={API_V1: "wallet/deposits"})
+        return self._call("get_all_deposits")
 
+    def iter_order_history(self, limit=DEFAULT_PAGE_SIZE, prefetch=True):
+        """!
+        Iterate the whole order history for the current user, page by page.
 
-class ExceptionCobinhood(Exception):
-    """!
-    Cobinhood api error exceptions.
-    """
+        V1 path-extension: /v1/trading/order_history [GET].
+
+        @param limit: number of orders per page.
+        @param prefetch: fetch the next page while the current one is consumed.
+        @return: generator of orders as returned by get_order_history.
+        """
+        return self._paginate("get_order_history", "orders",
+                              limit=limit, prefetch=prefetch)
 
-    def __init__(self, cause):
+    def iter_all_orders(self, limit=DEFAULT_PAGE_SIZE, prefetch=True):
         """!
-        class Initializer.
+        Iterate all current orders for user, page by page.
+
+        V1 path-extension: /v1/trading/orders [GET].
+
+        @param limit: number of orders per page.
+        @param prefetch: fetch the next page while the current one is consumed.
+        @return: generator of orders as returned by get_all_orders.
+        """
+        return self._paginate("get_all_orders", "orders",
+                              limit=limit, prefetch=prefetch)
+
+    def iter_trade_history(self, limit=DEFAULT_PAGE_SIZE, prefetch=True):
+        """!
+        Iterate the whole trade history for the current user, page by page.
+
+        V1 path-extension: /v1/trading/trades [GET].
+
+        @param limit: number of trades per page.
+        @param prefetch: fetch the next page while the current one is consumed.
+        @return: generator of trades as returned by get_trade_history.
+        """
+        return self._paginate("get_trade_history", "trades",
+                              limit=limit, prefetch=prefetch)
+
+    def iter_ledger_entries(self, currency="", limit=DEFAULT_PAGE_SIZE,
+                            prefetch=True):
+        """!
+        Iterate the whole balance history for the current user, page by page.
+
+        V1 path-extension: /v1/wallet/ledger [GET].
+
+        @param currency: currency id.
+        @param limit: number of entries per page.
+        @param prefetch: fetch the next page while the current one is consumed.
+        @return: generator of ledger entries as returned by get_ledger_entries.
+        """
+        return self._paginate("get_ledger_entries", "ledger", (currency,),
+                              limit=limit, prefetch=prefetch)
+
+    def iter_withdrawals(self, currency="", status="", limit=DEFAULT_PAGE_SIZE,
+                         prefetch=True):
+        """!
+        Iterate all withdrawals, page by page.
+
+        V1 path-extension: /v1/wallet/withdrawals [GET].
+
+        @param currency: Currency ID.
+        @param status: Status of withdrawal.
+        @param limit: number of withdrawals per page.
+        @param prefetch: fetch the next page while the current one is consumed.
+        @return: generator of withdrawals.
         """
-        super(ExceptionCobinhood, self).__init__()
-        self.cause = cause
+        return self._paginate("get_all_withdrawals", "withdrawals",
+                              (currency, status), limit=limit,
+                              prefetch=prefetch)
 
-    def __str__(self):
+    def iter_deposits(self, limit=DEFAULT_PAGE_SIZE, prefetch=True):
         """!
-        return the cause of cobinhood exception as a string.
+        Iterate all deposits, page by page.
+
+        V1 path-extension: /v1/wallet/deposits [GET].
 
-        @return: cause of the exception as a string.
+        @param limit: number of deposits per page.
+        @param prefetch: fetch the next page while the current one is consumed.
+        @return: generator of deposits as returned by get_all_deposits.
         """
-        return str(self.cause)
+        return self._paginate("get_all_deposits", "deposits",
+                              limit=limit, prefetch=prefetch)
+
@@ -0,0 +1,125 @@
+"""!
+@file       columnar.py
+
+@brief      Columnar NumPy decoding of candles, trades and order book levels.
+@author     Sachin Jayaram
+@date       2/2018
+
+NumPy is optional; it is imported when one of these functions is first
+called.
+"""
+
+from operator import attrgetter, itemgetter
+
+from .exceptions import ExceptionCobinhood
+
+# Set by _require_numpy on first use, so importing cobinhood stays fast.
+numpy = None
+
+CANDLE_DTYPE = [("timestamp", "i8"), ("open", "f8"), ("high", "f8"),
+                ("low", "f8"), ("close", "f8"), ("volume", "f8")]
+
+# maker_side is +1 for bid/buy and -1 for ask/sell.
+TRADE_DTYPE = [("timestamp", "i8"), ("price", "f8"), ("size", "f8"),
+               ("maker_side", "i1")]
+
+LEVEL_DTYPE = [("price", "f8"), ("count", "i8"), ("size", "f8")]
+
+
+def _require_numpy():
+    """!
+    Import numpy on first use.
+    """
+    global numpy
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ExceptionCobinhood("numpy is required for columnar results")
+
+
+def _records(response, key):
+    """!
+    Extract the record list from a response, or accept the list itself.
+    """
+    if isinstance(response, dict):
+        if not response.get("success", True):
+            raise ExceptionCobinhood(response.get("error", response))
+        response = response.get("result", response)
+        if isinstance(response, dict):
+            response = response.get(key, ())
+    return response
+
+
+def _getter(records, field):
+    if records and not isinstance(records[0], dict):
+        return attrgetter(field)
+    return itemgetter(field)
+
+
+def _column(records, field, dtype):
+    """!
+    One column of a record list as an array, converted in C without a
+    Python float per row.
+    """
+    return numpy.array(list(map(_getter(records, field), records)), dtype=dtype)
+
+
+def candles_to_array(response):
+    """!
+    Decode candles into a structured array.
+
+    @param response: get_candles response, or its list of candles.
+    @return: array of CANDLE_DTYPE, one row per candle.
+    """
+    _require_numpy()
+    candles = _records(response, "candles")
+    out = numpy.empty(len(candles), dtype=CANDLE_DTYPE)
+    for name, dtype in CANDLE_DTYPE:
+        out[name] = _column(candles, name, numpy.float64 if dtype == "f8"
+                            else numpy.int64)
+    return out
+
+
+def trades_to_array(response):
+    """!
+    Decode trades into a structured array.
+
+    @param response: get_recent_trades or get_trade_history response, or a
+        list of trades.
+    @return: array of TRADE_DTYPE, one row per trade.
+    """
+    _require_numpy()
+    trades = _records(response, "trades")
+    out = numpy.empty(len(trades), dtype=TRADE_DTYPE)
+    out["timestamp"] = _column(trades, "timestamp", numpy.int64)
+    out["price"] = _column(trades, "price", numpy.float64)
+    out["size"] = _column(trades, "size", numpy.float64)
+    sides = _column(trades, "maker_side", "U4")
+    out["maker_side"] = numpy.where((sides == "bid") | (sides == "buy"), 1, -1)
+    return out
+
+
+def _levels_to_array(rows):
+    out = numpy.empty(len(rows), dtype=LEVEL_DTYPE)
+    if rows:
+        table = numpy.array(rows, dtype=numpy.float64)
+        out["price"] = table[:, 0]
+        out["count"] = table[:, 1]
+        out["size"] = table[:, 2]
+    return out
+
+
+def order_book_to_arrays(response):
+    """!
+    Decode an order book into one structured array per side.
+
+    @param response: get_order_book response, or its "orderbook" object.
+    @return: dict with sequence, and bids and asks arrays of LEVEL_DTYPE in
+        the order returned by the exchange (best price first).
+    """
+    _require_numpy()
+    book = _records(response, "orderbook")
+    return {"sequence": book.get("sequence"),
+            "bids": _levels_to_array(book.get("bids") or []),
+            "asks": _levels_to_array(book.get("asks") or [])}
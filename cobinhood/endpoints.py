@@ -0,0 +1,219 @@
+"""!
+@file       endpoints.py
+
+@brief      Registry of cobinhood api endpoints and precompiled url builders.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import re
+from collections import OrderedDict
+
+try:
+    from urllib import quote_plus
+except ImportError:
+    from urllib.parse import quote_plus
+
+from .exceptions import ExceptionCobinhood
+from .metrics import endpoint_label
+
+API_V1 = "v1"
+
+_PLACEHOLDER = re.compile(r"{(\w+)}")
+
+
+class Endpoint(object):
+    """!
+    Declarative description of an api endpoint.
+    """
+
+    __slots__ = ("name", "path", "method", "auth", "params", "body",
+                 "path_params")
+
+    def __init__(self, name, path, method="get", auth=False, params=(),
+                 body=()):
+        """!
+        Endpoint initialization.
+
+        @param name: name of the Cobinhood method calling the endpoint.
+        @param path: function name with {name} placeholders for path
+            parameters - Ex: "market/orderbooks/{trading_pair_id}"
+        @param method: request type [get, post, put, delete].
+        @param auth: whether the endpoint needs an api key.
+        @param params: names of the query parameters, in url order.
+        @param body: names of the fields of the json payload.
+        """
+        self.name = name
+        self.path = path
+        self.method = method
+        self.auth = auth
+        self.params = tuple(params)
+        self.body = tuple(body)
+        self.path_params = tuple(_PLACEHOLDER.findall(path))
+
+
+def _registry(*endpoints):
+    return OrderedDict((endpoint.name, endpoint) for endpoint in endpoints)
+
+
+# Endpoints of each api version by method name. Paginated endpoints take
+# page as their last query parameter; a parameter or payload field passed as
+# None is left out.
+ENDPOINTS = {
+    API_V1: _registry(
+        Endpoint("get_system_time", "system/time"),
+        Endpoint("get_system_info", "system/info"),
+        Endpoint("get_currencies", "market/currencies"),
+        Endpoint("get_all_trading_pairs", "market/trading_pairs"),
+        Endpoint("get_order_book", "market/orderbooks/{trading_pair_id}",
+                 params=("limit",)),
+        Endpoint("get_trading_statistics", "market/stats"),
+        Endpoint("get_ticker", "market/tickers/{trading_pair_id}"),
+        Endpoint("get_recent_trades", "market/trades/{trading_pair_id}",
+                 params=("limit",)),
+        Endpoint("get_candles", "chart/candles/{trading_pair_id}"),
+        Endpoint("get_order", "trading/orders/{order_id}", auth=True),
+        Endpoint("get_trades_order", "trading/orders/{order_id}/trades",
+                 auth=True),
+        Endpoint("get_all_orders", "trading/orders", auth=True,
+                 params=("limit", "page")),
+        Endpoint("place_order", "trading/orders", "post", auth=True,
+                 body=("trading_pair_id", "side", "type", "price", "size")),
+        Endpoint("modify_order", "trading/orders/{order_id}", "put",
+                 auth=True, params=("price", "size")),
+        Endpoint("cancel_order", "trading/orders/{order_id}", "delete",
+                 auth=True),
+        Endpoint("get_order_history", "trading/order_history", auth=True,
+                 params=("limit", "page")),
+        Endpoint("get_trade", "trading/trades/{trade_id}", auth=True),
+        Endpoint("get_trade_history", "trading/trades", auth=True,
+                 params=("limit", "page")),
+        Endpoint("get_wallet_balances", "wallet/balances", auth=True),
+        Endpoint("get_ledger_entries", "wallet/ledger", auth=True,
+                 params=("currency", "limit", "page")),
+        Endpoint("get_deposit_addresses", "wallet/deposit_addresses",
+                 auth=True, params=("currency",)),
+        Endpoint("get_withdrawal_addresses", "wallet/withdrawal_addresses",
+                 auth=True, params=("currency",)),
+        Endpoint("get_withdrawal", "wallet/withdrawals/{withdrawal_id}",
+                 auth=True),
+        Endpoint("get_all_withdrawals", "wallet/withdrawals", auth=True,
+                 params=("currency", "status", "limit", "page")),
+        Endpoint("get_deposit", "wallet/deposits/{deposit_id}", auth=True),
+        Endpoint("get_all_deposits", "wallet/deposits", auth=True,
+                 params=("limit", "page")),
+    ),
+}
+
+
+def _encode(value):
+    """!
+    Encode a query value the way urlencode does.
+    """
+    if value.__class__ is int:
+        return str(value)
+    return quote_plus(str(value))
+
+
+class Route(object):
+    """!
+    An endpoint compiled for one base url and api version.
+
+    The url of a call is built by a function chosen when the route is
+    compiled, so a call only formats its path parameters and encodes its
+    query values.
+    """
+
+    __slots__ = ("endpoint", "path", "method", "auth", "body", "label", "url")
+
+    def __init__(self, endpoint, base_url, api_version):
+        """!
+        Route initialization.
+
+        @param endpoint: Endpoint to compile.
+        @param base_url: url template with version and fn_call fields.
+        @param api_version: api version the endpoint belongs to.
+        """
+        self.endpoint = endpoint
+        self.path = endpoint.path
+        self.method = endpoint.method
+        self.auth = endpoint.auth
+        self.body = endpoint.body
+        self.label = endpoint_label(endpoint.path)
+        self.url = self._compile(base_url.format(version=api_version,
+                                                 fn_call="{fn_call}"))
+
+    def _compile(self, base):
+        """!
+        @param base: url template with only the fn_call field left.
+        @return: function of (path_args, query_args) returning the url.
+        """
+        head, tail = base.split("{fn_call}", 1)
+        endpoint = self.endpoint
+        if endpoint.path_params:
+            template = (_escape(head) +
+                        _positional(_PLACEHOLDER.split(endpoint.path)) +
+                        _escape(tail))
+            path = template.format
+        else:
+            constant = head + endpoint.path + tail
+            path = None
+        names = tuple(name + "=" for name in endpoint.params)
+
+        if not names:
+            if path is None:
+                return lambda path_args=(), query_args=(): constant
+            return lambda path_args=(), query_args=(): path(*path_args)
+
+        def url(path_args=(), query_args=()):
+            query = "&".join([name + _encode(value) for name, value
+                              in zip(names, query_args) if value is not None])
+            return (constant if path is None else path(*path_args)) + query
+        return url
+
+
+def _positional(pieces):
+    """!
+    Join the pieces of a path split on its placeholders, with positional
+    fields for the placeholders.
+
+    @param pieces: result of _PLACEHOLDER.split on the path; odd items are
+        placeholder names.
+    @return: str.format template.
+    """
+    out = []
+    for index, piece in enumerate(pieces):
+        if index % 2:
+            out.append("{" + str(index // 2) + "}")
+        else:
+            out.append(_escape(piece))
+    return "".join(out)
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+# Compiled routes by (base_url, api_version), shared by every client.
+_COMPILED = {}
+
+
+def compile_routes(base_url, api_version):
+    """!
+    Compile every endpoint of an api version.
+
+    Routes are compiled once per base url and api version; clients using
+    the same ones share them.
+
+    @param base_url: url template with version and fn_call fields.
+    @param api_version: api version.
+    @return: dict of method name to Route, not to be modified.
+    """
+    routes = _COMPILED.get((base_url, api_version))
+    if routes is None:
+        if api_version not in ENDPOINTS:
+            raise ExceptionCobinhood("incorrect method call")
+        routes = _COMPILED[(base_url, api_version)] = dict(
+            (name, Route(endpoint, base_url, api_version))
+            for name, endpoint in ENDPOINTS[api_version].items())
+    return routes
@@ -0,0 +1,47 @@
+"""!
+@file       exceptions.py
+
+@brief      Exceptions raised by the cobinhood api wrapper.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+
+class ExceptionCobinhood(Exception):
+    """!
+    Cobinhood api error exceptions.
+    """
+
+    def __init__(self, cause):
+        """!
+        class Initializer.
+        """
+        super(ExceptionCobinhood, self).__init__()
+        self.cause = cause
+
+    def __str__(self):
+        """!
+        return the cause of cobinhood exception as a string.
+
+        @return: cause of the exception as a string.
+        """
+        return str(self.cause)
+
+
+class DeadlineExceeded(ExceptionCobinhood):
+    """!
+    Raised when a queued request is dropped because it waited past its deadline.
+    """
+
+
+class RetryableError(ExceptionCobinhood):
+    """!
+    Raised for transient failures, e.g. a connection reset or a timeout, that
+    may succeed when the call is repeated.
+    """
+
+
+class FatalError(ExceptionCobinhood):
+    """!
+    Raised for failures that repeating the call cannot fix.
+    """
@@ -0,0 +1,226 @@
+"""!
+@file       metrics.py
+
+@brief      Per-endpoint call metrics for the cobinhood api wrapper.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+_timer = getattr(time, "perf_counter", time.time)
+
+_sizes = threading.local()
+
+
+def record_response_size(size):
+    """!
+    Note the body size of the response a transport is about to return, so
+    the client can attribute it to the endpoint being called.
+
+    @param size: response body size in bytes.
+    """
+    _sizes.size = size
+
+
+def take_response_size():
+    """!
+    @return: body size noted by the last transport call on this thread, or
+        None when the transport did not note one.
+    """
+    size = getattr(_sizes, "size", None)
+    _sizes.size = None
+    return size
+
+
+def endpoint_label(fn_call):
+    """!
+    Endpoint name of a function call with its resource id replaced, so that
+    calls for different ids share one set of metrics.
+
+    @param fn_call: function name - Ex: "trading/orders/abc/trades"
+    @return: label - Ex: "trading/orders/{id}/trades"
+    """
+    segments = fn_call.split("/")
+    if len(segments) > 2:
+        segments[2] = "{id}"
+        return "/".join(segments)
+    return fn_call
+
+
+class _EndpointStats(object):
+    """!
+    Counters of one (endpoint, method) pair.
+    """
+
+    __slots__ = ("count", "errors", "cache_hits", "latency_sum", "buckets",
+                 "response_bytes", "sized")
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.errors = {}
+        self.cache_hits = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (bucket_count + 1)
+        self.response_bytes = 0
+        self.sized = 0
+
+
+class Metrics(object):
+    """!
+    Thread-safe registry of call counts, errors, latency histograms and
+    response sizes keyed by endpoint and request type.
+
+    Pass an instance, or True for a new one, as the metrics argument of
+    Cobinhood. Several clients may share one instance.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, timer=_timer):
+        """!
+        Metrics initialization.
+
+        @param buckets: increasing upper bounds in seconds of the latency
+            histogram buckets; a last +Inf bucket is implied.
+        @param timer: clock returning seconds.
+        """
+        self.buckets = tuple(buckets)
+        self.timer = timer
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint, method):
+        key = (endpoint, method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _EndpointStats(len(self.buckets))
+        return stats
+
+    def observe(self, endpoint, method, seconds, size=None, error=None):
+        """!
+        Record a completed call.
+
+        @param endpoint: endpoint label, see endpoint_label.
+        @param method: request type [get, post, put, delete].
+        @param seconds: call duration.
+        @param size: response body size in bytes, None when unknown.
+        @param error: error code of a failed call, None on success.
+        """
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats = self._get(endpoint, method)
+            stats.count += 1
+            stats.latency_sum += seconds
+            stats.buckets[index] += 1
+            if size is not None:
+                stats.response_bytes += size
+                stats.sized += 1
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def observe_cache_hit(self, endpoint, method):
+        """!
+        Record a call answered from the response cache.
+        """
+        with self._lock:
+            self._get(endpoint, method).cache_hits += 1
+
+    def reset(self):
+        """!
+        Drop every recorded value.
+        """
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """!
+        @return: dict of endpoint to dict of method to a dict with count,
+            errors (dict of error code to count), cache_hits, latency_sum,
+            latency_mean, latency_buckets (list of (upper bound, cumulative
+            count) with None for +Inf), response_bytes and sized (calls
+            whose size is known).
+        """
+        result = {}
+        with self._lock:
+            for (endpoint, method), stats in self._stats.items():
+                cumulative, buckets = 0, []
+                for bound, count in zip(self.buckets + (None,), stats.buckets):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                result.setdefault(endpoint, {})[method] = {
+                    "count": stats.count,
+                    "errors": dict(stats.errors),
+                    "cache_hits": stats.cache_hits,
+                    "latency_sum": stats.latency_sum,
+                    "latency_mean": stats.latency_sum / stats.count
+                    if stats.count else None,
+                    "latency_buckets": buckets,
+                    "response_bytes": stats.response_bytes,
+                    "sized": stats.sized,
+                }
+        return result
+
+    def to_prometheus(self, prefix="cobinhood"):
+        """!
+        Render the metrics in the Prometheus text exposition format.
+
+        @param prefix: metric name prefix.
+        @return: exposition text.
+        """
+        snapshot = self.snapshot()
+        rows = sorted((endpoint, method, stats)
+                      for endpoint, methods in snapshot.items()
+                      for method, stats in methods.items())
+        lines = []
+
+        def family(name, kind, doc):
+            lines.append("# HELP {0}_{1} {2}".format(prefix, name, doc))
+            lines.append("# TYPE {0}_{1} {2}".format(prefix, name, kind))
+
+        def sample(name, labels, value):
+            lines.append("{0}_{1}{{{2}}} {3}".format(
+                prefix, name, ",".join('{0}="{1}"'.format(key, _escape(label))
+                                       for key, label in labels), value))
+
+        family("requests_total", "counter", "Api calls sent to the exchange.")
+        for endpoint, method, stats in rows:
+            sample("requests_total", (("endpoint", endpoint),
+                                      ("method", method)), stats["count"])
+        family("errors_total", "counter", "Failed api calls by error code.")
+        for endpoint, method, stats in rows:
+            for error, count in sorted(stats["errors"].items()):
+                sample("errors_total", (("endpoint", endpoint),
+                                        ("method", method),
+                                        ("error", error)), count)
+        family("cache_hits_total", "counter",
+               "Api calls answered from the response cache.")
+        for endpoint, method, stats in rows:
+            sample("cache_hits_total", (("endpoint", endpoint),
+                                        ("method", method)),
+                   stats["cache_hits"])
+        family("request_duration_seconds", "histogram",
+               "Api call latency in seconds.")
+        for endpoint, method, stats in rows:
+            labels = (("endpoint", endpoint), ("method", method))
+            for bound, count in stats["latency_buckets"]:
+                sample("request_duration_seconds_bucket", labels + (
+                    ("le", "+Inf" if bound is None else repr(bound)),), count)
+            sample("request_duration_seconds_sum", labels,
+                   repr(stats["latency_sum"]))
+            sample("request_duration_seconds_count", labels, stats["count"])
+        family("response_bytes_total", "counter",
+               "Response body bytes received.")
+        for endpoint, method, stats in rows:
+            sample("response_bytes_total", (("endpoint", endpoint),
+                                            ("method", method)),
+                   stats["response_bytes"])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,236 @@
+"""!
+@file       models.py
+
+@brief      Compact typed records for cobinhood api results.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+from decimal import Decimal
+
+
+class LazyDecimal(object):
+    """!
+    Descriptor exposing a numeric string field as a Decimal.
+
+    The slot holds the raw string until the first access, which parses it
+    and caches the Decimal in the same slot.
+    """
+
+    __slots__ = ("slot",)
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if value is not None and value.__class__ is not Decimal:
+            value = Decimal(value)
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
+
+class Record(object):
+    """!
+    Base class of typed records, built from and convertible to result dicts.
+
+    Subclasses are created with make_record. Missing keys become None and
+    keys without a field are ignored.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _keys = ()
+    _slots = ()
+
+    def __init__(self, **fields):
+        for name, slot in zip(self._fields, self._slots):
+            setattr(self, slot, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, data):
+        """!
+        Build a record from a result dict.
+
+        @param data: dict as returned by the api.
+        @return: record instance.
+        """
+        record = cls.__new__(cls)
+        get = data.get
+        for key, slot in zip(cls._keys, cls._slots):
+            setattr(record, slot, get(key))
+        return record
+
+    def to_dict(self):
+        """!
+        @return: dict with the api keys and the field values.
+        """
+        return dict((key, getattr(self, name))
+                    for key, name in zip(self._keys, self._fields))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{0}({1})".format(type(self).__name__, ", ".join(
+            "{0}={1!r}".format(name, getattr(self, name))
+            for name in self._fields))
+
+
+def make_record(name, fields, decimals=(), doc=None):
+    """!
+    Create a Record subclass.
+
+    @param name: class name.
+    @param fields: field names; a (name, key) pair maps an api key that is
+        not a valid identifier - Ex: ("high_24h", "24h_high")
+    @param decimals: names of fields parsed lazily as Decimal.
+    @param doc: class docstring.
+    @return: the new class.
+    """
+    names, keys = [], []
+    for field in fields:
+        field_name, key = field if isinstance(field, tuple) else (field, field)
+        names.append(field_name)
+        keys.append(key)
+    slots = tuple("_" + field_name if field_name in decimals else field_name
+                  for field_name in names)
+    namespace = {"__slots__": slots, "_fields": tuple(names),
+                 "_keys": tuple(keys), "_slots": slots, "__doc__": doc}
+    for field_name in decimals:
+        namespace[field_name] = LazyDecimal("_" + field_name)
+    return type(name, (Record,), namespace)
+
+
+Trade = make_record(
+    "Trade",
+    ("id", "trading_pair_id", "price", "size", "maker_side", "timestamp"),
+    decimals=("price", "size"),
+    doc="Trade returned by get_recent_trades, get_trade and get_trade_history.")
+
+Order = make_record(
+    "Order",
+    ("id", "trading_pair", "state", "side", "type", "price", "size", "filled",
+     "timestamp", "eq_price"),
+    decimals=("price", "size", "filled", "eq_price"),
+    doc="Order returned by get_order, get_all_orders and get_order_history.")
+
+Ticker = make_record(
+    "Ticker",
+    ("trading_pair_id", "timestamp", ("high_24h", "24h_high"),
+     ("low_24h", "24h_low"), ("open_24h", "24h_open"),
+     ("volume_24h", "24h_volume"), "last_trade_price", "highest_bid",
+     "lowest_ask"),
+    decimals=("high_24h", "low_24h", "open_24h", "volume_24h",
+              "last_trade_price", "highest_bid", "lowest_ask"),
+    doc="Ticker returned by get_ticker.")
+
+Candle = make_record(
+    "Candle",
+    ("timestamp", "open", "close", "high", "low", "volume"),
+    decimals=("open", "close", "high", "low", "volume"),
+    doc="Candle returned by get_candles.")
+
+Balance = make_record(
+    "Balance",
+    ("currency", "type", "total", "on_order", "locked", "usd_value",
+     "btc_value"),
+    decimals=("total", "on_order", "usd_value", "btc_value"),
+    doc="Balance returned by get_wallet_balances.")
+
+LedgerEntry = make_record(
+    "LedgerEntry",
+    ("action", "type", "trade_id", "deposit_id", "withdrawal_id", "currency",
+     "amount", "balance", "timestamp"),
+    decimals=("amount", "balance"),
+    doc="Ledger entry returned by get_ledger_entries.")
+
+Currency = make_record(
+    "Currency",
+    ("currency", "name", "min_unit", "deposit_fee", "withdrawal_fee", "type",
+     "is_active", "funding_frozen"),
+    decimals=("min_unit", "deposit_fee", "withdrawal_fee"),
+    doc="Currency returned by get_currencies.")
+
+TradingPair = make_record(
+    "TradingPair",
+    ("id", "base_currency_id", "quote_currency_id", "base_min_size",
+     "base_max_size", "quote_increment"),
+    decimals=("base_min_size", "base_max_size", "quote_increment"),
+    doc="Trading pair returned by get_all_trading_pairs.")
+
+Deposit = make_record(
+    "Deposit",
+    ("deposit_id", "user_id", "status", "confirmations",
+     "required_confirmations", "created_at", "completed_at", "from_address",
+     "txhash", "currency", "amount", "fee"),
+    decimals=("amount", "fee"),
+    doc="Deposit returned by get_deposit and get_all_deposits.")
+
+Withdrawal = make_record(
+    "Withdrawal",
+    ("withdrawal_id", "user_id", "status", "confirmations",
+     "required_confirmations", "created_at", "sent_at", "completed_at",
+     "updated_at", "to_address", "txhash", "currency", "amount", "fee"),
+    decimals=("amount", "fee"),
+    doc="Withdrawal returned by get_withdrawal and get_all_withdrawals.")
+
+# Record class for each result key holding a record or a list of records.
+RESULT_MODELS = {
+    "trade": Trade,
+    "trades": Trade,
+    "order": Order,
+    "orders": Order,
+    "ticker": Ticker,
+    "candles": Candle,
+    "balances": Balance,
+    "ledger": LedgerEntry,
+    "currencies": Currency,
+    "trading_pairs": TradingPair,
+    "deposit": Deposit,
+    "deposits": Deposit,
+    "withdrawal": Withdrawal,
+    "withdrawals": Withdrawal,
+}
+
+
+def decode_response(response):
+    """!
+    Replace known records in a response with typed records.
+
+    The response itself is not modified; a new envelope and result dict
+    are returned when anything was converted.
+
+    @param response: json response from the cobinhood exchange.
+    @return: response with records as Record instances.
+    """
+    if not isinstance(response, dict):
+        return response
+    result = response.get("result")
+    if not isinstance(result, dict):
+        return response
+    decoded = None
+    for key, value in result.items():
+        model = RESULT_MODELS.get(key)
+        if model is None:
+            continue
+        if decoded is None:
+            decoded = dict(result)
+        if isinstance(value, list):
+            decoded[key] = [model.from_dict(item) for item in value]
+        elif isinstance(value, dict):
+            decoded[key] = model.from_dict(value)
+    if decoded is None:
+        return response
+    return dict(response, result=decoded)
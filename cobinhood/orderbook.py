@@ -0,0 +1,201 @@
+"""!
+@file       orderbook.py
+
+@brief      Local order book replica kept in sync with the cobinhood exchange.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+from bisect import bisect_left
+from decimal import Decimal
+
+from .exceptions import ExceptionCobinhood
+
+BID = "bid"
+ASK = "ask"
+
+
+class _BookSide(object):
+    """!
+    Price levels of one side of the book in a sorted array.
+
+    Keys are kept ascending with the best price last, so the best level is
+    read in O(1) and the updates that cluster around the top of the book
+    move few elements. Asks are keyed by the negated price to get there.
+    """
+
+    __slots__ = ("keys", "levels", "sign")
+
+    def __init__(self, sign):
+        self.keys = []
+        self.levels = []
+        self.sign = sign
+
+    def load(self, rows):
+        levels = sorted(([Decimal(price), int(count), Decimal(size)]
+                         for price, count, size in rows),
+                        key=lambda level: self.sign * level[0])
+        self.levels = levels
+        self.keys = [self.sign * level[0] for level in levels]
+
+    def apply(self, price, count, size):
+        price = Decimal(price)
+        key = self.sign * price
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            level = self.levels[index]
+            level[1] += int(count)
+            level[2] += Decimal(size)
+            if level[1] <= 0 or level[2] <= 0:
+                del self.keys[index]
+                del self.levels[index]
+        elif int(count) > 0 and Decimal(size) > 0:
+            self.keys.insert(index, key)
+            self.levels.insert(index, [price, int(count), Decimal(size)])
+
+    def best(self):
+        return tuple(self.levels[-1]) if self.levels else None
+
+    def find(self, price):
+        key = self.sign * Decimal(price)
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            return tuple(self.levels[index])
+        return None
+
+    def top(self, depth=None):
+        stop = -depth - 1 if depth is not None else None
+        return [tuple(level) for level in self.levels[:stop:-1]]
+
+
+class OrderBook(object):
+    """!
+    Order book for one trading pair, updated in place from snapshots and diffs.
+
+    Levels are (price, count, size) tuples of Decimal, int and Decimal.
+    Diffs carry the change in count and size at a price; a level whose
+    count or size drops to zero is removed. Every diff must carry the
+    sequence following the current one, otherwise the book resyncs from a
+    fresh get_order_book snapshot.
+    """
+
+    def __init__(self, trading_pair_id=None, client=None, limit=50):
+        """!
+        OrderBook initialization.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param client: Cobinhood instance used to fetch snapshots on resync.
+        @param limit: number of levels per side requested on resync.
+        """
+        self.trading_pair_id = trading_pair_id
+        self.client = client
+        self.limit = limit
+        self.sequence = None
+        self.resync_count = 0
+        self._sides = {BID: _BookSide(1), ASK: _BookSide(-1)}
+
+    def apply_snapshot(self, orderbook):
+        """!
+        Replace the book with a snapshot.
+
+        @param orderbook: the "orderbook" object of a get_order_book result,
+            with sequence, bids and asks.
+        """
+        self._sides[BID].load(orderbook.get("bids", ()))
+        self._sides[ASK].load(orderbook.get("asks", ()))
+        self.sequence = int(orderbook["sequence"])
+
+    def apply_update(self, sequence, bids=(), asks=()):
+        """!
+        Apply a diff to the book.
+
+        @param sequence: sequence number of the diff.
+        @param bids: list of [price, count, size] changes on the bid side.
+        @param asks: list of [price, count, size] changes on the ask side.
+        @return: True if the diff was applied, False if it was already
+            covered by the current snapshot.
+        """
+        sequence = int(sequence)
+        if self.sequence is None or sequence > self.sequence + 1:
+            self.resync()
+        if sequence <= self.sequence:
+            return False
+        if sequence != self.sequence + 1:
+            raise ExceptionCobinhood(
+                "order book sequence gap: {0} after {1}".format(
+                    sequence, self.sequence))
+        bid_side = self._sides[BID]
+        for price, count, size in bids:
+            bid_side.apply(price, count, size)
+        ask_side = self._sides[ASK]
+        for price, count, size in asks:
+            ask_side.apply(price, count, size)
+        self.sequence = sequence
+        return True
+
+    def resync(self):
+        """!
+        Reload the book from a get_order_book snapshot.
+        """
+        if self.client is None or self.trading_pair_id is None:
+            raise ExceptionCobinhood("order book out of sync and no client to resync")
+        response = self.client.get_order_book(self.trading_pair_id, self.limit)
+        if not response.get("success"):
+            raise ExceptionCobinhood("order book resync failed")
+        self.apply_snapshot(response["result"]["orderbook"])
+        self.resync_count += 1
+
+    def best_bid(self):
+        """!
+        @return: highest bid level or None.
+        """
+        return self._sides[BID].best()
+
+    def best_ask(self):
+        """!
+        @return: lowest ask level or None.
+        """
+        return self._sides[ASK].best()
+
+    def spread(self):
+        """!
+        @return: lowest ask minus highest bid, or None for a one-sided book.
+        """
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def level(self, side, price):
+        """!
+        Look up a price level.
+
+        @param side: "bid" or "ask".
+        @param price: price of the level.
+        @return: the level or None.
+        """
+        return self._sides[side].find(price)
+
+    def bids(self, depth=None):
+        """!
+        @param depth: number of levels, all when None.
+        @return: bid levels from the best price down.
+        """
+        return self._sides[BID].top(depth)
+
+    def asks(self, depth=None):
+        """!
+        @param depth: number of levels, all when None.
+        @return: ask levels from the best price up.
+        """
+        return self._sides[ASK].top(depth)
+
+    def depth_size(self, side, depth):
+        """!
+        @param side: "bid" or "ask".
+        @param depth: number of levels from the best price.
+        @return: total size of those levels.
+        """
+        levels = self._sides[side].levels
+        return sum((level[2] for level in levels[max(len(levels) - depth, 0):]),
+                   Decimal(0))
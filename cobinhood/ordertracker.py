@@ -0,0 +1,253 @@
+"""!
+@file       ordertracker.py
+
+@brief      Local view of open orders kept in sync by adaptive polling.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from .cobinhood import DEFAULT_PAGE_SIZE
+from .exceptions import ExceptionCobinhood
+
+logger = logging.getLogger(__name__)
+
+NEW = "new"
+PARTIALLY_FILLED = "partially_filled"
+FILLED = "filled"
+CANCELLED = "cancelled"
+
+# kind is one of the constants above. order is the latest state of the order
+# and previous the one before the change, None for new orders. trades are the
+# get_trades_order trades of orders whose filled size changed, else None.
+OrderEvent = namedtuple("OrderEvent",
+                        ["kind", "order_id", "order", "previous", "trades"])
+
+DEFAULT_MIN_INTERVAL = 0.25
+DEFAULT_MAX_INTERVAL = 5.0
+DEFAULT_BACKOFF = 2.0
+
+_timer = getattr(time, "monotonic", time.time)
+
+
+def _get(order, name):
+    if isinstance(order, dict):
+        return order.get(name)
+    return getattr(order, name, None)
+
+
+def _filled(order):
+    return Decimal(str(_get(order, "filled") or 0))
+
+
+class OrderTracker(object):
+    """!
+    Open orders of an account indexed by id, updated from get_all_orders.
+
+    Each poll lists the open orders and compares them with the local view
+    by id, so only changes become events: orders that appeared, orders
+    whose filled size grew, and orders that left the list, resolved with
+    get_order into filled or cancelled. get_trades_order is only called for
+    orders whose filled size changed. The poll interval drops to
+    min_interval after a change or a call to touch, and grows by backoff up
+    to max_interval while nothing happens or after a failed poll.
+    Exceptions raised by callbacks are logged and skipped.
+    """
+
+    def __init__(self, client, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, backoff=DEFAULT_BACKOFF,
+                 fetch_trades=True, limit=DEFAULT_PAGE_SIZE, timer=_timer):
+        """!
+        OrderTracker initialization.
+
+        @param client: Cobinhood instance of the account.
+        @param min_interval: seconds between polls while orders change.
+        @param max_interval: longest number of seconds between polls.
+        @param backoff: factor applied to the interval after a quiet poll.
+        @param fetch_trades: attach the trades of orders whose filled size
+            changed to their events.
+        @param limit: page size used to list open orders.
+        @param timer: clock returning seconds.
+        """
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.fetch_trades = fetch_trades
+        self.limit = limit
+        self.timer = timer
+        self.orders = {}
+        self.interval = min_interval
+        self.polls = 0
+        self.requests = 0
+        self.errors = 0
+        self.callback_errors = 0
+        self.last_poll = None
+        self._callbacks = []
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+
+    def subscribe(self, callback):
+        """!
+        @param callback: called with every OrderEvent emitted by poll.
+        """
+        self._callbacks.append(callback)
+
+    def touch(self):
+        """!
+        Poll at min_interval again, e.g. after placing or changing an order.
+        """
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def place_order(self, *args):
+        """!
+        Place an order through the client and poll sooner.
+
+        @return: place_order response.
+        """
+        try:
+            return self.client.place_order(*args)
+        finally:
+            self.touch()
+
+    def modify_order(self, order_id, price, size):
+        """!
+        Modify an order through the client and poll sooner.
+
+        @return: modify_order response.
+        """
+        try:
+            return self.client.modify_order(order_id, price, size)
+        finally:
+            self.touch()
+
+    def cancel_order(self, order_id):
+        """!
+        Cancel an order through the client and poll sooner.
+
+        @return: cancel_order response.
+        """
+        try:
+            return self.client.cancel_order(order_id)
+        finally:
+            self.touch()
+
+    def next_poll(self):
+        """!
+        @return: seconds until the next poll is due, 0 when it is.
+        """
+        if self.last_poll is None:
+            return 0.0
+        return max(0.0, self.last_poll + self.interval - self.timer())
+
+    def poll(self):
+        """!
+        Fetch the open orders once and apply the differences.
+
+        @return: list of OrderEvent, also passed to subscribed callbacks.
+        """
+        with self._lock:
+            self._wake.clear()
+            self.last_poll = self.timer()
+            self.polls += 1
+            current = dict((_get(order, "id"), order) for order in
+                           self.client.iter_all_orders(limit=self.limit,
+                                                       prefetch=False))
+            self.requests += len(current) // self.limit + 1
+
+            events = []
+            for order_id, order in current.items():
+                previous = self.orders.get(order_id)
+                if previous is None:
+                    events.append(OrderEvent(NEW, order_id, order, None, None))
+                elif _filled(order) != _filled(previous):
+                    events.append(OrderEvent(
+                        PARTIALLY_FILLED, order_id, order, previous,
+                        self._trades(order_id)))
+            for order_id in [order_id for order_id in self.orders
+                             if order_id not in current]:
+                event = self._resolve(order_id, self.orders[order_id])
+                if event is None:
+                    # Not resolved yet; keep it and try again next poll.
+                    current[order_id] = self.orders[order_id]
+                else:
+                    events.append(event)
+            self.orders = current
+
+            if events:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff,
+                                    self.max_interval)
+        for event in events:
+            for callback in self._callbacks:
+                self._call(callback, event)
+        return events
+
+    def _call(self, callback, event):
+        try:
+            callback(event)
+        except Exception:
+            self.callback_errors += 1
+            logger.exception("order callback %r failed on %s %s", callback,
+                             event.kind, event.order_id)
+
+    def _trades(self, order_id):
+        if not self.fetch_trades:
+            return None
+        self.requests += 1
+        response = self.client.get_trades_order(order_id)
+        if not response.get("success"):
+            return None
+        return response["result"].get("trades")
+
+    def _resolve(self, order_id, previous):
+        """!
+        Find out how an order that left the open list ended.
+
+        @return: FILLED or CANCELLED OrderEvent, None when get_order failed.
+        """
+        self.requests += 1
+        try:
+            response = self.client.get_order(order_id)
+        except ExceptionCobinhood:
+            return None
+        if not response.get("success"):
+            return None
+        order = response["result"]["order"]
+        kind = FILLED if _get(order, "state") == FILLED else CANCELLED
+        trades = None
+        if _filled(order) != _filled(previous):
+            trades = self._trades(order_id)
+        return OrderEvent(kind, order_id, order, previous, trades)
+
+    def run(self, stop):
+        """!
+        Poll until stop is set, waiting the adaptive interval between polls.
+
+        A poll failing with an api or connection error is logged and
+        retried after max_interval; the local view is left as it was.
+
+        @param stop: threading.Event ending the loop.
+        """
+        while not stop.is_set():
+            try:
+                self.poll()
+            except (ExceptionCobinhood, EnvironmentError):
+                self.errors += 1
+                self.interval = self.max_interval
+                logger.warning("order poll failed, retrying in %s seconds",
+                               self.interval, exc_info=True)
+            while not stop.is_set():
+                delay = self.next_poll()
+                if delay <= 0:
+                    break
+                # Wake at least every min_interval to notice stop.
+                if self._wake.wait(min(delay, self.min_interval)):
+                    self._wake.clear()
@@ -0,0 +1,313 @@
+"""!
+@file       portfolio.py
+
+@brief      Portfolio valuation kept up to date price by price.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import math
+from collections import deque
+
+from .columnar import _records
+from .exceptions import ExceptionCobinhood
+
+DEFAULT_TARGETS = ("USD", "BTC")
+
+# Currencies valued one to one in another that may have no trading pair.
+DEFAULT_PEGS = {"USDT": "USD"}
+
+
+def _field(record, name):
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+def _result(response, key=None):
+    """!
+    @return: result of a response, or its key, or the response itself when
+        it is already the inner record.
+    """
+    if isinstance(response, dict) and "success" in response:
+        if not response["success"]:
+            raise ExceptionCobinhood(response.get("error", response))
+        response = response["result"]
+        if key is not None:
+            response = response[key]
+    return response
+
+
+class Portfolio(object):
+    """!
+    Balances valued in several currencies, revalued incrementally.
+
+    Each currency is converted to each target currency along the path of
+    fewest trading pairs found in get_all_trading_pairs. An index from
+    trading pair to the held currencies whose path uses it means a price
+    change revalues only those positions, and a balance change only its
+    own. Totals are summed exactly with math.fsum when read after a change,
+    so they do not drift over many updates. Positions without a path or a
+    price yet are left out of the totals and listed by unpriced. Values
+    are floats.
+    """
+
+    def __init__(self, trading_pairs, targets=DEFAULT_TARGETS,
+                 pegs=DEFAULT_PEGS, price_field="last_price"):
+        """!
+        Portfolio initialization.
+
+        @param trading_pairs: get_all_trading_pairs response or its list of
+            trading pairs.
+        @param targets: currencies to value the portfolio in; value and
+            total add others on first use.
+        @param pegs: dict of currency to a currency it is worth one of,
+            used when no trading pair links them.
+        @param price_field: get_trading_statistics field used as price.
+        """
+        self.price_field = price_field
+        self.prices = {}
+        self.balances = {}
+        self.updates = 0
+        self.revaluations = 0
+        self._pairs = {}
+        self._neighbours = {}
+        for pair in _records(trading_pairs, "trading_pairs"):
+            self._add_pair(_field(pair, "id"),
+                           _field(pair, "base_currency_id"),
+                           _field(pair, "quote_currency_id"))
+        for currency, pegged in pegs.items():
+            if not self._linked(currency, pegged):
+                pair_id = "{0}-{1}".format(currency, pegged)
+                self._add_pair(pair_id, currency, pegged)
+                self.prices[pair_id] = 1.0
+        self._parents = {}
+        self._paths = {}
+        self._rates = {}
+        self._values = {}
+        self._totals = {}
+        self._dependents = {}
+        for target in targets:
+            self.add_target(target)
+
+    def _add_pair(self, pair_id, base, quote):
+        self._pairs[pair_id] = (base, quote)
+        self._neighbours.setdefault(base, []).append((pair_id, quote))
+        self._neighbours.setdefault(quote, []).append((pair_id, base))
+
+    def _linked(self, first, second):
+        return any(other == second
+                   for _, other in self._neighbours.get(first, ()))
+
+    def add_target(self, target):
+        """!
+        Value the portfolio in one more currency.
+
+        @param target: currency id - Ex: "ETH"
+        """
+        if target in self._parents:
+            return
+        # Breadth first from the target: parents[currency] is the trading
+        # pair leading one step closer to it.
+        parents = {target: None}
+        queue = deque([target])
+        while queue:
+            currency = queue.popleft()
+            for pair_id, other in self._neighbours.get(currency, ()):
+                if other not in parents:
+                    parents[other] = (pair_id, currency)
+                    queue.append(other)
+        self._parents[target] = parents
+        self._paths[target] = {}
+        self._rates[target] = {}
+        self._values[target] = {}
+        self._totals[target] = 0.0
+        for currency in self.balances:
+            self._hold(target, currency)
+
+    def path(self, currency, target):
+        """!
+        @return: tuple of (trading pair id, inverse) converting currency to
+            target; inverse means dividing by the price. None without one.
+        """
+        self.add_target(target)
+        paths = self._paths[target]
+        if currency in paths:
+            return paths[currency]
+        parents = self._parents[target]
+        path = None
+        if currency in parents:
+            path = []
+            step = currency
+            while parents[step] is not None:
+                pair_id, following = parents[step]
+                # Prices are in quote currency per base currency.
+                path.append((pair_id, self._pairs[pair_id][1] == step))
+                step = following
+            path = tuple(path)
+        paths[currency] = path
+        return path
+
+    def _rate(self, currency, target):
+        rate = 1.0
+        for pair_id, inverse in self._paths[target][currency]:
+            price = self.prices.get(pair_id)
+            if not price:
+                return None
+            rate = rate / price if inverse else rate * price
+        return rate
+
+    def _hold(self, target, currency):
+        """!
+        Index a held currency under the trading pairs of its path.
+        """
+        path = self.path(currency, target)
+        for pair_id, _ in path or ():
+            self._dependents.setdefault(pair_id, set()).add(
+                (target, currency))
+        self._rates[target][currency] = None if path is None else \
+            self._rate(currency, target)
+        self._revalue(target, currency)
+
+    def _release(self, currency):
+        for target in self._parents:
+            for pair_id, _ in self.path(currency, target) or ():
+                self._dependents[pair_id].discard((target, currency))
+            self._rates[target].pop(currency, None)
+            if self._values[target].pop(currency, None) is not None:
+                self._totals[target] = None
+
+    def _revalue(self, target, currency):
+        self.revaluations += 1
+        rate = self._rates[target].get(currency)
+        values = self._values[target]
+        old = values.get(currency)
+        new = None if rate is None else self.balances[currency] * rate
+        values[currency] = new
+        if new != old:
+            # Summed again on the next read of total.
+            self._totals[target] = None
+
+    def set_price(self, trading_pair_id, price):
+        """!
+        Update the price of a trading pair and revalue the positions whose
+        conversion uses it.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param price: last price, number or numeric string.
+        @return: number of positions revalued.
+        """
+        price = float(price)
+        if self.prices.get(trading_pair_id) == price:
+            return 0
+        self.prices[trading_pair_id] = price
+        self.updates += 1
+        dependents = self._dependents.get(trading_pair_id, ())
+        for target, currency in dependents:
+            self._rates[target][currency] = self._rate(currency, target)
+            self._revalue(target, currency)
+        return len(dependents)
+
+    def set_balance(self, currency, amount):
+        """!
+        Update the balance of a currency and revalue its position.
+
+        @param currency: currency id - Ex: "BTC"
+        @param amount: total balance, number or numeric string.
+        """
+        amount = float(amount)
+        if self.balances.get(currency, 0.0) == amount:
+            return
+        self.updates += 1
+        if not amount:
+            self._release(currency)
+            del self.balances[currency]
+            return
+        held = currency in self.balances
+        self.balances[currency] = amount
+        for target in self._parents:
+            if held:
+                self._revalue(target, currency)
+            else:
+                self._hold(target, currency)
+
+    def load_trading_statistics(self, statistics):
+        """!
+        @param statistics: get_trading_statistics response or its result.
+            Only changed prices revalue positions.
+        """
+        for pair_id, stats in _result(statistics).items():
+            price = _field(stats, self.price_field)
+            if price is not None:
+                self.set_price(pair_id, price)
+
+    def load_ticker(self, ticker):
+        """!
+        @param ticker: get_ticker response or its ticker, priced at
+            last_trade_price.
+        """
+        ticker = _result(ticker, "ticker")
+        self.set_price(_field(ticker, "trading_pair_id"),
+                       _field(ticker, "last_trade_price"))
+
+    def load_balances(self, balances):
+        """!
+        @param balances: get_wallet_balances response or its list of
+            balances. Currencies missing from it are set to zero.
+        """
+        totals = {}
+        for balance in _records(balances, "balances"):
+            currency = _field(balance, "currency")
+            totals[currency] = totals.get(currency, 0.0) + \
+                float(_field(balance, "total"))
+        for currency in [currency for currency in self.balances
+                         if currency not in totals]:
+            self.set_balance(currency, 0)
+        for currency, amount in totals.items():
+            self.set_balance(currency, amount)
+
+    def refresh(self, client):
+        """!
+        Load prices and balances with a client.
+
+        @param client: Cobinhood instance with an api key.
+        """
+        self.load_trading_statistics(client.get_trading_statistics())
+        self.load_balances(client.get_wallet_balances())
+
+    def value(self, currency, target=DEFAULT_TARGETS[0]):
+        """!
+        @return: value of the balance of currency in target, None when it
+            cannot be priced yet.
+        """
+        self.add_target(target)
+        return self._values[target].get(currency) if currency in \
+            self.balances else 0.0
+
+    def values(self, target=DEFAULT_TARGETS[0]):
+        """!
+        @return: dict of held currency to its value in target, None for
+            currencies that cannot be priced yet.
+        """
+        self.add_target(target)
+        return dict(self._values[target])
+
+    def total(self, target=DEFAULT_TARGETS[0]):
+        """!
+        @return: total value in target of the priced positions.
+        """
+        self.add_target(target)
+        total = self._totals[target]
+        if total is None:
+            total = self._totals[target] = math.fsum(
+                value for value in self._values[target].values()
+                if value is not None)
+        return total
+
+    def unpriced(self, target=DEFAULT_TARGETS[0]):
+        """!
+        @return: held currencies without a path or price to target.
+        """
+        self.add_target(target)
+        return sorted(currency for currency, value in
+                      self._values[target].items() if value is None)
@@ -0,0 +1,213 @@
+"""!
+@file       ratelimit.py
+
+@brief      Client-side rate limiting and request prioritisation.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+try:
+    from urlparse import urlsplit
+except ImportError:
+    from urllib.parse import urlsplit
+
+from .exceptions import DeadlineExceeded
+
+TRADING = "trading"
+ACCOUNT = "account"
+MARKET = "market"
+
+# Lower values are served first.
+PRIORITIES = {TRADING: 0, ACCOUNT: 1, MARKET: 2}
+
+# (requests per second, burst) for each endpoint group.
+DEFAULT_BUDGETS = {
+    TRADING: (10, 10),
+    ACCOUNT: (5, 10),
+    MARKET: (10, 20),
+}
+
+# Budget shared by every group, matching the exchange's per-key limit.
+DEFAULT_GLOBAL_BUDGET = (15, 20)
+
+# Seconds a request of a group may wait in the queue before it is dropped.
+DEFAULT_MAX_WAIT = {MARKET: 2.0}
+
+_timer = getattr(time, "monotonic", time.time)
+
+
+def endpoint_group(request_url, request_type):
+    """!
+    Classify a request into an endpoint group.
+
+    @param request_url: the generated url for making the api call.
+    @param request_type: request type [GET, PUT, POST, DELETE].
+    @return: TRADING for order calls, MARKET for public market data and
+        ACCOUNT for everything else, order and trade history included.
+    """
+    path = urlsplit(request_url).path
+    if request_type != "get" or "/trading/orders" in path:
+        return TRADING
+    if "/market/" in path or "/chart/" in path or "/system/" in path:
+        return MARKET
+    return ACCOUNT
+
+
+class TokenBucket(object):
+    """!
+    Token bucket refilled continuously at a fixed rate.
+    """
+
+    def __init__(self, rate, capacity, timer=_timer):
+        """!
+        TokenBucket initialization, starting full.
+
+        @param rate: tokens added per second.
+        @param capacity: maximum number of tokens, i.e. the burst size.
+        @param timer: clock returning seconds.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.timer = timer
+        self.tokens = self.capacity
+        self.updated = timer()
+
+    def wait_time(self, now=None):
+        """!
+        @return: seconds until a token is available, 0 if one is now.
+        """
+        now = self.timer() if now is None else now
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """!
+        Consume a token. Call only after wait_time returned 0.
+        """
+        self.tokens -= 1
+
+
+class PriorityScheduler(object):
+    """!
+    perform wrapper that rate limits calls and serves them by priority.
+
+    Every call takes a token from the bucket of its endpoint group and from
+    the global bucket. When tokens run out calls queue up; trading calls are
+    served before account reads and market data reads, and queued reads that
+    wait past their group's deadline are dropped with DeadlineExceeded.
+    """
+
+    def __init__(self, perform, budgets=DEFAULT_BUDGETS,
+                 global_budget=DEFAULT_GLOBAL_BUDGET, max_wait=DEFAULT_MAX_WAIT,
+                 classify=endpoint_group, timer=_timer):
+        """!
+        PriorityScheduler initialization.
+
+        @param perform: callable with the request_api_call signature.
+        @param budgets: dict of group to (requests per second, burst).
+        @param global_budget: (requests per second, burst) shared by all
+            groups, or None for no global limit.
+        @param max_wait: dict of group to seconds a call may stay queued.
+        @param classify: function of (request_url, request_type) to group.
+        @param timer: clock returning seconds.
+        """
+        self.perform = perform
+        self.classify = classify
+        self.max_wait = dict(max_wait)
+        self.timer = timer
+        self.buckets = dict((group, TokenBucket(rate, burst, timer))
+                            for group, (rate, burst) in budgets.items())
+        self.global_bucket = TokenBucket(global_budget[0], global_budget[1],
+                                         timer) if global_budget else None
+        self.dropped = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def __call__(self, request_url, auth_token, request_type, *payload):
+        """!
+        Wait for a token, then make the call through perform.
+        """
+        self.acquire(self.classify(request_url, request_type))
+        return self.perform(request_url, auth_token, request_type, *payload)
+
+    def acquire(self, group):
+        """!
+        Block until a call of a group may proceed.
+
+        @param group: endpoint group.
+        """
+        now = self.timer()
+        max_wait = self.max_wait.get(group)
+        deadline = now + max_wait if max_wait is not None else None
+        entry = (PRIORITIES.get(group, len(PRIORITIES)), next(self._counter),
+                 group)
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = self.timer()
+                    chosen, wait = self._next_eligible(now)
+                    if chosen is entry:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        self._take(group)
+                        self._condition.notify_all()
+                        return
+                    if deadline is not None:
+                        if now >= deadline:
+                            self.dropped += 1
+                            raise DeadlineExceeded(
+                                "Error: request deadline exceeded")
+                        wait = min(wait, deadline - now) if wait else \
+                            deadline - now
+                    self._condition.wait(wait)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._condition.notify_all()
+                raise
+
+    def _next_eligible(self, now):
+        """!
+        Find the waiter to serve next.
+
+        @return: (waiter entry or None, seconds until the next token when
+            nobody is eligible).
+        """
+        global_wait = 0.0
+        if self.global_bucket is not None:
+            global_wait = self.global_bucket.wait_time(now)
+        soonest = None
+        for entry in sorted(self._waiters):
+            bucket = self.buckets.get(entry[2])
+            wait = max(global_wait, bucket.wait_time(now) if bucket else 0.0)
+            if wait <= 0:
+                return entry, None
+            soonest = wait if soonest is None else min(soonest, wait)
+        return None, soonest
+
+    def _take(self, group):
+        bucket = self.buckets.get(group)
+        if bucket is not None:
+            bucket.take()
+        if self.global_bucket is not None:
+            self.global_bucket.take()
+
+    def close(self):
+        """!
+        Close the wrapped perform if it supports closing.
+        """
+        close = getattr(self.perform, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,254 @@
+"""!
+@file       replay.py
+
+@brief      Recording of api traffic and its replay for offline runs.
+@author     Sachin Jayaram
+@date       2/2018
+
+A recording is a gzip compressed file of json lines: a header line, then one
+line per call holding when it started and how long it took relative to the
+start of the recording, the request type, the url, the payload if any and
+the response or the error raised, with its class. Api keys are not recorded.
+Each line is flushed as it is written, so a recording cut short by a crash
+can still be read up to its last complete call.
+
+The file holds no index: ReplayTransport reads the whole recording and
+builds its lookup index in memory when it is created.
+"""
+
+import base64
+import gzip
+import json
+import sys
+import threading
+import time
+import zlib
+
+from .exceptions import ExceptionCobinhood
+from .retry import is_retryable
+
+FORMAT = "cobinhood-recording"
+VERSION = 1
+
+_timer = getattr(time, "perf_counter", time.time)
+
+
+def _encode_response(response):
+    if isinstance(response, bytes):
+        return {"bytes": base64.b64encode(response).decode("ascii")}
+    return {"json": response}
+
+
+def _decode_response(entry):
+    if "bytes" in entry:
+        return base64.b64decode(entry["bytes"])
+    return entry["json"]
+
+
+def _encode_error(exception):
+    cls = type(exception)
+    return {"type": "{0}.{1}".format(cls.__module__, cls.__name__),
+            "message": str(exception),
+            "retryable": is_retryable(exception)}
+
+
+def _decode_error(error):
+    """!
+    @return: exception of the recorded class when its module is loaded and
+        it takes a message, else IOError when the error was retryable and
+        ValueError otherwise.
+    """
+    module, _, name = error.get("type", "").rpartition(".")
+    cls = getattr(sys.modules.get(module), name, None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        try:
+            return cls(error["message"])
+        except Exception:
+            pass
+    return (IOError if error["retryable"] else ValueError)(error["message"])
+
+
+class RecordingTransport(object):
+    """!
+    perform wrapper writing every call made through it to a recording.
+    """
+
+    def __init__(self, perform, path, timer=_timer):
+        """!
+        RecordingTransport initialization.
+
+        @param perform: callable with the request_api_call signature.
+        @param path: file the recording is written to, replaced if present.
+        @param timer: monotonic clock in seconds.
+        """
+        self.perform = perform
+        self.path = path
+        self.timer = timer
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wb")
+        self._start = timer()
+        self._write({"format": FORMAT, "version": VERSION,
+                     "recorded_at": time.time()})
+
+    def _write(self, line):
+        data = (json.dumps(line, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                raise ValueError("recording {0} is closed".format(self.path))
+            self._file.write(data)
+            self._file.flush()
+
+    def __call__(self, request_url, auth_token, request_type, *payload):
+        """!
+        Make the call through perform and record it.
+
+        @return: response of perform, or the exception it raised.
+        """
+        if self._file is None:
+            raise ValueError("recording {0} is closed".format(self.path))
+        start = self.timer()
+        entry = {"start": start - self._start, "method": request_type,
+                 "url": request_url}
+        if payload:
+            entry["payload"] = payload[0]
+        try:
+            response = self.perform(request_url, auth_token, request_type,
+                                    *payload)
+        except Exception as exception:
+            entry["duration"] = self.timer() - start
+            entry["error"] = _encode_error(exception)
+            self._record(entry)
+            raise
+        entry["duration"] = self.timer() - start
+        entry["response"] = _encode_response(response)
+        self._record(entry)
+        return response
+
+    def _record(self, entry):
+        self._write(entry)
+        with self._lock:
+            self.calls += 1
+
+    def close(self):
+        """!
+        Finish the recording and close the wrapped perform if it supports
+        closing.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        close = getattr(self.perform, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _key(request_type, request_url, payload):
+    if payload is None:
+        return request_type, request_url
+    return request_type, request_url, json.dumps(payload, sort_keys=True)
+
+
+def load_recording(path):
+    """!
+    Read a recording.
+
+    @param path: file written by RecordingTransport.
+    @return: list of call entries in the order they were recorded, up to the
+        last complete one if the recording was not closed.
+    """
+    lines = []
+    with gzip.open(path, "rb") as stream:
+        try:
+            for line in stream:
+                lines.append(line)
+        except (EOFError, IOError, zlib.error):
+            # Truncated by a crash; keep the flushed lines.
+            pass
+    if lines and not lines[-1].endswith(b"\n"):
+        lines.pop()
+    lines = [line.decode("utf-8") for line in lines]
+    header = json.loads(lines[0]) if lines else {}
+    if header.get("format") != FORMAT or header.get("version") != VERSION:
+        raise ExceptionCobinhood("{0} is not a recording".format(path))
+    return [json.loads(line) for line in lines[1:] if line.strip()]
+
+
+class ReplayTransport(object):
+    """!
+    perform callable answering calls from a recording.
+
+    Calls are looked up by request type, url and payload in an index built
+    when the recording is loaded. Calls with the same key get the recorded responses
+    in order, starting over once all were served; rewind starts every key
+    over. With speed None responses are returned at once, otherwise each
+    call waits its recorded duration divided by speed, so 1 reproduces the
+    original latency. Responses are shared between replays and must not be
+    modified.
+    """
+
+    def __init__(self, path, speed=None, sleep=time.sleep):
+        """!
+        ReplayTransport initialization.
+
+        @param path: file written by RecordingTransport.
+        @param speed: factor by which recorded latencies are compressed, None
+            to not wait at all.
+        @param sleep: function sleeping for a number of seconds.
+        """
+        self.path = path
+        self.speed = speed
+        self.sleep = sleep
+        self.entries = load_recording(path)
+        self.calls = 0
+        self.misses = 0
+        self._index = {}
+        for entry in self.entries:
+            if "response" in entry:
+                entry["response"] = _decode_response(entry["response"])
+            self._index.setdefault(
+                _key(entry["method"], entry["url"], entry.get("payload")),
+                []).append(entry)
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, request_url, auth_token, request_type, payload=None):
+        """!
+        Answer a call with the next recorded response to it.
+
+        @return: recorded response; the recorded error is raised again with
+            its class, see _decode_error.
+        """
+        key = _key(request_type, request_url, payload)
+        entries = self._index.get(key)
+        with self._lock:
+            self.calls += 1
+            if entries is None:
+                self.misses += 1
+            else:
+                position = self._positions.get(key, 0)
+                self._positions[key] = (position + 1) % len(entries)
+        if entries is None:
+            raise ExceptionCobinhood("no recorded response for {0} {1}".format(
+                request_type, request_url))
+        entry = entries[position]
+        if self.speed:
+            self.sleep(entry["duration"] / self.speed)
+        error = entry.get("error")
+        if error is not None:
+            raise _decode_error(error)
+        return entry["response"]
+
+    def rewind(self):
+        """!
+        Serve every key's recorded responses from the first one again.
+        """
+        with self._lock:
+            self._positions.clear()
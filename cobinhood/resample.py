@@ -0,0 +1,344 @@
+"""!
+@file       resample.py
+
+@brief      Higher timeframe bars kept up to date from base candles or trades.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import heapq
+from functools import partial
+
+from . import columnar
+
+ONE_MINUTE = 60000
+FIVE_MINUTES = 5 * ONE_MINUTE
+ONE_HOUR = 60 * ONE_MINUTE
+ONE_DAY = 24 * ONE_HOUR
+
+DEFAULT_TIMEFRAMES = (FIVE_MINUTES, ONE_HOUR, ONE_DAY)
+DEFAULT_KEEP = 1000
+
+# Fields of a bar list.
+_OPEN_TS, _OPEN, _HIGH, _LOW, _CLOSE_TS, _CLOSE, _VOLUME, _COUNT = range(8)
+
+
+def _candle(candle):
+    """!
+    @return: (timestamp, (open, high, low, close, volume)) of a candle dict,
+        CANDLE_DTYPE row or typed record.
+    """
+    if isinstance(candle, dict) or hasattr(candle, "dtype"):
+        get = candle.__getitem__
+    else:
+        get = partial(getattr, candle)
+    return int(get("timestamp")), tuple(
+        float(get(name)) for name in ("open", "high", "low", "close", "volume"))
+
+
+def _new_bar(timestamp, values, count=1):
+    return [timestamp, values[0], values[1], values[2], timestamp, values[3],
+            values[4], count]
+
+
+def _merge(bar, open_ts, close_ts, values, count=1):
+    """!
+    Merge candles spanning open_ts to close_ts into a bar. Open and close
+    are chosen by timestamp, so the arrival order does not matter.
+    """
+    if open_ts < bar[_OPEN_TS]:
+        bar[_OPEN_TS] = open_ts
+        bar[_OPEN] = values[0]
+    if close_ts >= bar[_CLOSE_TS]:
+        bar[_CLOSE_TS] = close_ts
+        bar[_CLOSE] = values[3]
+    if values[1] > bar[_HIGH]:
+        bar[_HIGH] = values[1]
+    if values[2] < bar[_LOW]:
+        bar[_LOW] = values[2]
+    bar[_VOLUME] += values[4]
+    bar[_COUNT] += count
+
+
+class CandleResampler(object):
+    """!
+    Bars of several higher timeframes built from base candles or trades.
+
+    Each update merges one base candle or trade into the bar of every
+    timeframe holding it, in O(1) per timeframe. Candles may arrive out of
+    order and the latest candle may be sent again as it changes; a revision
+    that lowers a high or raises a low rebuilds the affected bars from the
+    base candles kept for the two latest bars of the largest timeframe.
+    Candles older than that are counted as stale and dropped. Timeframes
+    without data are gaps, left out of bars unless fill is set.
+
+    Feed a resampler either candles or trades, not both: a trade is not
+    known to be part of a base candle and would be counted twice.
+    Timestamps are in milliseconds.
+    """
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES, base=ONE_MINUTE,
+                 keep=DEFAULT_KEEP):
+        """!
+        CandleResampler initialization.
+
+        @param timeframes: bar lengths in milliseconds, multiples of base.
+        @param base: length of the base candles in milliseconds.
+        @param keep: number of bars kept per timeframe.
+        """
+        for timeframe in timeframes:
+            if timeframe % base:
+                raise ValueError("timeframe {0} is not a multiple of {1}"
+                                 .format(timeframe, base))
+        self.timeframes = tuple(timeframes)
+        self.base = base
+        self.keep = keep
+        self.stale = 0
+        self.rebuilds = 0
+        self._span = max(self.timeframes)
+        self._bars = dict((timeframe, {}) for timeframe in self.timeframes)
+        self._starts = dict((timeframe, []) for timeframe in self.timeframes)
+        self._pruned = dict((timeframe, None) for timeframe in self.timeframes)
+        self._latest = {}
+        self._candles = {}
+        self._candle_heap = []
+        self._newest = None
+        self._stale_before = None
+
+    def _is_stale(self, timestamp):
+        return self._stale_before is not None and \
+            timestamp < self._stale_before
+
+    def _advance(self, timestamp):
+        """!
+        Move the stale horizon to the bar of the largest timeframe before
+        the one holding the newest candle, and forget base candles no bar
+        after the horizon can need.
+        """
+        if self._newest is not None and timestamp <= self._newest:
+            return
+        self._newest = timestamp
+        self._stale_before = timestamp - timestamp % self._span - self._span
+        horizon = self._stale_before - self._span
+        heap = self._candle_heap
+        while heap and heap[0] < horizon:
+            del self._candles[heapq.heappop(heap)]
+
+    def _bar(self, timeframe, timestamp):
+        """!
+        @return: (start, bar holding timestamp or None, True when the bar
+            was pruned).
+        """
+        start = timestamp - timestamp % timeframe
+        pruned = self._pruned[timeframe]
+        if pruned is not None and start <= pruned:
+            return start, None, True
+        return start, self._bars[timeframe].get(start), False
+
+    def _add_bar(self, timeframe, start, bar):
+        bars = self._bars[timeframe]
+        bars[start] = bar
+        starts = self._starts[timeframe]
+        heapq.heappush(starts, start)
+        while len(bars) > self.keep:
+            oldest = heapq.heappop(starts)
+            del bars[oldest]
+            # Later bars before this one are refused, so starts pop in order.
+            self._pruned[timeframe] = oldest
+        if start > self._latest.get(timeframe, start - 1):
+            self._latest[timeframe] = start
+
+    def update(self, candle):
+        """!
+        Merge a base candle, new or revised, into every timeframe.
+
+        @param candle: candle dict as returned by get_candles, typed record
+            or CANDLE_DTYPE row.
+        @return: False when the candle was stale and dropped, else True.
+        """
+        timestamp, values = _candle(candle)
+        if self._is_stale(timestamp):
+            self.stale += 1
+            return False
+        previous = self._candles.get(timestamp)
+        self._candles[timestamp] = values
+        if previous is None:
+            heapq.heappush(self._candle_heap, timestamp)
+        for timeframe in self.timeframes:
+            start, bar, pruned = self._bar(timeframe, timestamp)
+            if pruned:
+                continue
+            if bar is None:
+                self._add_bar(timeframe, start, _new_bar(timestamp, values))
+            elif previous is None:
+                _merge(bar, timestamp, timestamp, values)
+            elif values[1] >= previous[1] and values[2] <= previous[2]:
+                # The usual revision of the open candle only widens it.
+                if timestamp == bar[_OPEN_TS]:
+                    bar[_OPEN] = values[0]
+                if timestamp == bar[_CLOSE_TS]:
+                    bar[_CLOSE] = values[3]
+                bar[_HIGH] = max(bar[_HIGH], values[1])
+                bar[_LOW] = min(bar[_LOW], values[2])
+                bar[_VOLUME] += values[4] - previous[4]
+            else:
+                self._rebuild(timeframe, start)
+        self._advance(timestamp)
+        return True
+
+    def _rebuild(self, timeframe, start):
+        self.rebuilds += 1
+        bar = None
+        end = start + timeframe
+        for timestamp, values in self._candles.items():
+            if not start <= timestamp < end:
+                continue
+            if bar is None:
+                bar = _new_bar(timestamp, values)
+            else:
+                _merge(bar, timestamp, timestamp, values)
+        self._bars[timeframe][start][:] = bar
+
+    def add_trade(self, trade):
+        """!
+        Merge a trade into every timeframe.
+
+        @param trade: trade dict as returned by get_recent_trades or typed
+            record, with timestamp, price and size.
+        """
+        get = trade.__getitem__ if isinstance(trade, dict) else \
+            partial(getattr, trade)
+        timestamp = int(get("timestamp"))
+        price = float(get("price"))
+        values = (price, price, price, price, float(get("size")))
+        for timeframe in self.timeframes:
+            start, bar, pruned = self._bar(timeframe, timestamp)
+            if pruned:
+                continue
+            if bar is None:
+                self._add_bar(timeframe, start, _new_bar(timestamp, values))
+            else:
+                _merge(bar, timestamp, timestamp, values)
+
+    def add_trades(self, trades):
+        """!
+        @param trades: get_recent_trades response or list of trades, merged
+            with add_trade.
+        """
+        for trade in columnar._records(trades, "trades"):
+            self.add_trade(trade)
+
+    def backfill(self, candles):
+        """!
+        Merge many base candles at once, aggregating them with NumPy.
+        Requires numpy.
+
+        @param candles: get_candles response, list of candles or CANDLE_DTYPE
+            array, in any order. Candles already merged are applied as
+            revisions with update.
+        @return: number of candles merged.
+        """
+        columnar._require_numpy()
+        numpy = columnar.numpy
+        if not isinstance(candles, numpy.ndarray):
+            candles = columnar.candles_to_array(candles)
+        # Keep the last of repeated timestamps, in timestamp order.
+        reverse = candles[::-1]
+        _, index = numpy.unique(reverse["timestamp"], return_index=True)
+        candles = reverse[index]
+        if self._stale_before is not None:
+            fresh = candles["timestamp"] >= self._stale_before
+            self.stale += int(len(candles) - fresh.sum())
+            candles = candles[fresh]
+        known = numpy.array([timestamp in self._candles for timestamp in
+                             candles["timestamp"].tolist()], dtype=bool)
+        for candle in candles[known]:
+            self.update(candle)
+        candles = candles[~known]
+        if not len(candles):
+            return int(known.sum())
+
+        timestamps = candles["timestamp"]
+        for timeframe in self.timeframes:
+            bucket = timestamps - timestamps % timeframe
+            starts = numpy.concatenate(
+                ([0], numpy.flatnonzero(numpy.diff(bucket)) + 1))
+            ends = numpy.append(starts[1:], len(candles)) - 1
+            # Only the newest keep bars can survive pruning.
+            starts, ends = starts[-self.keep:], ends[-self.keep:]
+            columns = zip(
+                bucket[starts].tolist(), timestamps[starts].tolist(),
+                timestamps[ends].tolist(), candles["open"][starts].tolist(),
+                numpy.maximum.reduceat(candles["high"], starts).tolist(),
+                numpy.minimum.reduceat(candles["low"], starts).tolist(),
+                candles["close"][ends].tolist(),
+                numpy.add.reduceat(candles["volume"], starts).tolist(),
+                (ends - starts + 1).tolist())
+            for start, open_ts, close_ts, open_, high, low, close, volume, \
+                    count in columns:
+                pruned = self._pruned[timeframe]
+                if pruned is not None and start <= pruned:
+                    continue
+                values = (open_, high, low, close, volume)
+                bar = self._bars[timeframe].get(start)
+                if bar is None:
+                    bar = _new_bar(open_ts, values, count)
+                    bar[_CLOSE_TS] = close_ts
+                    self._add_bar(timeframe, start, bar)
+                else:
+                    _merge(bar, open_ts, close_ts, values, count)
+
+        self._advance(int(timestamps[-1]))
+        recent = candles[timestamps >= self._stale_before - self._span]
+        recent_timestamps = recent["timestamp"].tolist()
+        self._candles.update(zip(recent_timestamps, zip(*(
+            recent[name].tolist() for name in
+            ("open", "high", "low", "close", "volume")))))
+        for timestamp in recent_timestamps:
+            heapq.heappush(self._candle_heap, timestamp)
+        return int(len(candles) + known.sum())
+
+    def latest(self, timeframe):
+        """!
+        @param timeframe: one of timeframes.
+        @return: newest bar of the timeframe as a dict with timestamp (start
+            of the bar), open, high, low, close, volume and count, the
+            number of candles or trades merged. None before any update.
+        """
+        start = self._latest.get(timeframe)
+        if start is None:
+            return None
+        bar = self._bars[timeframe][start]
+        return {"timestamp": start, "open": bar[_OPEN], "high": bar[_HIGH],
+                "low": bar[_LOW], "close": bar[_CLOSE],
+                "volume": bar[_VOLUME], "count": bar[_COUNT]}
+
+    def bars(self, timeframe, fill=False):
+        """!
+        Kept bars of a timeframe. Requires numpy.
+
+        @param timeframe: one of timeframes.
+        @param fill: add a bar for every gap between the first and last bar,
+            flat at the previous close with no volume.
+        @return: CANDLE_DTYPE array, oldest first, timestamped at the start
+            of each bar.
+        """
+        columnar._require_numpy()
+        numpy = columnar.numpy
+        bars = self._bars[timeframe]
+        starts = sorted(bars)
+        out = numpy.empty(len(starts), dtype=columnar.CANDLE_DTYPE)
+        out["timestamp"] = starts
+        for name, field in (("open", _OPEN), ("high", _HIGH), ("low", _LOW),
+                            ("close", _CLOSE), ("volume", _VOLUME)):
+            out[name] = [bars[start][field] for start in starts]
+        if not fill or len(out) < 2:
+            return out
+        full = numpy.arange(starts[0], starts[-1] + timeframe, timeframe)
+        filled = out[numpy.searchsorted(out["timestamp"], full, "right") - 1]
+        gaps = filled["timestamp"] != full
+        for name in ("open", "high", "low"):
+            filled[name][gaps] = filled["close"][gaps]
+        filled["volume"][gaps] = 0
+        filled["timestamp"] = full
+        return filled
@@ -0,0 +1,235 @@
+"""!
+@file       retry.py
+
+@brief      Retries with backoff and hedged requests for idempotent calls.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import random
+import threading
+import time
+
+from .exceptions import ExceptionCobinhood, RetryableError
+
+# Request types that are safe to repeat. Order placement, modification and
+# cancellation are never repeated automatically.
+IDEMPOTENT_METHODS = ("get",)
+
+# error_code values of failure responses worth retrying.
+RETRYABLE_ERROR_CODES = frozenset([
+    "too_many_requests",
+    "internal_server_error",
+    "service_unavailable",
+    "gateway_timeout",
+    "timeout",
+])
+
+DEFAULT_HEDGE_WORKERS = 16
+
+
+def is_retryable(exception):
+    """!
+    Classify an exception raised by a perform callable.
+
+    @param exception: raised exception.
+    @return: True for transient failures - connection errors and timeouts -
+        and RetryableError, False for fatal ones such as invalid urls,
+        undecodable bodies and other ExceptionCobinhood errors.
+    """
+    if isinstance(exception, RetryableError):
+        return True
+    if isinstance(exception, (ExceptionCobinhood, ValueError)):
+        return False
+    return isinstance(exception, EnvironmentError)
+
+
+def is_retryable_response(response, codes=RETRYABLE_ERROR_CODES):
+    """!
+    Classify a response returned by a perform callable.
+
+    @param response: decoded response.
+    @param codes: error_code values worth retrying.
+    @return: True for failure responses with a transient error_code.
+    """
+    if not isinstance(response, dict) or response.get("success", True):
+        return False
+    error = response.get("error")
+    return isinstance(error, dict) and error.get("error_code") in codes
+
+
+class RetryPolicy(object):
+    """!
+    How often and how fast calls are repeated, and when they are hedged.
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.1, multiplier=2.0,
+                 max_backoff=2.0, jitter=1.0, hedge_after=None,
+                 methods=IDEMPOTENT_METHODS,
+                 retryable_codes=RETRYABLE_ERROR_CODES):
+        """!
+        RetryPolicy initialization.
+
+        @param max_attempts: attempts per call, including the first.
+        @param backoff: seconds to wait before the first retry.
+        @param multiplier: factor applied to the wait after each retry.
+        @param max_backoff: longest wait between attempts.
+        @param jitter: fraction of each wait that is randomized; 1 waits a
+            uniformly random time up to the backoff, 0 waits exactly.
+        @param hedge_after: seconds after which a duplicate of a slow call is
+            sent and the first answer wins, None to never hedge.
+        @param methods: request types that may be retried and hedged.
+        @param retryable_codes: error_code values of failure responses
+            worth retrying.
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.hedge_after = hedge_after
+        self.methods = frozenset(methods)
+        self.retryable_codes = frozenset(retryable_codes)
+
+    def delay(self, retry, rand=random.random):
+        """!
+        @param retry: number of the retry, starting at 0.
+        @param rand: function returning a float in [0, 1).
+        @return: seconds to wait before the retry.
+        """
+        cap = min(self.max_backoff, self.backoff * self.multiplier ** retry)
+        return cap * (1 - self.jitter * rand())
+
+
+class RetryingTransport(object):
+    """!
+    perform wrapper that retries and hedges idempotent calls.
+
+    Calls whose request type is not in the policy's methods go straight to
+    the wrapped perform. Others are repeated with exponential backoff and
+    jitter while they fail with a retryable error, and with hedge_after set
+    a slow attempt is raced against a duplicate on a worker pool.
+    """
+
+    def __init__(self, perform, policy=None, max_workers=DEFAULT_HEDGE_WORKERS,
+                 sleep=time.sleep, rand=random.random):
+        """!
+        RetryingTransport initialization.
+
+        @param perform: callable with the request_api_call signature.
+        @param policy: RetryPolicy, defaults to RetryPolicy().
+        @param max_workers: size of the worker pool running hedged calls.
+        @param sleep: function sleeping for a number of seconds.
+        @param rand: function returning a float in [0, 1) for jitter.
+        """
+        self.perform = perform
+        self.policy = policy if policy is not None else RetryPolicy()
+        self.max_workers = max_workers
+        self.sleep = sleep
+        self.rand = rand
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __call__(self, request_url, auth_token, request_type, *payload):
+        """!
+        Make the call through perform, retrying transient failures.
+
+        @return: first successful response, or the last failure response.
+        """
+        policy = self.policy
+        if request_type not in policy.methods:
+            return self.perform(request_url, auth_token, request_type,
+                                *payload)
+        attempt = 0
+        while True:
+            response, exception = self._attempt(request_url, auth_token,
+                                                request_type, *payload)
+            attempt += 1
+            if exception is not None:
+                retry = is_retryable(exception)
+            else:
+                retry = is_retryable_response(response,
+                                              policy.retryable_codes)
+            if not retry or attempt >= policy.max_attempts:
+                if exception is not None:
+                    raise exception
+                return response
+            with self._lock:
+                self.retries += 1
+            self.sleep(policy.delay(attempt - 1, self.rand))
+
+    def _attempt(self, request_url, auth_token, request_type, *payload):
+        """!
+        Make one attempt, hedged when the policy asks for it.
+
+        @return: (response, None) or (None, raised exception).
+        """
+        if self.policy.hedge_after is None:
+            try:
+                return self.perform(request_url, auth_token, request_type,
+                                    *payload), None
+            except Exception as exception:
+                return None, exception
+        return self._hedged(request_url, auth_token, request_type, *payload)
+
+    def _hedged(self, request_url, auth_token, request_type, *payload):
+        """!
+        Race the call against a duplicate sent after hedge_after seconds.
+
+        @return: the first outcome that is not a retryable failure, else the
+            last one to arrive.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        executor = self._get_executor()
+        args = (self.perform, request_url, auth_token, request_type) + payload
+        primary = executor.submit(*args)
+        pending = set([primary])
+        done, _ = wait(pending, timeout=self.policy.hedge_after)
+        if not done:
+            pending.add(executor.submit(*args))
+            with self._lock:
+                self.hedges += 1
+        outcome = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exception = future.exception()
+                if exception is not None:
+                    outcome = (None, exception)
+                    if is_retryable(exception):
+                        continue
+                else:
+                    outcome = (future.result(), None)
+                    if is_retryable_response(outcome[0],
+                                             self.policy.retryable_codes):
+                        continue
+                if future is not primary:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return outcome
+        return outcome
+
+    def _get_executor(self):
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers)
+        return self._executor
+
+    def close(self):
+        """!
+        Shut down the hedging pool and close the wrapped perform if it
+        supports closing.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        close = getattr(self.perform, "close", None)
+        if close is not None:
+            close()
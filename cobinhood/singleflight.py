@@ -0,0 +1,92 @@
+"""!
+@file       singleflight.py
+
+@brief      Coalescing of identical in-flight calls.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import threading
+
+
+class _Call(object):
+    """!
+    A call in flight and, once done, its outcome.
+    """
+
+    __slots__ = ("event", "response", "exception")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.exception = None
+
+
+class SingleFlight(object):
+    """!
+    Thread-safe registry making concurrent calls with the same key share one
+    execution.
+
+    The first caller of a key runs the call; callers arriving while it is in
+    flight wait for it and receive the same response, or the same exception.
+    Shared responses must not be modified.
+    """
+
+    def __init__(self):
+        """!
+        SingleFlight initialization.
+        """
+        self.requests = 0
+        self.saved = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args):
+        """!
+        Run a call unless an identical one is in flight, then share its
+        outcome.
+
+        @param key: hashable key identifying identical calls.
+        @param function: function making the call.
+        @param args: arguments passed to function.
+        @return: response of the call.
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.requests += 1
+            else:
+                self.saved += 1
+        if leader:
+            return self._lead(key, call, function, args)
+        return self._follow(call)
+
+    def _lead(self, key, call, function, args):
+        try:
+            call.response = function(*args)
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.event.set()
+        return call.response
+
+    @staticmethod
+    def _follow(call):
+        call.event.wait()
+        if call.exception is not None:
+            raise call.exception
+        return call.response
+
+    def stats(self):
+        """!
+        @return: dict with requests (calls executed), saved (calls answered
+            by a call already in flight) and in_flight.
+        """
+        with self._lock:
+            return {"requests": self.requests, "saved": self.saved,
+                    "in_flight": len(self._in_flight)}
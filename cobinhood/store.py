@@ -0,0 +1,213 @@
+"""!
+@file       store.py
+
+@brief      Disk-backed append-only store of trades and candles.
+@author     Sachin Jayaram
+@date       2/2018
+
+Each trading pair gets a directory holding one file of fixed-size records
+per kind, in the dtypes of cobinhood.columnar, and a meta.json recording
+how many records are committed and where the last sync stopped. Readers get
+read-only memory-mapped arrays over the files.
+"""
+
+import json
+import os
+import threading
+
+from . import columnar
+from .cobinhood import DEFAULT_PAGE_SIZE
+
+TRADES = "trades"
+CANDLES = "candles"
+OWN_TRADES = "own_trades"
+
+DTYPES = {
+    TRADES: columnar.TRADE_DTYPE,
+    CANDLES: columnar.CANDLE_DTYPE,
+    OWN_TRADES: columnar.TRADE_DTYPE,
+}
+
+_replace = getattr(os, "replace", os.rename)
+
+
+def _field(record, name):
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name)
+
+
+class MarketStore(object):
+    """!
+    Local columnar history of trading pairs, synced incrementally.
+
+    sync fetches only records newer than the last synced timestamp and
+    appends them. Public trades come from get_recent_trades, so when more
+    trades happened between two syncs than one call returns, the missed
+    ones are counted as a gap. Candles are appended once closed, i.e. all
+    but the newest one. Own trades are read from iter_trade_history until
+    the last synced one.
+    """
+
+    def __init__(self, root, client, trades_limit=DEFAULT_PAGE_SIZE,
+                 page_size=DEFAULT_PAGE_SIZE):
+        """!
+        MarketStore initialization.
+
+        @param root: directory holding the store, created if missing.
+        @param client: Cobinhood instance used to sync.
+        @param trades_limit: number of recent trades requested per sync.
+        @param page_size: page size used to read own trades.
+        """
+        self.root = root
+        self.client = client
+        self.trades_limit = trades_limit
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        if not os.path.isdir(root):
+            os.makedirs(root)
+
+    def _path(self, trading_pair_id, name):
+        return os.path.join(self.root, trading_pair_id, name)
+
+    def meta(self, trading_pair_id):
+        """!
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @return: dict of kind to a dict with count, last_timestamp,
+            last_ids (ids of the records at last_timestamp) and gaps.
+        """
+        try:
+            with open(self._path(trading_pair_id, "meta.json")) as stream:
+                return json.load(stream)
+        except (IOError, OSError):
+            return {}
+
+    def _write_meta(self, trading_pair_id, meta):
+        path = self._path(trading_pair_id, "meta.json")
+        with open(path + ".tmp", "w") as stream:
+            json.dump(meta, stream, sort_keys=True)
+        _replace(path + ".tmp", path)
+
+    def read(self, trading_pair_id, kind):
+        """!
+        Committed records of a pair without copying them.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param kind: TRADES, CANDLES or OWN_TRADES.
+        @return: read-only memory-mapped array of the kind's dtype, oldest
+            record first.
+        """
+        columnar._require_numpy()
+        numpy = columnar.numpy
+        count = self.meta(trading_pair_id).get(kind, {}).get("count", 0)
+        if not count:
+            return numpy.empty(0, dtype=DTYPES[kind])
+        return numpy.memmap(self._path(trading_pair_id, kind + ".dat"),
+                            dtype=DTYPES[kind], mode="r", shape=(count,))
+
+    def trades(self, trading_pair_id):
+        """!
+        @return: synced public trades as TRADE_DTYPE array.
+        """
+        return self.read(trading_pair_id, TRADES)
+
+    def candles(self, trading_pair_id):
+        """!
+        @return: synced closed candles as CANDLE_DTYPE array.
+        """
+        return self.read(trading_pair_id, CANDLES)
+
+    def own_trades(self, trading_pair_id):
+        """!
+        @return: synced trades of the user as TRADE_DTYPE array.
+        """
+        return self.read(trading_pair_id, OWN_TRADES)
+
+    def sync(self, trading_pair_id, kinds=(TRADES, CANDLES)):
+        """!
+        Fetch and append the records of a pair newer than the last sync.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param kinds: kinds to sync among TRADES, CANDLES and OWN_TRADES.
+        @return: dict of kind to number of records appended.
+        """
+        columnar._require_numpy()
+        fetchers = {TRADES: self._new_trades, CANDLES: self._new_candles,
+                    OWN_TRADES: self._new_own_trades}
+        with self._lock:
+            directory = os.path.join(self.root, trading_pair_id)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            meta = self.meta(trading_pair_id)
+            appended = {}
+            for kind in kinds:
+                state = meta.get(kind) or {"count": 0, "last_timestamp": None,
+                                           "last_ids": [], "gaps": 0}
+                records = fetchers[kind](trading_pair_id, state)
+                self._append(trading_pair_id, kind, state, records)
+                meta[kind] = state
+                appended[kind] = len(records)
+            self._write_meta(trading_pair_id, meta)
+        return appended
+
+    def _append(self, trading_pair_id, kind, state, records):
+        """!
+        Append records, oldest first, and advance the sync state.
+        """
+        path = self._path(trading_pair_id, kind + ".dat")
+        itemsize = columnar.numpy.dtype(DTYPES[kind]).itemsize
+        with open(path, "ab") as stream:
+            # Records past the committed count are left over from a sync
+            # that did not finish; drop them before appending.
+            stream.truncate(state["count"] * itemsize)
+            if not records:
+                return
+            convert = columnar.candles_to_array if kind == CANDLES else \
+                columnar.trades_to_array
+            stream.write(convert(records).tobytes())
+        state["count"] += len(records)
+        last = _field(records[-1], "timestamp")
+        ids = [_field(record, "id") for record in records
+               if _field(record, "timestamp") == last]
+        if last == state["last_timestamp"]:
+            ids = state["last_ids"] + ids
+        state["last_timestamp"] = last
+        state["last_ids"] = [i for i in ids if i is not None]
+
+    @staticmethod
+    def _is_new(record, state):
+        timestamp = _field(record, "timestamp")
+        last = state["last_timestamp"]
+        if last is None or timestamp > last:
+            return True
+        return timestamp == last and _field(record, "id") not in \
+            state["last_ids"]
+
+    def _new_trades(self, trading_pair_id, state):
+        trades = columnar._records(self.client.get_recent_trades(
+            trading_pair_id, self.trades_limit), "trades")
+        new = [trade for trade in trades if self._is_new(trade, state)]
+        if state["last_timestamp"] is not None and trades and \
+                len(new) == len(trades) and len(trades) >= self.trades_limit:
+            state["gaps"] += 1
+        return sorted(new, key=lambda trade: _field(trade, "timestamp"))
+
+    def _new_candles(self, trading_pair_id, state):
+        candles = sorted(columnar._records(
+            self.client.get_candles(trading_pair_id), "candles"),
+                         key=lambda candle: _field(candle, "timestamp"))
+        last = state["last_timestamp"]
+        return [candle for candle in candles[:-1]
+                if last is None or _field(candle, "timestamp") > last]
+
+    def _new_own_trades(self, trading_pair_id, state):
+        new = []
+        last = state["last_timestamp"]
+        for trade in self.client.iter_trade_history(limit=self.page_size,
+                                                     prefetch=False):
+            if last is not None and _field(trade, "timestamp") < last:
+                break
+            if _field(trade, "trading_pair_id") == trading_pair_id and \
+                    self._is_new(trade, state):
+                new.append(trade)
+        return sorted(new, key=lambda trade: _field(trade, "timestamp"))
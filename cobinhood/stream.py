@@ -0,0 +1,311 @@
+"""!
+@file       stream.py
+
+@brief      Streaming market data from the cobinhood websocket api.
+@author     Sachin Jayaram
+@date       2/2018
+@document   https://cobinhood.github.io/api-public/#websocket-v2
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict, namedtuple
+
+from . import websocket
+
+logger = logging.getLogger(__name__)
+
+WS_URL_V2 = "wss://ws.cobinhood.com/v2/ws"
+
+TICKER = "ticker"
+TRADE = "trade"
+ORDER_BOOK = "order-book"
+CANDLE = "candle"
+
+KINDS = {"s": "snapshot", "u": "update", "error": "error"}
+
+StreamEvent = namedtuple(
+    "StreamEvent", ["channel_id", "type", "trading_pair_id", "kind", "data"])
+
+
+def channel_id(request):
+    """!
+    Channel id the server uses for a subscribe request.
+
+    @param request: subscribe request dict.
+    @return: channel id - Ex: "order-book.COB-BTC.1E-7"
+    """
+    parts = [request["type"], request["trading_pair_id"]]
+    if "precision" in request:
+        parts.append(request["precision"])
+    if "timeframe" in request:
+        parts.append(request["timeframe"])
+    return ".".join(parts)
+
+
+class CobinhoodStream(object):
+    """!
+    Market data subscriptions multiplexed over one websocket connection.
+
+    Decoded StreamEvent tuples are passed to per-channel callbacks, to
+    callbacks registered with on_event, and queued for `async for`
+    iteration. When the connection drops, or nothing arrives for
+    idle_timeout seconds despite the pings, the stream reconnects with an
+    exponential backoff and subscribes to every channel again. Malformed
+    messages and exceptions raised by callbacks are logged and skipped.
+    """
+
+    def __init__(self, url=WS_URL_V2, connect=websocket.connect,
+                 ping_interval=20, idle_timeout=60, reconnect_delay=0.5,
+                 max_reconnect_delay=30, queue_size=10000):
+        """!
+        CobinhoodStream initialization.
+
+        @param url: websocket url.
+        @param connect: coroutine function taking the url and returning a
+            connection with send, recv and close coroutines.
+        @param ping_interval: seconds between keep-alive pings.
+        @param idle_timeout: seconds without any message, pongs included,
+            before the connection is dropped as dead; None waits forever.
+        @param reconnect_delay: first delay before reconnecting.
+        @param max_reconnect_delay: upper bound of the reconnect backoff.
+        @param queue_size: events kept for iteration; the oldest are dropped
+            when the consumer falls behind.
+        """
+        self.url = url
+        self.connect = connect
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.queue_size = queue_size
+        self.subscriptions = OrderedDict()
+        self.subscribed = set()
+        self.connection_count = 0
+        self.event_count = 0
+        self.dropped_events = 0
+        self.bad_messages = 0
+        self.callback_errors = 0
+        self._callbacks = {}
+        self._event_callbacks = []
+        self._connection = None
+        self._queue = None
+        self._ready = None
+        self._task = None
+        self._closing = False
+
+    def subscribe_ticker(self, trading_pair_id, callback=None):
+        """!
+        Subscribe to ticker updates.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param callback: called with each StreamEvent of the channel.
+        @return: channel id.
+        """
+        return self._subscribe({"type": TICKER,
+                                "trading_pair_id": trading_pair_id}, callback)
+
+    def subscribe_trades(self, trading_pair_id, callback=None):
+        """!
+        Subscribe to trades.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param callback: called with each StreamEvent of the channel.
+        @return: channel id.
+        """
+        return self._subscribe({"type": TRADE,
+                                "trading_pair_id": trading_pair_id}, callback)
+
+    def subscribe_order_book(self, trading_pair_id, precision="1E-7",
+                             callback=None):
+        """!
+        Subscribe to order book snapshots and updates.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param precision: price aggregation of the book - Ex: "1E-7"
+        @param callback: called with each StreamEvent of the channel.
+        @return: channel id.
+        """
+        return self._subscribe({"type": ORDER_BOOK,
+                                "trading_pair_id": trading_pair_id,
+                                "precision": precision}, callback)
+
+    def subscribe_candles(self, trading_pair_id, timeframe="1m", callback=None):
+        """!
+        Subscribe to candles.
+
+        @param trading_pair_id: string literal - Ex: "BTC-USDT"
+        @param timeframe: candle timeframe - Ex: "1m", "1h", "1D"
+        @param callback: called with each StreamEvent of the channel.
+        @return: channel id.
+        """
+        return self._subscribe({"type": CANDLE,
+                                "trading_pair_id": trading_pair_id,
+                                "timeframe": timeframe}, callback)
+
+    def unsubscribe(self, channel):
+        """!
+        Stop receiving a channel.
+
+        @param channel: channel id returned by a subscribe method.
+        """
+        self.subscriptions.pop(channel, None)
+        self._callbacks.pop(channel, None)
+        self.subscribed.discard(channel)
+        self._send_soon({"action": "unsubscribe", "channel_id": channel})
+
+    def on_event(self, callback):
+        """!
+        Register a callback for the events of every channel.
+
+        @param callback: called with each StreamEvent.
+        """
+        self._event_callbacks.append(callback)
+
+    def _subscribe(self, request, callback):
+        channel = channel_id(request)
+        request = dict(request, action="subscribe")
+        self.subscriptions[channel] = request
+        if callback is not None:
+            self._callbacks.setdefault(channel, []).append(callback)
+        if self._ready is not None and channel not in self.subscribed:
+            self._ready.clear()
+        self._send_soon(request)
+        return channel
+
+    def _send_soon(self, message):
+        if self._connection is not None:
+            asyncio.ensure_future(self._send(self._connection, message))
+
+    @staticmethod
+    async def _send(connection, message):
+        try:
+            await connection.send(json.dumps(message))
+        except ConnectionError:
+            pass
+
+    async def start(self):
+        """!
+        Connect in the background and keep the connection up until closed.
+        """
+        if self._task is None:
+            self._closing = False
+            self._queue = asyncio.Queue(self.queue_size)
+            self._ready = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def wait_ready(self, timeout=None):
+        """!
+        Wait until every subscription is confirmed on the current connection.
+
+        @param timeout: seconds to wait, forever when None.
+        """
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def close(self):
+        """!
+        Close the connection and stop reconnecting.
+        """
+        self._closing = True
+        if self._connection is not None:
+            await self._connection.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._queue.get()
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while not self._closing:
+            try:
+                connection = await self.connect(self.url)
+            except (OSError, asyncio.TimeoutError, websocket.WebSocketClosed):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            delay = self.reconnect_delay
+            self.connection_count += 1
+            self._connection = connection
+            self.subscribed.clear()
+            self._ready.clear()
+            pinger = asyncio.ensure_future(self._ping(connection))
+            try:
+                for request in list(self.subscriptions.values()):
+                    await connection.send(json.dumps(request))
+                if not self.subscriptions:
+                    self._ready.set()
+                while True:
+                    message = await asyncio.wait_for(connection.recv(),
+                                                     self.idle_timeout)
+                    self._dispatch(message)
+            except asyncio.TimeoutError:
+                logger.warning("no message from %s in %s seconds, reconnecting",
+                               self.url, self.idle_timeout)
+            except (OSError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                pinger.cancel()
+                self._connection = None
+                await connection.close()
+
+    async def _ping(self, connection):
+        message = json.dumps({"action": "ping"})
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self._send(connection, message)
+
+    def _dispatch(self, message):
+        try:
+            message = json.loads(message)
+            header = message.get("h") or ["", "", ""]
+            channel, kind = str(header[0]), str(header[2])
+        except (ValueError, TypeError, AttributeError, IndexError, KeyError):
+            self.bad_messages += 1
+            logger.warning("skipping malformed message: %.200r", message)
+            return
+        if kind == "subscribed":
+            self.subscribed.add(channel)
+            if self.subscribed.issuperset(self.subscriptions):
+                self._ready.set()
+            return
+        kind = KINDS.get(kind)
+        if kind is None:
+            return
+        channel_type, _, trading_pair_id = channel.partition(".")
+        trading_pair_id = trading_pair_id.partition(".")[0]
+        data = message.get("d") if kind != "error" else header[3:]
+        event = StreamEvent(channel, channel_type, trading_pair_id, kind, data)
+        self.event_count += 1
+        for callback in self._callbacks.get(channel, ()):
+            self._call(callback, event)
+        for callback in self._event_callbacks:
+            self._call(callback, event)
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped_events += 1
+        self._queue.put_nowait(event)
+
+    def _call(self, callback, event):
+        try:
+            callback(event)
+        except Exception:
+            self.callback_errors += 1
+            logger.exception("stream callback %r failed on %s", callback,
+                             event.channel_id)
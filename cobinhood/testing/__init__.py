@@ -0,0 +1,208 @@
+"""!
+@file       __init__.py
+
+@brief      Local stand-in servers for exercising the cobinhood api wrapper offline.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import json
+import re
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+try:
+    from urlparse import urlsplit
+except ImportError:
+    from urllib.parse import urlsplit
+
+
+def success(result):
+    """!
+    Wrap a result in the cobinhood response envelope.
+
+    @param result: value of the result field.
+    @return: response dict.
+    """
+    return {"success": True, "result": result}
+
+
+class FakeTimer(object):
+    """!
+    Manually advanced clock for the timer arguments of caches, rate
+    limiters and metrics.
+    """
+
+    def __init__(self, step=0.0):
+        """!
+        FakeTimer initialization, starting at 0.
+
+        @param step: seconds the clock advances on every read.
+        """
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+NOT_FOUND = json.dumps({"success": False,
+                        "error": {"error_code": "not_found"}}).encode("utf-8")
+
+DEFAULT_ROUTES = {
+    "/v1/system/time": success({"time": 1520288666216}),
+    "/v1/system/info": success({"info": {"phase": "production",
+                                         "revision": "e21f66"}}),
+}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY a
+    # keep-alive client stalls on Nagle's algorithm and a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.mock.lock:
+            self.server.mock.connection_count += 1
+
+    def _respond(self):
+        server = self.server.mock
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with server.lock:
+            server.last_body = body
+            server.request_count += 1
+            server.active += 1
+            server.peak_active = max(server.peak_active, server.active)
+        try:
+            self._send_payload(server)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send_payload(self, server):
+        if server.latency:
+            time.sleep(server.latency)
+        status, body = server.body_for(urlsplit(self.path).path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class MockCobinhoodServer(object):
+    """!
+    Threaded HTTP/1.1 server answering cobinhood routes with canned payloads.
+
+    Use it as a context manager and point Cobinhood at it by replacing the
+    host of the request urls, or talk to it directly through a transport.
+    """
+
+    def __init__(self, routes=None, latency=0.0, host="127.0.0.1", port=0):
+        """!
+        MockCobinhoodServer initialization.
+
+        @param routes: dict of url path to response payload, or to a tuple
+            of http status and payload. A "*" path segment matches any
+            single segment - Ex: "/v1/market/tickers/*". Payloads are
+            serialized once, on first use.
+        @param latency: seconds to sleep before answering each request.
+        @param host: interface to bind.
+        @param port: port to bind, 0 picks a free one.
+        """
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.latency = latency
+        self.request_count = 0
+        self.connection_count = 0
+        self.last_body = b""
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+        self._bodies = {}
+        self._patterns = [
+            (re.compile("^" + re.escape(route).replace(r"\*", "[^/]+") + "$"),
+             route) for route in self.routes if "*" in route]
+        self._httpd = _ThreadingHTTPServer((host, port), _MockHandler)
+        self._httpd.mock = self
+        self._thread = None
+
+    def body_for(self, path):
+        """!
+        Serialized response for a request path.
+
+        @param path: url path of the request.
+        @return: (http status, body bytes).
+        """
+        cached = self._bodies.get(path)
+        if cached is not None:
+            return cached
+        route = path if path in self.routes else None
+        if route is None:
+            for pattern, candidate in self._patterns:
+                if pattern.match(path):
+                    route = candidate
+                    break
+        if route is None:
+            return 404, NOT_FOUND
+        payload = self.routes[route]
+        status = 200
+        if isinstance(payload, tuple):
+            status, payload = payload
+        body = payload if isinstance(payload, bytes) else \
+            json.dumps(payload).encode("utf-8")
+        self._bodies[path] = status, body
+        return status, body
+
+    @property
+    def url(self):
+        """!
+        Base url of the server, without a trailing slash.
+        """
+        host, port = self._httpd.server_address[:2]
+        return "http://{0}:{1}".format(host, port)
+
+    def start(self):
+        """!
+        Start serving on a background thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """!
+        Stop serving and release the socket.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,245 @@
+"""!
+@file       payloads.py
+
+@brief      Deterministic payloads shaped like cobinhood api responses.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import random
+
+from . import success
+
+BASE_TIMESTAMP = 1520288666216
+
+
+def _rng(seed):
+    return random.Random(seed)
+
+
+def order_book(levels=50, seed=1):
+    """!
+    @return: get_order_book response with levels per side.
+    """
+    rng = _rng(seed)
+    mid = 10000.0
+    bids = [["{0:.2f}".format(mid - 0.5 - index * 0.5), str(rng.randint(1, 9)),
+             "{0:.8f}".format(rng.uniform(0.001, 5))] for index in range(levels)]
+    asks = [["{0:.2f}".format(mid + 0.5 + index * 0.5), str(rng.randint(1, 9)),
+             "{0:.8f}".format(rng.uniform(0.001, 5))] for index in range(levels)]
+    return success({"orderbook": {"sequence": 1939573, "bids": bids,
+                                  "asks": asks}})
+
+
+def trades(count=50, trading_pair_id="BTC-USDT", seed=2):
+    """!
+    @return: get_recent_trades response with count trades, newest first.
+    """
+    rng = _rng(seed)
+    return success({"trades": [
+        {"id": "{0:032x}".format(rng.getrandbits(128)),
+         "trading_pair_id": trading_pair_id,
+         "price": "{0:.8f}".format(rng.uniform(9900, 10100)),
+         "size": "{0:.8f}".format(rng.uniform(0.0001, 2)),
+         "maker_side": rng.choice(("bid", "ask")),
+         "timestamp": BASE_TIMESTAMP - index * 1000}
+        for index in range(count)]})
+
+
+def candles(count=500, seed=3):
+    """!
+    @return: get_candles response with count one minute candles, oldest first.
+    """
+    rng = _rng(seed)
+    rows = []
+    price = 10000.0
+    for index in range(count):
+        close = price + rng.uniform(-20, 20)
+        rows.append({"timestamp": BASE_TIMESTAMP + index * 60000,
+                     "open": "{0:.1f}".format(price),
+                     "close": "{0:.1f}".format(close),
+                     "high": "{0:.1f}".format(max(price, close) + rng.uniform(0, 5)),
+                     "low": "{0:.1f}".format(min(price, close) - rng.uniform(0, 5)),
+                     "volume": "{0:.8f}".format(rng.uniform(0, 50))})
+        price = close
+    return success({"candles": rows})
+
+
+def orders(count=50, result_key="orders", seed=4):
+    """!
+    @return: get_all_orders style response with count orders.
+    """
+    rng = _rng(seed)
+    return success({result_key: [
+        {"id": "{0:032x}".format(rng.getrandbits(128)),
+         "trading_pair": "BTC-USDT",
+         "state": "open",
+         "side": rng.choice(("bid", "ask")),
+         "type": "limit",
+         "price": "{0:.2f}".format(rng.uniform(9000, 11000)),
+         "size": "{0:.4f}".format(rng.uniform(0.01, 2)),
+         "filled": "0",
+         "timestamp": BASE_TIMESTAMP - index * 1000,
+         "eq_price": "0"}
+        for index in range(count)]})
+
+
+def ledger(count=50, seed=5):
+    """!
+    @return: get_ledger_entries response with count entries.
+    """
+    rng = _rng(seed)
+    return success({"ledger": [
+        {"action": "trade",
+         "type": "exchange",
+         "trade_id": "{0:032x}".format(rng.getrandbits(128)),
+         "currency": "BTC",
+         "amount": "{0:+.8f}".format(rng.uniform(-1, 1)),
+         "balance": "{0:.8f}".format(rng.uniform(0, 100)),
+         "timestamp": BASE_TIMESTAMP - index * 1000}
+        for index in range(count)]})
+
+
+def currencies(count=50):
+    """!
+    @return: get_currencies response with count currencies.
+    """
+    return success({"currencies": [
+        {"currency": "C{0:03d}".format(index), "name": "Currency {0}".format(index),
+         "min_unit": "0.00000001", "deposit_fee": "0", "withdrawal_fee": "0.001",
+         "type": "native", "is_active": True, "funding_frozen": False}
+        for index in range(count)]})
+
+
+def trading_pair_ids(count=200):
+    """!
+    @return: list of count trading pair ids.
+    """
+    quotes = ("BTC", "ETH", "USDT", "COB")
+    return ["C{0:03d}-{1}".format(index // len(quotes), quotes[index % len(quotes)])
+            for index in range(count)]
+
+
+def trading_pairs(count=200):
+    """!
+    @return: get_all_trading_pairs response with count pairs.
+    """
+    rows = []
+    for pair in trading_pair_ids(count):
+        base, quote = pair.split("-")
+        rows.append({"id": pair, "base_currency_id": base,
+                     "quote_currency_id": quote, "base_min_size": "0.005",
+                     "base_max_size": "10000", "quote_increment": "0.00000001"})
+    return success({"trading_pairs": rows})
+
+
+def stats(count=200, seed=6):
+    """!
+    @return: get_trading_statistics response for count pairs.
+    """
+    rng = _rng(seed)
+    result = {}
+    for pair in trading_pair_ids(count):
+        price = rng.uniform(0.0001, 10000)
+        result[pair] = {"id": pair, "last_price": "{0:.8f}".format(price),
+                        "lowest_ask": "{0:.8f}".format(price * 1.001),
+                        "highest_bid": "{0:.8f}".format(price * 0.999),
+                        "base_volume": "{0:.8f}".format(rng.uniform(0, 1000)),
+                        "quote_volume": "{0:.8f}".format(rng.uniform(0, 1000)),
+                        "is_frozen": False,
+                        "high_24hr": "{0:.8f}".format(price * 1.05),
+                        "low_24hr": "{0:.8f}".format(price * 0.95),
+                        "percent_changed_24hr": "{0:.6f}".format(rng.uniform(-5, 5))}
+    return success(result)
+
+
+def ticker(trading_pair_id="BTC-USDT"):
+    """!
+    @return: get_ticker response.
+    """
+    return success({"ticker": {
+        "trading_pair_id": trading_pair_id, "timestamp": BASE_TIMESTAMP,
+        "24h_high": "10100.5", "24h_low": "9900.1", "24h_open": "10000.0",
+        "24h_volume": "7842.11542553", "last_trade_price": "10001.3",
+        "highest_bid": "10001.2", "lowest_ask": "10001.4"}})
+
+
+def balances(count=20, seed=7):
+    """!
+    @return: get_wallet_balances response with count balances.
+    """
+    rng = _rng(seed)
+    return success({"balances": [
+        {"currency": "C{0:03d}".format(index), "type": "exchange",
+         "total": "{0:.8f}".format(rng.uniform(0, 100)), "on_order": "0",
+         "locked": False, "usd_value": "{0:.2f}".format(rng.uniform(0, 1e5)),
+         "btc_value": "{0:.8f}".format(rng.uniform(0, 10))}
+        for index in range(count)]})
+
+
+def transfers(kind, count=20, seed=8):
+    """!
+    @param kind: "deposit" or "withdrawal".
+    @return: get_all_deposits or get_all_withdrawals response.
+    """
+    rng = _rng(seed)
+    rows = [{kind + "_id": "{0:032x}".format(rng.getrandbits(128)),
+             "user_id": "62056df2d4cf8fb9b15c7238b89a1439",
+             "status": "tx_confirmed", "confirmations": 29,
+             "required_confirmations": 29, "created_at": BASE_TIMESTAMP,
+             "completed_at": BASE_TIMESTAMP + 60000,
+             "txhash": "0x{0:064x}".format(rng.getrandbits(256)),
+             "currency": "BTC", "amount": "{0:.8f}".format(rng.uniform(0, 5)),
+             "fee": "0.0005"} for _ in range(count)]
+    return success({kind + "s": rows})
+
+
+def addresses(result_key, count=5, seed=9):
+    """!
+    @return: deposit or withdrawal addresses response.
+    """
+    rng = _rng(seed)
+    return success({result_key: [
+        {"id": "{0:032x}".format(rng.getrandbits(128)), "currency": "BTC",
+         "address": "0x{0:040x}".format(rng.getrandbits(160)),
+         "created_at": BASE_TIMESTAMP, "type": "exchange"}
+        for _ in range(count)]})
+
+
+def api_routes():
+    """!
+    Routes for MockCobinhoodServer covering every /v1 path used by Cobinhood,
+    with payload sizes in line with the live exchange.
+
+    @return: dict of url path to response payload.
+    """
+    order = orders(1)["result"]["orders"][0]
+    trade = trades(1)["result"]["trades"][0]
+    deposit = transfers("deposit", 1)["result"]["deposits"][0]
+    withdrawal = transfers("withdrawal", 1)["result"]["withdrawals"][0]
+    return {
+        "/v1/system/time": success({"time": BASE_TIMESTAMP}),
+        "/v1/system/info": success({"info": {"phase": "production",
+                                             "revision": "e21f66"}}),
+        "/v1/market/currencies": currencies(),
+        "/v1/market/trading_pairs": trading_pairs(),
+        "/v1/market/orderbooks/*": order_book(50),
+        "/v1/market/stats": stats(),
+        "/v1/market/tickers/*": ticker(),
+        "/v1/market/trades/*": trades(20),
+        "/v1/chart/candles/*": candles(500),
+        "/v1/trading/orders/*": success({"order": order}),
+        "/v1/trading/orders/*/trades": trades(5),
+        "/v1/trading/orders": orders(20),
+        "/v1/trading/order_history": orders(50),
+        "/v1/trading/trades/*": success({"trade": trade}),
+        "/v1/trading/trades": trades(50),
+        "/v1/wallet/balances": balances(),
+        "/v1/wallet/ledger": ledger(20),
+        "/v1/wallet/deposit_addresses": addresses("deposit_addresses"),
+        "/v1/wallet/withdrawal_addresses": addresses("withdrawal_addresses"),
+        "/v1/wallet/withdrawals/*": success({"withdrawal": withdrawal}),
+        "/v1/wallet/withdrawals": transfers("withdrawal"),
+        "/v1/wallet/deposits/*": success({"deposit": deposit}),
+        "/v1/wallet/deposits": transfers("deposit"),
+    }
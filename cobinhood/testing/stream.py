@@ -0,0 +1,147 @@
+"""!
+@file       stream.py
+
+@brief      Local websocket stand-in for the cobinhood streaming api.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import asyncio
+import json
+
+from .. import websocket
+from ..stream import channel_id
+
+
+class MockStreamServer(object):
+    """!
+    asyncio websocket server speaking the cobinhood v2 channel protocol.
+
+    Answers subscribe, unsubscribe and ping actions, sends a configured
+    snapshot after each subscription and lets tests publish updates or drop
+    every connection to exercise reconnects.
+    """
+
+    def __init__(self, snapshots=None, host="127.0.0.1", port=0):
+        """!
+        MockStreamServer initialization.
+
+        @param snapshots: dict of channel id to snapshot data.
+        @param host: interface to bind.
+        @param port: port to bind, 0 picks a free one.
+        """
+        self.snapshots = dict(snapshots or {})
+        self.host = host
+        self.port = port
+        self.connection_count = 0
+        self.subscribe_count = 0
+        self._server = None
+        self._connections = {}
+
+    @property
+    def url(self):
+        """!
+        ws:// url of the server.
+        """
+        return "ws://{0}:{1}/v2/ws".format(self.host, self.port)
+
+    async def start(self):
+        """!
+        Start listening.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host,
+                                                  self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """!
+        Drop every connection and stop listening.
+        """
+        await self.drop_connections()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def publish(self, channel, data, kind="u"):
+        """!
+        Send a message to every connection subscribed to a channel.
+
+        @param channel: channel id.
+        @param data: message data.
+        @param kind: "s" for a snapshot, "u" for an update.
+        @return: number of connections the message was sent to.
+        """
+        message = json.dumps({"h": [channel, "2", kind], "d": data})
+        return await self.send_raw(message, channel)
+
+    async def send_raw(self, message, channel=None):
+        """!
+        Send a text frame as is, e.g. to exercise malformed messages.
+
+        @param message: text to send.
+        @param channel: only send to connections subscribed to this channel,
+            every connection when None.
+        @return: number of connections the message was sent to.
+        """
+        sent = 0
+        for connection, channels in list(self._connections.items()):
+            if channel is None or channel in channels:
+                try:
+                    await connection.send(message)
+                    sent += 1
+                except ConnectionError:
+                    pass
+        return sent
+
+    async def drop_connections(self):
+        """!
+        Close every client connection.
+        """
+        for connection in list(self._connections):
+            await connection.close(1001)
+        self._connections.clear()
+
+    async def _handle(self, reader, writer):
+        try:
+            connection = await websocket.accept(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        self.connection_count += 1
+        channels = self._connections[connection] = set()
+        try:
+            while True:
+                request = json.loads(await connection.recv())
+                action = request.get("action")
+                if action == "subscribe":
+                    channel = channel_id(request)
+                    channels.add(channel)
+                    self.subscribe_count += 1
+                    await self._reply(connection, channel, "subscribed", [])
+                    if channel in self.snapshots:
+                        await self._reply(connection, channel, "s",
+                                          self.snapshots[channel])
+                elif action == "unsubscribe":
+                    channels.discard(request.get("channel_id"))
+                    await self._reply(connection, request.get("channel_id"),
+                                      "unsubscribed", [])
+                elif action == "ping":
+                    await self._reply(connection, "", "pong", [])
+                else:
+                    await self._reply(connection, "", "error", [],
+                                      "4001", "undefined_action")
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(connection, None)
+            await connection.close()
+
+    @staticmethod
+    async def _reply(connection, channel, kind, data, *extra):
+        header = [channel, "2", kind] + list(extra)
+        await connection.send(json.dumps({"h": header, "d": data}))
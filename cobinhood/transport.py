@@ -0,0 +1,165 @@
+"""!
+@file       transport.py
+
+@brief      Pooled keep-alive HTTP transport for the cobinhood api wrapper.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import json
+import threading
+import time
+
+from .exceptions import ExceptionCobinhood, RetryableError
+from .metrics import record_response_size
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        json_loads = ujson.loads
+    except ImportError:
+        json_loads = json.loads
+
+
+def raw_bytes(content):
+    """!
+    Decoder returning the response body undecoded, for callers that forward
+    payloads without parsing them.
+    """
+    return content
+
+
+def _is_api_error(content):
+    """!
+    @return: True when a response body is the api's own json error, False
+        for e.g. the html page of a gateway.
+    """
+    try:
+        body = json.loads(content.decode("utf-8"))
+    except ValueError:
+        return False
+    return isinstance(body, dict) and "success" in body
+
+
+REQUEST_METHODS = {
+    "get": "GET",
+    "post": "POST",
+    "put": "PUT",
+    "delete": "DELETE",
+}
+
+
+class HTTPTransport(object):
+    """!
+    Callable transport that keeps connections to the cobinhood servers alive.
+
+    An instance can be passed as the perform argument of Cobinhood. It owns a
+    requests.Session whose connection pool is reused across calls, so only
+    the first request to a host pays for the TCP and TLS handshake. requests
+    is imported and the session created on the first call.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, keep_alive=True,
+                 decoder=json_loads):
+        """!
+        HTTPTransport initialization.
+
+        @param pool_connections: number of per-host pools to cache.
+        @param pool_maxsize: maximum number of connections kept per host.
+        @param pool_block: block when the pool is exhausted instead of
+            opening throwaway connections.
+        @param connect_timeout: seconds to wait for a connection.
+        @param read_timeout: seconds to wait for the server to respond.
+        @param keep_alive: reuse connections between calls.
+        @param decoder: function decoding the response body bytes. Defaults
+            to the fastest installed json backend (orjson, ujson, json);
+            raw_bytes skips decoding.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.decoder = decoder
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """!
+        requests.Session with the connection pool, created on first use.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block,
+                              max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def __call__(self, request_url, auth_token, request_type, payload=None):
+        """!
+        Make a request url call over a pooled connection.
+
+        @param request_url: the generated url for making the api call.
+        @param auth_token: api key sent in the Authorization header.
+        @param request_type: request type [GET, PUT, POST, DELETE].
+        @param payload: dict sent as the json body, None to send no body.
+        @return: decoded response from the cobinhood exchange.
+        @raise RetryableError: for a 429 or 5xx status whose body is not the
+            api's json error, e.g. a gateway error page.
+        """
+        method = REQUEST_METHODS.get(request_type)
+        if method is None:
+            raise ExceptionCobinhood("Error: invalid request type")
+        nonce = str(int(time.time() * 1000))
+        header = {"Authorization": auth_token, "nonce": nonce}
+        response = self.session.request(
+            method, request_url, headers=header, json=payload,
+            timeout=self.timeout)
+        content = response.content
+        record_response_size(len(content))
+        status = response.status_code
+        # Transient failures answered by a proxy or gateway rather than the
+        # api itself.
+        if (status == 429 or status >= 500) and not _is_api_error(content):
+            raise RetryableError("Error: HTTP {0} from {1}".format(
+                status, request_url))
+        return self.decoder(content)
+
+    def close(self):
+        """!
+        Close every pooled connection.
+        """
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,251 @@
+"""!
+@file       websocket.py
+
+@brief      Minimal RFC 6455 websocket client and server on asyncio streams.
+@author     Sachin Jayaram
+@date       2/2018
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import ssl
+import struct
+from urllib.parse import urlsplit
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+MAX_MESSAGE_SIZE = 1 << 24
+
+
+class WebSocketClosed(ConnectionError):
+    """!
+    Raised when reading from or writing to a closed websocket.
+    """
+
+
+def _accept_key(key):
+    return base64.b64encode(hashlib.sha1(key + WS_GUID).digest())
+
+
+def _mask(payload, mask):
+    """!
+    XOR a payload with a 4 byte mask using one big integer operation.
+    """
+    length = len(payload)
+    if not length:
+        return payload
+    repeated = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^
+            int.from_bytes(repeated, "big")).to_bytes(length, "big")
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+class WebSocket(object):
+    """!
+    One websocket connection, either end.
+
+    Messages are sent and received whole; fragmented messages are
+    reassembled and pings are answered while reading.
+    """
+
+    def __init__(self, reader, writer, is_client):
+        """!
+        WebSocket initialization, after the opening handshake.
+
+        @param reader: asyncio StreamReader of the connection.
+        @param writer: asyncio StreamWriter of the connection.
+        @param is_client: mask outgoing frames as a client must.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.is_client = is_client
+        self.closed = False
+
+    async def send(self, message):
+        """!
+        Send a text message.
+
+        @param message: str to send.
+        """
+        await self._send_frame(OP_TEXT, message.encode("utf-8"))
+
+    async def recv(self):
+        """!
+        Receive the next text or binary message.
+
+        @return: str for text messages, bytes for binary messages.
+        """
+        message_opcode = None
+        fragments = []
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self._abort()
+                raise WebSocketClosed("connection lost")
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                if not self.closed:
+                    await self._send_frame(OP_CLOSE, payload[:2])
+                self._abort()
+                raise WebSocketClosed("closed by peer")
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+                fragments = []
+            fragments.append(payload)
+            if fin:
+                data = b"".join(fragments)
+                if message_opcode == OP_TEXT:
+                    return data.decode("utf-8")
+                return data
+
+    async def ping(self, payload=b""):
+        """!
+        Send a ping frame.
+        """
+        await self._send_frame(OP_PING, payload)
+
+    async def close(self, code=1000):
+        """!
+        Send a close frame and close the connection.
+
+        @param code: websocket close status code.
+        """
+        if self.closed:
+            return
+        try:
+            await self._send_frame(OP_CLOSE, struct.pack("!H", code))
+        except ConnectionError:
+            pass
+        self._abort()
+
+    def _abort(self):
+        self.closed = True
+        self.writer.close()
+
+    async def _send_frame(self, opcode, payload):
+        if self.closed and opcode != OP_CLOSE:
+            raise WebSocketClosed("websocket is closed")
+        length = len(payload)
+        mask_bit = 0x80 if self.is_client else 0
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, mask_bit | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, length)
+        if self.is_client:
+            mask = os.urandom(4)
+            self.writer.write(header + mask + _mask(payload, mask))
+        else:
+            self.writer.write(header + payload)
+        await self.writer.drain()
+
+    async def _read_frame(self):
+        reader = self.reader
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if length > MAX_MESSAGE_SIZE:
+            raise WebSocketClosed("frame too large")
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask is not None:
+            payload = _mask(payload, mask)
+        return bool(first & 0x80), first & 0x0F, payload
+
+
+async def connect(url, ssl_context=None, timeout=10):
+    """!
+    Open a client websocket connection.
+
+    @param url: ws:// or wss:// url.
+    @param ssl_context: ssl context for wss, defaults to the system one.
+    @param timeout: seconds to wait for the connection and handshake.
+    @return: connected WebSocket.
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == "wss"
+    port = parts.port or (443 if secure else 80)
+    context = None
+    if secure:
+        context = ssl_context or ssl.create_default_context()
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=context), timeout)
+    key = base64.b64encode(os.urandom(16))
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    writer.write((
+        "GET {0} HTTP/1.1\r\n"
+        "Host: {1}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        "Sec-WebSocket-Key: {2}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n").format(
+            target, parts.netloc, key.decode("ascii")).encode("latin-1"))
+
+    async def handshake():
+        status = await reader.readuntil(b"\r\n")
+        headers = await _read_headers(reader)
+        return status, headers
+
+    try:
+        status, headers = await asyncio.wait_for(handshake(), timeout)
+    except BaseException:
+        writer.close()
+        raise
+    accept = headers.get("sec-websocket-accept", "").encode("ascii")
+    if status.split(b" ")[1:2] != [b"101"] or accept != _accept_key(key):
+        writer.close()
+        raise WebSocketClosed("websocket handshake failed: {0!r}".format(status))
+    return WebSocket(reader, writer, is_client=True)
+
+
+async def accept(reader, writer):
+    """!
+    Complete the server side of the opening handshake.
+
+    @param reader: asyncio StreamReader of an accepted connection.
+    @param writer: asyncio StreamWriter of an accepted connection.
+    @return: connected WebSocket.
+    """
+    await reader.readuntil(b"\r\n")
+    headers = await _read_headers(reader)
+    key = headers.get("sec-websocket-key", "").encode("ascii")
+    if not key:
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+        writer.close()
+        raise WebSocketClosed("not a websocket request")
+    writer.write(
+        b"HTTP/1.1 101 Switching Protocols\r\n"
+        b"Upgrade: websocket\r\n"
+        b"Connection: Upgrade\r\n"
+        b"Sec-WebSocket-Accept: " + _accept_key(key) + b"\r\n\r\n")
+    await writer.drain()
+    return WebSocket(reader, writer, is_client=False)
@@ -0,0 +1,5 @@
+"""!
+ Test modules using async def, which python 2 cannot compile. Their names
+ do not match the test discovery patterns; the matching tests/test_*.py
+ modules import them on python 3.6+.
+"""
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the asyncio Cobinhood client, collected through
+ tests/test_async_cobinhood.py on python 3.6+.
+"""
+
+from __future__ import print_function
+import asyncio
+import json
+import time
+import unittest
+import cobinhood
+from cobinhood.testing import MockCobinhoodServer, success
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BATCH_METHODS = ("get_tickers", "get_order_books", "get_recent_trades_batch",
+                 "get_candles_batch")
+
+BULK_METHODS = ("place_orders", "cancel_orders", "modify_orders")
+
+
+def run(coroutine):
+    """!
+    Run a coroutine to completion on a fresh event loop.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAsyncCobinhood(unittest.TestCase):
+    """!
+    Unit tests for AsyncCobinhood and AsyncHTTPTransport.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        routes = {
+            "/v1/system/time": success({"time": 1520288666216}),
+            "/v1/market/tickers/COB-ETH": success({"ticker": {
+                "trading_pair_id": "COB-ETH"}}),
+        }
+        self.server = MockCobinhoodServer(routes).start()
+        self.base_url = self.server.url + "/{version}/{fn_call}?"
+
+    def tearDown(self):
+        """!
+        Stop the stand-in server.
+        """
+        self.server.stop()
+
+    def test_method_surface(self):
+        """!
+        Test every public Cobinhood method exists and returns an awaitable.
+        """
+        calls = []
+
+        async def perform(request_url, auth_token, request_type, *payload):
+            calls.append((request_url, request_type))
+            return {"success": True, "result": {
+                "orderbook": {"sequence": 1, "bids": [], "asks": []}}}
+
+        async def call_all():
+            cob = cobinhood.AsyncCobinhood(perform=perform)
+            for name in dir(cobinhood.Cobinhood):
+                if not name.startswith(("get_", "place_", "cancel_", "modify_")):
+                    continue
+                columnar = name.endswith(("_array", "_arrays"))
+                if columnar and numpy is None:
+                    continue
+                method = getattr(cob, name)
+                if name in BATCH_METHODS:
+                    responses = await method(["COB-ETH"])
+                    self.assertTrue(responses["COB-ETH"]["success"], name)
+                    continue
+                if name in BULK_METHODS:
+                    self.assertEqual(await method([]), [], name)
+                    continue
+                args = [""] * (method.__code__.co_argcount - 1
+                               - len(method.__defaults__ or ()))
+                response = await method(*args)
+                if columnar:
+                    continue
+                self.assertTrue(response["success"], name)
+            return len(calls)
+
+        self.assertTrue(run(call_all()) > 20)
+
+    def test_get_ticker(self):
+        """!
+        Test a call through the default transport.
+        """
+        async def get_ticker():
+            async with cobinhood.AsyncCobinhood(base_url=self.base_url) as cob:
+                return await cob.get_ticker("COB-ETH")
+
+        response = run(get_ticker())
+        self.assertEqual(response["result"]["ticker"]["trading_pair_id"], "COB-ETH")
+
+    def test_concurrent_calls_share_pool(self):
+        """!
+        Test concurrent calls overlap and are bounded by the pool size.
+        """
+        self.server.latency = 0.1
+
+        async def fan_out():
+            transport = cobinhood.AsyncHTTPTransport(pool_maxsize=10)
+            async with cobinhood.AsyncCobinhood(perform=transport,
+                                                base_url=self.base_url) as cob:
+                start = time.time()
+                responses = await asyncio.gather(
+                    *[cob.get_system_time() for _ in range(20)])
+                elapsed = time.time() - start
+                await asyncio.gather(*[cob.get_system_time() for _ in range(10)])
+                return responses, elapsed
+
+        responses, elapsed = run(fan_out())
+        self.assertEqual(len(responses), 20)
+        self.assertTrue(elapsed < 1.0)
+        self.assertTrue(self.server.peak_active <= 10)
+        self.assertEqual(self.server.connection_count, 10)
+
+    def test_place_orders(self):
+        """!
+        Test bulk orders send their payloads over the pooled connections and
+        return results in order.
+        """
+        self.server.routes["/v1/trading/orders"] = success({"order": {}})
+        orders = [{"trading_pair_id": "COB-ETH", "side": "bid",
+                   "type": "limit", "price": "0.001", "size": "10"}] * 3
+
+        async def place_orders():
+            async with cobinhood.AsyncCobinhood(base_url=self.base_url,
+                                                max_workers=2) as cob:
+                return await cob.place_orders(orders)
+
+        self.server.latency = 0.01
+        responses = run(place_orders())
+        self.assertEqual([response["success"] for response in responses],
+                         [True, True, True])
+        self.assertEqual(json.loads(self.server.last_body.decode("utf-8"))[
+            "size"], "10")
+        self.assertTrue(self.server.connection_count <= 2)
+
+    def test_batch_errors_per_key(self):
+        """!
+        Test batch methods key results by pair and report failures per pair.
+        """
+        async def get_tickers():
+            async with cobinhood.AsyncCobinhood(base_url=self.base_url,
+                                                max_workers=2) as cob:
+                return await cob.get_tickers(["COB-ETH", "XYZ-ETH"])
+
+        responses = run(get_tickers())
+        self.assertTrue(responses["COB-ETH"]["success"])
+        self.assertFalse(responses["XYZ-ETH"]["success"])
+
+    def test_iter_all_orders(self):
+        """!
+        Test paginating iterators are async generators.
+        """
+        pages = {1: [{"id": 1}, {"id": 2}], 2: [{"id": 3}]}
+
+        async def perform(request_url, auth_token, request_type):
+            page = int(request_url.split("page=")[1].split("&")[0])
+            return {"success": True, "result": {"orders": pages[page]}}
+
+        async def collect():
+            cob = cobinhood.AsyncCobinhood(perform=perform)
+            return [order["id"] async for order in cob.iter_all_orders(limit=2)]
+
+        self.assertEqual(run(collect()), [1, 2, 3])
+
+    def test_page_ignored(self):
+        """!
+        Test iteration ends when the endpoint serves the same page again.
+        """
+        async def perform(request_url, auth_token, request_type):
+            return {"success": True, "result": {"orders": [{"id": 1},
+                                                           {"id": 2}]}}
+
+        async def collect():
+            cob = cobinhood.AsyncCobinhood(perform=perform)
+            return [order["id"] async for order in cob.iter_all_orders(limit=2)]
+
+        self.assertEqual(run(collect()), [1, 2])
+
+    def test_metrics(self):
+        """!
+        Test concurrent calls are recorded with their response sizes.
+        """
+        async def fan_out():
+            async with cobinhood.AsyncCobinhood(base_url=self.base_url,
+                                                metrics=True) as cob:
+                await asyncio.gather(*[cob.get_ticker(pair) for pair in
+                                       ("COB-ETH", "COB-ETH", "XYZ-ETH")])
+                return cob.metrics.snapshot()
+
+        stats = run(fan_out())["market/tickers/{id}"]["get"]
+        body = self.server.body_for("/v1/market/tickers/COB-ETH")[1]
+        not_found = self.server.body_for("/v1/market/tickers/XYZ-ETH")[1]
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["errors"], {"not_found": 1})
+        self.assertEqual(stats["response_bytes"], 2 * len(body) + len(not_found))
+
+    def test_stale_connection(self):
+        """!
+        Test a GET failing on a reused keep-alive connection is sent again
+        on a fresh one, and a POST raises instead of being sent twice.
+        """
+        requests = []
+        response = (b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+                    b"Connection: keep-alive\r\n\r\n{}")
+
+        async def handle(reader, writer):
+            # Answer the first request of each connection, then drop the
+            # connection when the next one arrives.
+            answered = False
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    writer.close()
+                    return
+                length = [int(line.split(b":")[1]) for line in
+                          head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length")]
+                await reader.readexactly(length[0] if length else 0)
+                requests.append(head.split(b" ")[0])
+                if answered:
+                    writer.close()
+                    return
+                writer.write(response)
+                answered = True
+
+        async def scenario(request_type):
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            url = "http://127.0.0.1:{0}/v1/x".format(
+                server.sockets[0].getsockname()[1])
+            transport = cobinhood.AsyncHTTPTransport()
+            try:
+                await transport(url, "", request_type)
+                return await transport(url, "", request_type, {"a": 1})
+            finally:
+                await transport.close()
+                server.close()
+                # Let the handlers see their connections close.
+                await asyncio.sleep(0.01)
+
+        self.assertEqual(run(scenario("get")), {})
+        self.assertEqual(requests, [b"GET"] * 3)
+        del requests[:]
+        with self.assertRaises((ConnectionError, asyncio.IncompleteReadError)):
+            run(scenario("post"))
+        self.assertEqual(requests, [b"POST"] * 2)
+
+    def test_sync_with_rejected(self):
+        """!
+        Test a plain with block is refused rather than leaving close()
+        unawaited.
+        """
+        cob = cobinhood.AsyncCobinhood(perform=lambda *args: None)
+        with self.assertRaises(TypeError):
+            with cob:
+                pass
+
+    def test_query_api_error(self):
+        """!
+        Test transport failures surface as ExceptionCobinhood.
+        """
+        async def broken():
+            cob = cobinhood.AsyncCobinhood(base_url="http://127.0.0.1:1/{version}/{fn_call}?")
+            await cob.get_system_time()
+
+        with self.assertRaises(cobinhood.ExceptionCobinhood):
+            run(broken())
+
+
+if __name__ == "__main__":
+    unittest.main()
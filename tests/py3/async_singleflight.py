@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for coalescing of identical in-flight asyncio Cobinhood calls,
+ collected through tests/test_async_singleflight.py on python 3.6+.
+"""
+
+from __future__ import print_function
+import asyncio
+import unittest
+import cobinhood
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    """!
+    Unit tests for AsyncSingleFlight on the asyncio client.
+    """
+
+    def test_identical_calls_share_request(self):
+        """!
+        Test concurrent identical awaited GETs send one request.
+        """
+        urls = []
+
+        async def perform(request_url, auth_token, request_type):
+            urls.append(request_url)
+            await asyncio.sleep(0.05)
+            if "XYZ" in request_url:
+                raise IOError("reset")
+            return {"success": True, "result": {}}
+
+        async def fan_out():
+            cob = cobinhood.AsyncCobinhood(perform=perform, singleflight=True)
+            responses = await asyncio.gather(
+                *[cob.get_ticker("BTC-USDT") for _ in range(5)])
+            failures = await asyncio.gather(
+                *[cob.get_ticker("XYZ-USDT") for _ in range(3)],
+                return_exceptions=True)
+            return cob, responses, failures
+
+        loop = asyncio.new_event_loop()
+        try:
+            cob, responses, failures = loop.run_until_complete(fan_out())
+        finally:
+            loop.close()
+        self.assertEqual(len(urls), 2)
+        self.assertTrue(all(response is responses[0] for response in responses))
+        self.assertTrue(all(isinstance(failure, cobinhood.ExceptionCobinhood)
+                            for failure in failures))
+        self.assertEqual(cob.singleflight.stats(),
+                         {"requests": 2, "saved": 6, "in_flight": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
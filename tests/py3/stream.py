@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood streaming client, collected through
+ tests/test_stream.py on python 3.6+.
+"""
+
+from __future__ import print_function
+import asyncio
+import unittest
+import cobinhood
+from cobinhood import websocket
+from cobinhood.testing.stream import MockStreamServer
+
+
+def run(coroutine):
+    """!
+    Run a coroutine to completion on a fresh event loop.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coroutine, 10))
+    finally:
+        loop.close()
+
+
+class TestWebSocket(unittest.TestCase):
+    """!
+    Unit tests for the websocket framing.
+    """
+
+    def test_round_trip(self):
+        """!
+        Test masked client frames and large messages survive a round trip.
+        """
+        async def echo(reader, writer):
+            connection = await websocket.accept(reader, writer)
+            await connection.send(await connection.recv())
+            await connection.close()
+
+        async def round_trip(message):
+            server = await asyncio.start_server(echo, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            connection = await websocket.connect("ws://127.0.0.1:{0}/".format(port))
+            await connection.send(message)
+            reply = await connection.recv()
+            with self.assertRaises(websocket.WebSocketClosed):
+                await connection.recv()
+            server.close()
+            await server.wait_closed()
+            return reply
+
+        for message in ("", "ticker", "x" * 200, "y" * 70000):
+            self.assertEqual(run(round_trip(message)), message)
+
+
+class TestCobinhoodStream(unittest.TestCase):
+    """!
+    Unit tests for CobinhoodStream against the local stand-in server.
+    """
+
+    def test_subscribe_and_callbacks(self):
+        """!
+        Test snapshots and updates reach channel callbacks and the iterator.
+        """
+        received = []
+
+        async def scenario():
+            snapshots = {"order-book.COB-ETH.1E-7": {"bids": [], "asks": []}}
+            async with MockStreamServer(snapshots) as server:
+                stream = cobinhood.CobinhoodStream(server.url)
+                ticker = stream.subscribe_ticker("COB-ETH", callback=received.append)
+                stream.subscribe_order_book("COB-ETH")
+                async with stream:
+                    await stream.wait_ready(5)
+                    await server.publish(ticker, ["1504459806123", "244.89"])
+                    events = [await stream.__anext__() for _ in range(2)]
+                return events
+
+        events = run(scenario())
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].type, "ticker")
+        self.assertEqual(received[0].trading_pair_id, "COB-ETH")
+        self.assertEqual(received[0].kind, "update")
+        self.assertEqual(received[0].data, ["1504459806123", "244.89"])
+        self.assertEqual([event.kind for event in events], ["snapshot", "update"])
+        self.assertEqual(events[0].channel_id, "order-book.COB-ETH.1E-7")
+
+    def test_reconnect_resubscribes(self):
+        """!
+        Test a dropped connection is re-established with every subscription.
+        """
+        async def scenario():
+            async with MockStreamServer() as server:
+                stream = cobinhood.CobinhoodStream(server.url, reconnect_delay=0.01)
+                trades = stream.subscribe_trades("COB-ETH")
+                candles = stream.subscribe_candles("COB-ETH", "1h")
+                async with stream:
+                    await stream.wait_ready(5)
+                    await server.drop_connections()
+                    while stream.connection_count < 2 or not stream.subscribed:
+                        await asyncio.sleep(0.01)
+                    await stream.wait_ready(5)
+                    await server.publish(candles, [1, 2])
+                    event = await stream.__anext__()
+                return server, stream, trades, event
+
+        server, stream, trades, event = run(scenario())
+        self.assertEqual(server.connection_count, 2)
+        self.assertEqual(server.subscribe_count, 4)
+        self.assertTrue(trades in stream.subscribed)
+        self.assertEqual(event.channel_id, "candle.COB-ETH.1h")
+
+    def test_queue_drops_oldest(self):
+        """!
+        Test a slow consumer loses the oldest events rather than growing memory.
+        """
+        async def scenario():
+            async with MockStreamServer() as server:
+                stream = cobinhood.CobinhoodStream(server.url, queue_size=2)
+                ticker = stream.subscribe_ticker("COB-ETH")
+                async with stream:
+                    await stream.wait_ready(5)
+                    for index in range(5):
+                        await server.publish(ticker, [index])
+                    while stream.event_count < 5:
+                        await asyncio.sleep(0.01)
+                    return stream.dropped_events, await stream.__anext__()
+
+        dropped, event = run(scenario())
+        self.assertEqual(dropped, 3)
+        self.assertEqual(event.data, [3])
+
+    def test_bad_messages_and_callbacks_skipped(self):
+        """!
+        Test malformed frames and raising callbacks are skipped without
+        ending the stream.
+        """
+        received = []
+
+        def callback(event):
+            received.append(event.data)
+            if event.data == [1]:
+                raise RuntimeError("callback failure")
+
+        async def scenario():
+            async with MockStreamServer() as server:
+                stream = cobinhood.CobinhoodStream(server.url)
+                ticker = stream.subscribe_ticker("COB-ETH", callback=callback)
+                async with stream:
+                    await stream.wait_ready(5)
+                    await server.publish(ticker, [1])
+                    for message in ("not json", "[]", '{"h": 1}'):
+                        await server.send_raw(message)
+                    await server.publish(ticker, [2])
+                    events = [await stream.__anext__() for _ in range(2)]
+                return stream, events
+
+        stream, events = run(scenario())
+        self.assertEqual(received, [[1], [2]])
+        self.assertEqual([event.data for event in events], [[1], [2]])
+        self.assertEqual(stream.bad_messages, 3)
+        self.assertEqual(stream.callback_errors, 1)
+        self.assertEqual(stream.connection_count, 1)
+
+    def test_idle_connection_reconnects(self):
+        """!
+        Test a connection that goes silent, pongs included, is dropped and
+        re-established.
+        """
+        connections = []
+
+        async def silent(reader, writer):
+            connection = await websocket.accept(reader, writer)
+            connections.append(connection)
+            try:
+                while True:
+                    await connection.recv()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+
+        async def scenario():
+            server = await asyncio.start_server(silent, "127.0.0.1", 0)
+            url = "ws://127.0.0.1:{0}/v2/ws".format(
+                server.sockets[0].getsockname()[1])
+            stream = cobinhood.CobinhoodStream(url, ping_interval=60,
+                                               idle_timeout=0.05,
+                                               reconnect_delay=0.01)
+            async with stream:
+                while stream.connection_count < 3:
+                    await asyncio.sleep(0.01)
+            server.close()
+            await server.wait_closed()
+            return stream
+
+        stream = run(scenario())
+        self.assertTrue(stream.connection_count >= 3)
+        self.assertTrue(len(connections) >= 3)
+
+    def test_socket_error_reconnects(self):
+        """!
+        Test an OSError raised while receiving, e.g. a reset socket, drops
+        the connection and re-establishes it.
+        """
+        class Broken(object):
+            async def send(self, message):
+                pass
+
+            async def recv(self):
+                raise OSError("network is unreachable")
+
+            async def close(self):
+                pass
+
+        async def connect(url):
+            return Broken()
+
+        async def scenario():
+            stream = cobinhood.CobinhoodStream(connect=connect,
+                                               reconnect_delay=0.01)
+            async with stream:
+                while stream.connection_count < 3:
+                    await asyncio.sleep(0.01)
+            return stream
+
+        self.assertTrue(run(scenario()).connection_count >= 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
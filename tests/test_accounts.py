@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood multi-account manager.
+"""
+
+from __future__ import print_function
+import threading
+import time
+import unittest
+import mock
+import cobinhood
+from cobinhood.ratelimit import ACCOUNT, MARKET, TRADING
+from cobinhood.testing import success
+
+
+class TestAccountManager(unittest.TestCase):
+    """!
+    Unit tests for AccountManager.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.calls = []
+        self.lock = threading.Lock()
+
+        def perform(request_url, auth_token, request_type, *payload):
+            with self.lock:
+                self.calls.append((request_url, auth_token))
+            time.sleep(0.05)
+            if "wallet" in request_url and auth_token == "bad":
+                raise ValueError("rejected")
+            return success({"key": auth_token})
+
+        self.manager = cobinhood.AccountManager(perform=perform)
+
+    def tearDown(self):
+        """!
+        Shut down the manager.
+        """
+        self.manager.close()
+
+    def test_clients(self):
+        """!
+        Test clients are created once per key and share the transport path,
+        routes, cache, coalescing and worker pool.
+        """
+        first = self.manager.client("a")
+        self.assertIs(self.manager.client("a"), first)
+        second = self.manager.client("b")
+        self.assertEqual(sorted(self.manager.api_keys()), ["a", "b"])
+        self.assertEqual(len(self.manager), 2)
+        first.get_wallet_balances()
+        second.get_wallet_balances()
+        self.assertEqual([call[1] for call in self.calls], ["a", "b"])
+        self.assertIs(first._routes, second._routes)
+        self.assertIs(first.cache, second.cache)
+        self.assertIs(first.singleflight, second.singleflight)
+        self.assertIs(first._get_executor().executor,
+                      second._get_executor().executor)
+        self.assertIsNot(first.perform, second.perform)
+        first.close()
+        self.assertTrue(second.get_ticker("BTC-USDT")["success"])
+        self.manager.remove("a")
+        self.assertEqual(self.manager.api_keys(), ["b"])
+
+    def test_client_close_keeps_transport(self):
+        """!
+        Test closing a client, or leaving its with block, leaves the shared
+        perform open until the manager is closed.
+        """
+        perform = mock.Mock(return_value=success({}))
+        manager = cobinhood.AccountManager(perform=perform)
+        client = manager.client("a")
+        client.close()
+        with manager.client("b") as other:
+            other.get_wallet_balances()
+        perform.close.assert_not_called()
+        self.assertTrue(client.get_wallet_balances()["success"])
+        manager.close()
+        perform.close.assert_called_once_with()
+
+    def test_public_calls_coalesced(self):
+        """!
+        Test identical public calls in flight for many accounts are made
+        once, and private ones are not.
+        """
+        results = self.manager.fan_out(
+            lambda client: client.get_ticker("BTC-USDT"),
+            [str(index) for index in range(10)])
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.manager.stats()["coalesced"], 9)
+        del self.calls[:]
+        self.manager.fan_out(lambda client: client.get_wallet_balances())
+        self.assertEqual(len(self.calls), 10)
+
+    def test_private_responses_not_cached(self):
+        """!
+        Test endpoints needing a key are dropped from cache_ttls.
+        """
+        manager = cobinhood.AccountManager(
+            perform=mock.Mock(), cache_ttls={"wallet/balances": 60,
+                                             "market/stats": 5})
+        self.assertEqual(manager.cache_ttls, {"market/stats": 5})
+        manager.close()
+
+    def test_budget_per_key(self):
+        """!
+        Test each key has its own rate budget.
+        """
+        manager = cobinhood.AccountManager(
+            perform=mock.Mock(return_value=success({})),
+            budgets={ACCOUNT: (1, 1), MARKET: (1, 1), TRADING: (1, 1)},
+            global_budget=None, max_wait={ACCOUNT: 0.05})
+        manager.client("a").get_wallet_balances()
+        self.assertRaises(cobinhood.DeadlineExceeded,
+                          manager.client("a").get_wallet_balances)
+        self.assertTrue(manager.client("b").get_wallet_balances()["success"])
+        self.assertEqual(manager.stats()["dropped"], 1)
+        manager.close()
+
+    def test_fan_out_errors(self):
+        """!
+        Test a failing account does not fail the whole fan out.
+        """
+        results = self.manager.fan_out(
+            lambda client: client.get_wallet_balances(), ["good", "bad"])
+        self.assertTrue(results["good"]["success"])
+        self.assertFalse(results["bad"]["success"])
+
+    def test_shared_executor_not_shut_down(self):
+        """!
+        Test a client does not shut down an executor it was given.
+        """
+        executor = mock.Mock()
+        cobinhood.Cobinhood(perform=mock.Mock(), executor=executor).close()
+        executor.shutdown.assert_not_called()
+
+    def test_worker_slice_per_key(self):
+        """!
+        Test a blocked account cannot take every worker of the shared pool.
+        """
+        release = threading.Event()
+
+        def perform(request_url, auth_token, request_type, *payload):
+            if auth_token == "slow":
+                release.wait(5)
+            return success({})
+
+        manager = cobinhood.AccountManager(perform=perform, max_workers=4,
+                                           max_workers_per_key=2)
+        slow = threading.Thread(target=manager.client("slow").get_order_books,
+                                args=(["P{0}".format(index)
+                                       for index in range(8)],))
+        slow.start()
+        try:
+            start = time.time()
+            responses = manager.client("fast").get_order_books(["X", "Y"])
+            elapsed = time.time() - start
+            self.assertTrue(slow.is_alive())
+        finally:
+            release.set()
+            slow.join(5)
+            manager.close()
+        self.assertEqual(len(responses), 2)
+        self.assertTrue(elapsed < 1)
+
+    def test_defaults_bounded(self):
+        """!
+        Test account reads have a deadline and the least recently used
+        clients are dropped past max_clients.
+        """
+        manager = cobinhood.AccountManager(perform=mock.Mock(), max_clients=2)
+        self.assertTrue(manager.client("a").perform.max_wait[ACCOUNT] > 0)
+        manager.client("b")
+        manager.client("a")
+        manager.client("c")
+        self.assertEqual(manager.api_keys(), ["a", "c"])
+        self.assertEqual(manager.stats()["evicted"], 1)
+        manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood trade analytics.
+"""
+
+from __future__ import print_function
+import math
+import unittest
+from cobinhood import analytics, columnar
+from cobinhood.testing import payloads, success
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TRADES = [
+    {"id": "c", "price": "12", "size": "1", "maker_side": "ask",
+     "timestamp": 1504459861000},
+    {"id": "b", "price": "11", "size": "2", "maker_side": "ask",
+     "timestamp": 1504459806125},
+    {"id": "a", "price": "10", "size": "1", "maker_side": "bid",
+     "timestamp": 1504459800000},
+]
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestAnalytics(unittest.TestCase):
+    """!
+    Unit tests for trade analytics.
+    """
+
+    def test_metrics(self):
+        """!
+        Test VWAP, imbalance and bars of a raw response, a list of trades
+        and an array agree.
+        """
+        for trades in (success({"trades": TRADES}), TRADES,
+                       columnar.trades_to_array(TRADES)):
+            self.assertAlmostEqual(analytics.vwap(trades), 44 / 4.0)
+            # Two asks were taker buys of size 3, one bid a sell of size 1.
+            self.assertAlmostEqual(analytics.trade_flow_imbalance(trades), 0.5)
+        bars = analytics.ohlc(TRADES)
+        self.assertEqual(bars["timestamp"].tolist(),
+                         [1504459800000, 1504459860000])
+        self.assertEqual(bars[0].tolist(),
+                         (1504459800000, 10.0, 11.0, 10.0, 11.0, 3.0))
+        self.assertEqual(bars["volume"].tolist(), [3.0, 1.0])
+
+    def test_empty(self):
+        """!
+        Test a pair without trades has no volume and no bars.
+        """
+        self.assertTrue(math.isnan(analytics.vwap([])))
+        self.assertEqual(len(analytics.ohlc([])), 0)
+        self.assertEqual(analytics.analyze({}), ({}, {}))
+
+    def test_analyze_many_pairs(self):
+        """!
+        Test analyzing many pairs together gives each pair's own metrics,
+        serially and in a process pool.
+        """
+        batches = dict(("P{0}".format(index),
+                        payloads.trades(40 + index, seed=index))
+                       for index in range(6))
+        batches["EMPTY"] = []
+        serial, errors = analytics.analyze(batches, 10000, processes=0)
+        pooled = analytics.analyze(batches, 10000, processes=2)[0]
+        self.assertEqual(sorted(serial), sorted(batches))
+        self.assertEqual(errors, {})
+        self.assertEqual(serial["EMPTY"]["count"], 0)
+        for pair in batches:
+            trades = batches[pair]["result"]["trades"] if batches[pair] \
+                else []
+            volume = sum(float(trade["size"]) for trade in trades)
+            buckets = set(trade["timestamp"] // 10000 for trade in trades)
+            for result in (serial[pair], pooled[pair]):
+                self.assertEqual(result["count"], len(trades))
+                self.assertAlmostEqual(result["volume"], volume)
+                self.assertEqual(result["ohlc"]["timestamp"].tolist(),
+                                 [bucket * 10000 for bucket in
+                                  sorted(buckets)])
+                if trades:
+                    self.assertAlmostEqual(result["vwap"], sum(
+                        float(trade["price"]) * float(trade["size"])
+                        for trade in trades) / volume)
+                    # Trades are newest first.
+                    self.assertEqual(result["ohlc"]["close"][-1],
+                                     float(trades[0]["price"]))
+
+    def test_failed_pairs_reported(self):
+        """!
+        Test failure responses of a batch are reported per pair instead of
+        failing the whole batch.
+        """
+        error = {"error_code": "timeout"}
+        batches = {"P0": payloads.trades(10, seed=0),
+                   "P1": {"success": False, "error": error}}
+        for processes in (0, 2):
+            results, errors = analytics.analyze(batches, processes=processes)
+            self.assertEqual(list(results), ["P0"])
+            self.assertEqual(results["P0"]["count"], 10)
+            self.assertEqual(errors, {"P1": error})
+
+    def test_pool_reused(self):
+        """!
+        Test the default process pool is shared between calls and a given
+        executor is used instead.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        batches = dict(("P{0}".format(index), payloads.trades(5, seed=index))
+                       for index in range(4))
+        analytics.analyze(batches, processes=2)
+        pool = analytics._get_pool()
+        analytics.analyze(batches, processes=2)
+        self.assertTrue(analytics._get_pool() is pool)
+        with ThreadPoolExecutor(2) as executor:
+            results = analytics.analyze(batches, processes=2,
+                                        executor=executor)[0]
+        self.assertEqual(sorted(results), sorted(batches))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the asyncio Cobinhood client, in tests/py3/async_cobinhood.py.
+"""
+
+import sys
+import unittest
+
+if sys.version_info >= (3, 6):
+    from tests.py3.async_cobinhood import *  # noqa: F401,F403
+
+
+if __name__ == "__main__":
+    unittest.main()
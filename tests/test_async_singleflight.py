@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for coalescing of identical in-flight asyncio Cobinhood calls,
+ in tests/py3/async_singleflight.py.
+"""
+
+import sys
+import unittest
+
+if sys.version_info >= (3, 6):
+    from tests.py3.async_singleflight import *  # noqa: F401,F403
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood response cache.
+"""
+
+from __future__ import print_function
+import unittest
+import mock
+import cobinhood
+from cobinhood.testing import FakeTimer
+
+
+class TestTTLCache(unittest.TestCase):
+    """!
+    Unit tests for TTLCache.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.timer = FakeTimer()
+        self.cache = cobinhood.TTLCache(maxsize=2, timer=self.timer)
+
+    def test_expiry(self):
+        """!
+        Test entries expire after their ttl.
+        """
+        self.cache.set("a", 1, ttl=10)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.timer.now = 10
+        self.assertEqual(self.cache.get("a"), None)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        """!
+        Test the least recently used entry is evicted when full.
+        """
+        self.cache.set("a", 1, ttl=10)
+        self.cache.set("b", 2, ttl=10)
+        self.cache.get("a")
+        self.cache.set("c", 3, ttl=10)
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate(self):
+        """!
+        Test invalidation by prefix and of everything.
+        """
+        self.cache.set("market/a", 1, ttl=10)
+        self.cache.set("system/b", 2, ttl=10)
+        self.assertEqual(self.cache.invalidate("market/"), 1)
+        self.assertEqual(self.cache.get("system/b"), 2)
+        self.assertEqual(self.cache.invalidate(), 1)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCobinhoodCache(unittest.TestCase):
+    """!
+    Unit tests for response caching in Cobinhood.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.perform = mock.Mock(return_value={"success": True, "result": {}})
+        self.cobinhood = cobinhood.Cobinhood(perform=self.perform)
+
+    def test_reference_endpoints_cached(self):
+        """!
+        Test reference data is fetched once while fresh.
+        """
+        first = self.cobinhood.get_currencies()
+        self.assertTrue(self.cobinhood.get_currencies() is first)
+        self.cobinhood.get_all_trading_pairs()
+        self.cobinhood.get_all_trading_pairs()
+        self.assertEqual(self.perform.call_count, 2)
+        self.assertEqual(self.cobinhood.cache_stats()["hits"], 2)
+
+    def test_other_endpoints_not_cached(self):
+        """!
+        Test market data and failures are never cached.
+        """
+        self.cobinhood.get_ticker("COB-USDT")
+        self.cobinhood.get_ticker("COB-USDT")
+        self.perform.return_value = {"success": False}
+        self.cobinhood.get_system_info()
+        self.cobinhood.get_system_info()
+        self.assertEqual(self.perform.call_count, 4)
+
+    def test_invalidate_cache(self):
+        """!
+        Test explicit invalidation of one endpoint.
+        """
+        self.cobinhood.get_currencies()
+        self.cobinhood.get_system_info()
+        self.assertEqual(self.cobinhood.invalidate_cache("market/currencies"), 1)
+        self.cobinhood.get_currencies()
+        self.cobinhood.get_system_info()
+        self.assertEqual(self.perform.call_count, 3)
+
+    def test_private_responses_keyed_by_api_key(self):
+        """!
+        Test clients sharing a cache do not see each other's responses of
+        endpoints that need an api key, and do share public ones.
+        """
+        self.perform.side_effect = lambda request_url, auth_token, \
+            request_type: {"success": True, "result": {"key": auth_token}}
+        shared = cobinhood.TTLCache(16)
+        ttls = {"wallet/balances": 10, "market/currencies": 10}
+        first, second = [cobinhood.Cobinhood(api_key, perform=self.perform,
+                                             cache_ttls=ttls, cache=shared)
+                         for api_key in ("a", "b")]
+        self.assertEqual(first.get_wallet_balances()["result"]["key"], "a")
+        self.assertEqual(second.get_wallet_balances()["result"]["key"], "b")
+        self.assertEqual(first.get_wallet_balances()["result"]["key"], "a")
+        first.get_currencies()
+        second.get_currencies()
+        self.assertEqual(self.perform.call_count, 3)
+        self.assertEqual(first.invalidate_cache("wallet/balances"), 2)
+
+    def test_disabled(self):
+        """!
+        Test an empty ttl table disables caching.
+        """
+        cob = cobinhood.Cobinhood(perform=self.perform, cache_ttls={})
+        cob.get_currencies()
+        cob.get_currencies()
+        self.assertEqual(self.perform.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
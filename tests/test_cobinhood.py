@@ -5,10 +5,17 @@
 
 from __future__ import print_function
 import json
+import threading
+import time
 import mock
 import unittest
 import cobinhood
 
+try:
+    from urlparse import parse_qsl, urlsplit
+except ImportError:
+    from urllib.parse import parse_qsl, urlsplit
+
 API_TOKEN_FILE = "./tests/api_token.json"
 
 try:
@@ -129,10 +136,18 @@ class TestCobinhoodPublic(unittest.TestCase):
             request_get.assert_called_with("v1/system/time", headers=header)
         with mock.patch("requests.put") as request_put:
             cobinhood.request_api_call("v1/system/time", "", "put")
-            request_put.assert_called_with("v1/system/time", headers=header)
+            request_put.assert_called_with("v1/system/time", headers=header,
+                                           json=None)
         with mock.patch("requests.post") as request_post:
             cobinhood.request_api_call("v1/system/time", "", "post")
-            request_post.assert_called_with("v1/system/time", headers=header)
+            request_post.assert_called_with("v1/system/time", headers=header,
+                                            json=None)
+        with mock.patch("requests.post") as request_post:
+            cobinhood.request_api_call("v1/trading/orders", "", "post",
+                                       {"side": "bid"})
+            request_post.assert_called_with("v1/trading/orders",
+                                            headers=header,
+                                            json={"side": "bid"})
         with mock.patch("requests.delete") as request_delete:
             cobinhood.request_api_call("v1/system/time", "", "delete")
             request_delete.assert_called_with("v1/system/time", headers=header)
@@ -140,6 +155,232 @@ class TestCobinhoodPublic(unittest.TestCase):
             cobinhood.request_api_call("v1/system/time", "", "abcd")
             cob_exception.assert_called_with("Error: invalid request type")
 
+class TestCobinhoodBatch(unittest.TestCase):
+    """!
+    Unit tests for Cobinhood batch fan-out functions.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.requests = []
+
+        def perform(request_url, auth_token, request_type):
+            self.requests.append(request_url)
+            time.sleep(0.1)
+            if "XYZ" in request_url:
+                raise IOError("unknown pair")
+            return {"success": True, "result": {"url": request_url}}
+
+        self.cobinhood = cobinhood.Cobinhood(perform=perform, max_workers=8)
+
+    def tearDown(self):
+        """!
+        Shut down the worker pool.
+        """
+        self.cobinhood.close()
+
+    def test_get_tickers(self):
+        """!
+        Test tickers are fetched concurrently and keyed by pair.
+        """
+        pairs = ["COB-USDT", "BTC-USDT", "ETH-USDT", "COB-ETH", "COB-BTC"]
+        start = time.time()
+        response = self.cobinhood.get_tickers(pairs)
+        self.assertTrue(time.time() - start < 0.3)
+        self.assertEqual(list(response), pairs)
+        for pair in pairs:
+            api_call_response(self, response[pair])
+            self.assertTrue(response[pair]["result"]["url"].endswith(
+                "market/tickers/{0}?".format(pair)))
+
+    def test_get_order_books(self):
+        """!
+        Test the limit is passed to every order book call.
+        """
+        response = self.cobinhood.get_order_books(["COB-USDT", "BTC-USDT"], 10)
+        for pair in response:
+            self.assertTrue(response[pair]["result"]["url"].endswith("limit=10"))
+
+    def test_errors_per_pair(self):
+        """!
+        Test a failing pair does not fail the whole batch.
+        """
+        response = self.cobinhood.get_recent_trades_batch(["COB-USDT", "XYZ-USDT"])
+        api_call_response(self, response["COB-USDT"])
+        api_call_response(self, response["XYZ-USDT"], is_success=False)
+        self.assertEqual(response["XYZ-USDT"]["error"]["error_code"],
+                         "Error: {0}: unknown pair".format(IOError.__name__))
+
+    def test_duplicate_pairs(self):
+        """!
+        Test duplicated pairs are only requested once.
+        """
+        response = self.cobinhood.get_candles_batch(["COB-USDT", "COB-USDT"])
+        self.assertEqual(list(response), ["COB-USDT"])
+        self.assertEqual(len(self.requests), 1)
+
+
+class TestCobinhoodBulk(unittest.TestCase):
+    """!
+    Unit tests for Cobinhood bulk order functions.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+        def perform(request_url, auth_token, request_type, payload=None):
+            with self.lock:
+                self.calls.append((request_url, request_type, payload))
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.05)
+            with self.lock:
+                self.active -= 1
+            if "bad" in request_url or (payload or {}).get("size") == "0":
+                raise ValueError("rejected")
+            return {"success": True, "result": {"url": request_url,
+                                                "payload": payload}}
+
+        self.cobinhood = cobinhood.Cobinhood(perform=perform, max_workers=8)
+
+    def tearDown(self):
+        """!
+        Shut down the worker pool.
+        """
+        self.cobinhood.close()
+
+    def test_place_orders(self):
+        """!
+        Test orders are placed concurrently with their payloads, and results
+        are in order.
+        """
+        orders = [{"trading_pair_id": "BTC-USDT", "side": "bid",
+                   "type": "limit", "price": 5000 + index, "size": "0.1"}
+                  for index in range(8)]
+        start = time.time()
+        responses = self.cobinhood.place_orders(orders)
+        self.assertTrue(time.time() - start < 0.3)
+        self.assertEqual([response["result"]["payload"]["price"]
+                          for response in responses],
+                         [str(5000 + index) for index in range(8)])
+        self.assertEqual(self.calls[0][1], "post")
+
+    def test_concurrency_limit(self):
+        """!
+        Test no more than concurrency orders are in flight at once.
+        """
+        self.cobinhood.cancel_orders([str(index) for index in range(8)],
+                                     concurrency=2)
+        self.assertEqual(len(self.calls), 8)
+        self.assertEqual(self.peak, 2)
+
+    def test_errors_per_order(self):
+        """!
+        Test a failing order does not fail the whole batch.
+        """
+        responses = self.cobinhood.modify_orders([("1", "10", "1"),
+                                                  ("bad", "10", "1")])
+        api_call_response(self, responses[0])
+        api_call_response(self, responses[1], is_success=False)
+        responses = self.cobinhood.place_orders([
+            {"trading_pair_id": "BTC-USDT", "side": "ask", "type": "market",
+             "size": "0"}])
+        self.assertFalse(responses[0]["success"])
+        self.assertNotIn("price", self.calls[-1][2])
+
+
+def paged_perform(records, result_key, calls):
+    """!
+    Build a perform function serving records page by page.
+    """
+    def perform(request_url, auth_token, request_type):
+        query = dict(parse_qsl(urlsplit(request_url).query))
+        calls.append(query)
+        page, limit = int(query["page"]), int(query["limit"])
+        if page > 3:
+            return {"success": False, "error": {"error_code": "invalid_page"}}
+        return {"success": True, "result": {
+            result_key: records[(page - 1) * limit:page * limit]}}
+    return perform
+
+
+class TestCobinhoodPagination(unittest.TestCase):
+    """!
+    Unit tests for Cobinhood paginating iterators.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.calls = []
+        self.records = [{"id": index} for index in range(120)]
+
+    def test_iter_ledger_entries(self):
+        """!
+        Test every record is yielded in order until a short page.
+        """
+        cob = cobinhood.Cobinhood(
+            perform=paged_perform(self.records, "ledger", self.calls))
+        entries = list(cob.iter_ledger_entries(currency="COB", limit=50))
+        self.assertEqual(entries, self.records)
+        self.assertEqual([call["page"] for call in self.calls], ["1", "2", "3"])
+        self.assertEqual(self.calls[0]["currency"], "COB")
+
+    def test_prefetch(self):
+        """!
+        Test the next page is requested while the current one is consumed.
+        """
+        cob = cobinhood.Cobinhood(
+            perform=paged_perform(self.records, "orders", self.calls))
+        orders = cob.iter_order_history(limit=50)
+        next(orders)
+        cob.close()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_lazy_without_prefetch(self):
+        """!
+        Test pages are only requested on demand without prefetch.
+        """
+        cob = cobinhood.Cobinhood(
+            perform=paged_perform(self.records, "deposits", self.calls))
+        deposits = cob.iter_deposits(limit=50, prefetch=False)
+        for _ in range(50):
+            next(deposits)
+        self.assertEqual(len(self.calls), 1)
+        next(deposits)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_page_ignored(self):
+        """!
+        Test iteration ends when the endpoint serves the same page again.
+        """
+        def perform(request_url, auth_token, request_type):
+            self.calls.append(request_url)
+            return {"success": True, "result": {"orders": self.records[:50]}}
+
+        cob = cobinhood.Cobinhood(perform=perform)
+        self.assertEqual(list(cob.iter_all_orders(limit=50)), self.records[:50])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_failed_page(self):
+        """!
+        Test a failed page raises instead of ending the iteration silently.
+        """
+        cob = cobinhood.Cobinhood(
+            perform=paged_perform(self.records, "trades", self.calls))
+        with self.assertRaises(cobinhood.ExceptionCobinhood):
+            list(cob.iter_trade_history(limit=30))
+
+
 @unittest.skipUnless(AUTH, "Missing api_token.json file")
 class TestCobinhoodPrivate(unittest.TestCase):
     """!
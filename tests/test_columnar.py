@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood columnar NumPy decoding.
+"""
+
+from __future__ import print_function
+import unittest
+import mock
+import cobinhood
+from cobinhood import columnar, models
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CANDLES = [
+    {"timestamp": 1507366755, "open": "4378.5", "close": "4359.0",
+     "high": "4380.0", "low": "4358.3", "volume": "23.91465172"},
+    {"timestamp": 1507366815, "open": "4359.0", "close": "4361.0",
+     "high": "4362.0", "low": "4355.0", "volume": "1.5"},
+]
+
+TRADES = [
+    {"id": "a", "price": "11.5", "size": "0.02", "maker_side": "bid",
+     "timestamp": 1504459806124},
+    {"id": "b", "price": "11.25", "size": "0.5", "maker_side": "ask",
+     "timestamp": 1504459806125},
+]
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestColumnar(unittest.TestCase):
+    """!
+    Unit tests for columnar decoding.
+    """
+
+    def test_candles_to_array(self):
+        """!
+        Test candles decode into a structured array.
+        """
+        candles = columnar.candles_to_array(
+            {"success": True, "result": {"candles": CANDLES}})
+        self.assertEqual(candles.dtype.names,
+                         ("timestamp", "open", "high", "low", "close", "volume"))
+        self.assertEqual(candles["timestamp"].tolist(), [1507366755, 1507366815])
+        self.assertEqual(candles["close"].tolist(), [4359.0, 4361.0])
+        self.assertEqual(candles["volume"].dtype, numpy.float64)
+
+    def test_trades_to_array(self):
+        """!
+        Test trades decode from dicts and from typed records.
+        """
+        trades = columnar.trades_to_array(TRADES)
+        self.assertEqual(trades["price"].tolist(), [11.5, 11.25])
+        self.assertEqual(trades["maker_side"].tolist(), [1, -1])
+        typed = columnar.trades_to_array(
+            [models.Trade.from_dict(trade) for trade in TRADES])
+        self.assertTrue(numpy.array_equal(typed, trades))
+
+    def test_order_book_to_arrays(self):
+        """!
+        Test both sides of a book decode into level arrays.
+        """
+        book = columnar.order_book_to_arrays({"success": True, "result": {
+            "orderbook": {"sequence": 7,
+                          "bids": [["10.5", "2", "1.5"], ["10.4", "1", "3"]],
+                          "asks": []}}})
+        self.assertEqual(book["sequence"], 7)
+        self.assertEqual(book["bids"]["price"].tolist(), [10.5, 10.4])
+        self.assertEqual(book["bids"]["count"].tolist(), [2, 1])
+        self.assertEqual(len(book["asks"]), 0)
+
+    def test_failed_response(self):
+        """!
+        Test failed responses raise instead of decoding to empty arrays.
+        """
+        with self.assertRaises(cobinhood.ExceptionCobinhood):
+            columnar.candles_to_array({"success": False, "error": {}})
+
+    def test_client_methods(self):
+        """!
+        Test the client array methods.
+        """
+        perform = mock.Mock(return_value={"success": True,
+                                          "result": {"candles": CANDLES}})
+        cob = cobinhood.Cobinhood(perform=perform)
+        self.assertEqual(len(cob.get_candles_array("COB-USDT")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood endpoint registry and compiled routes.
+"""
+
+from __future__ import print_function
+from decimal import Decimal
+import unittest
+import mock
+import cobinhood
+from cobinhood.endpoints import API_V1, ENDPOINTS, compile_routes
+
+try:
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import urlencode
+
+SAMPLE_VALUES = {"limit": 25, "page": 3, "currency": "BTC", "status": "a b",
+                 "price": "0.5", "size": 2}
+
+
+class TestEndpoints(unittest.TestCase):
+    """!
+    Unit tests for ENDPOINTS and Route url builders.
+    """
+
+    def test_methods_exist(self):
+        """!
+        Test every registered endpoint has a Cobinhood method.
+        """
+        for name in ENDPOINTS[API_V1]:
+            self.assertTrue(callable(getattr(cobinhood.Cobinhood, name)), name)
+
+    def test_urls_match_query_api(self):
+        """!
+        Test compiled routes build the same urls as _request_url.
+        """
+        cob = cobinhood.Cobinhood(perform=mock.Mock())
+        routes = compile_routes(cobinhood.BASE_URL_V1, API_V1)
+        for name, endpoint in ENDPOINTS[API_V1].items():
+            path_args = tuple("id{0}".format(index)
+                              for index in range(len(endpoint.path_params)))
+            query = [(param, SAMPLE_VALUES[param]) for param in endpoint.params]
+            expected = cobinhood.BASE_URL_V1.format(
+                version=API_V1, fn_call=endpoint.path.format(
+                    **dict(zip(endpoint.path_params, path_args)))) + \
+                urlencode(query)
+            url = routes[name].url(path_args, tuple(value for _, value in query))
+            self.assertEqual(url, expected)
+            self.assertEqual(url, cob._request_url(
+                {API_V1: expected.split("/v1/")[1].split("?")[0]}, query))
+
+    def test_none_params_left_out(self):
+        """!
+        Test query parameters passed as None are not sent.
+        """
+        route = compile_routes(cobinhood.BASE_URL_V1, API_V1)["get_all_orders"]
+        self.assertTrue(route.url((), (20,)).endswith("orders?limit=20"))
+        self.assertTrue(route.url((), (None, 2)).endswith("orders?page=2"))
+
+    def test_unknown_version(self):
+        """!
+        Test calls on an api version without endpoints fail.
+        """
+        cob = cobinhood.Cobinhood(perform=mock.Mock(), api_version="v9")
+        self.assertRaises(cobinhood.ExceptionCobinhood, cob.get_system_time)
+
+
+class TestCobinhoodRoutes(unittest.TestCase):
+    """!
+    Unit tests for Cobinhood methods backed by compiled routes.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.perform = mock.Mock(return_value={"success": True, "result": {}})
+        self.cobinhood = cobinhood.Cobinhood(api_key="key",
+                                             perform=self.perform)
+
+    def test_request_types(self):
+        """!
+        Test methods send their endpoint's request type.
+        """
+        self.cobinhood.modify_order("abc", "1.5", 2)
+        self.perform.assert_called_with(
+            "https://api.cobinhood.com/v1/trading/orders/abc?price=1.5&size=2",
+            "key", "put")
+        self.cobinhood.cancel_order("abc")
+        self.perform.assert_called_with(
+            "https://api.cobinhood.com/v1/trading/orders/abc?", "key", "delete")
+
+    def test_place_order_payload(self):
+        """!
+        Test place_order sends its fields as a payload of strings, leaving
+        out a missing price.
+        """
+        self.cobinhood.place_order("BTC-USDT", "bid", "limit",
+                                   Decimal("5000.10"), 1)
+        self.perform.assert_called_with(
+            "https://api.cobinhood.com/v1/trading/orders?", "key", "post",
+            {"trading_pair_id": "BTC-USDT", "side": "bid", "type": "limit",
+             "price": "5000.10", "size": "1"})
+        self.cobinhood.place_order("BTC-USDT", "ask", "market", None, "2")
+        self.assertEqual(self.perform.call_args[0][3],
+                         {"trading_pair_id": "BTC-USDT", "side": "ask",
+                          "type": "market", "size": "2"})
+
+    def test_base_url_change(self):
+        """!
+        Test routes are recompiled when the base url changes.
+        """
+        self.cobinhood.get_ticker("COB-ETH")
+        self.cobinhood.base_url = "http://localhost/{version}/{fn_call}?"
+        self.cobinhood.get_ticker("COB-ETH")
+        self.perform.assert_called_with(
+            "http://localhost/v1/market/tickers/COB-ETH?", "key", "get")
+
+    def test_template_cache_ttl(self):
+        """!
+        Test cache ttls apply to templated function names.
+        """
+        cob = cobinhood.Cobinhood(
+            perform=self.perform,
+            cache_ttls={"market/tickers/{trading_pair_id}": 60})
+        cob.get_ticker("COB-ETH")
+        cob.get_ticker("COB-ETH")
+        cob.get_ticker("BTC-USDT")
+        self.assertEqual(self.perform.call_count, 2)
+        self.assertEqual(cob.invalidate_cache(
+            "market/tickers/{trading_pair_id}"), 2)
+
+    def test_iterators_page(self):
+        """!
+        Test iterators add the page parameter after the others.
+        """
+        list(self.cobinhood.iter_withdrawals("BTC", "done", limit=5))
+        self.perform.assert_called_with(
+            "https://api.cobinhood.com/v1/wallet/withdrawals"
+            "?currency=BTC&status=done&limit=5&page=1", "key", "get")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the import cost of the Cobinhood package.
+"""
+
+from __future__ import print_function
+import subprocess
+import sys
+import unittest
+
+# Microseconds `import cobinhood` may take, measured with -X importtime.
+IMPORT_BUDGET_US = 100000
+
+# Modules that must only be imported by the first call needing them.
+DEFERRED_MODULES = ("requests", "numpy", "asyncio", "concurrent.futures")
+
+
+def run_python(*args):
+    """!
+    Run a fresh interpreter and return its stdout and stderr.
+    """
+    process = subprocess.Popen((sys.executable,) + args,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    out, err = process.communicate()
+    if process.returncode:
+        raise AssertionError(err)
+    return out, err
+
+
+@unittest.skipUnless(sys.version_info >= (3, 7), "-X importtime needs python 3.7+")
+class TestImport(unittest.TestCase):
+    """!
+    Unit tests for lazy loading of heavy dependencies.
+    """
+
+    def test_import_time_budget(self):
+        """!
+        Test `import cobinhood` stays within its budget, best of three runs.
+        """
+        timings = []
+        for _ in range(3):
+            _, err = run_python("-X", "importtime", "-c", "import cobinhood")
+            for line in err.splitlines():
+                fields = [field.strip() for field in line.split("|")]
+                if len(fields) == 3 and fields[2] == "cobinhood":
+                    timings.append(int(fields[1]))
+        self.assertTrue(timings)
+        self.assertLess(min(timings), IMPORT_BUDGET_US)
+
+    def test_heavy_modules_deferred(self):
+        """!
+        Test heavy dependencies are not imported by `import cobinhood`.
+        """
+        out, _ = run_python("-c", "import sys, cobinhood; print(' '.join("
+                            "name for name in {0!r} if name in sys.modules))"
+                            .format(DEFERRED_MODULES))
+        self.assertEqual(out.strip(), "")
+
+    def test_lazy_backends(self):
+        """!
+        Test asyncio backends load on first access.
+        """
+        out, _ = run_python(
+            "-c", "import sys, cobinhood; cobinhood.AsyncHTTPTransport; "
+            "print('asyncio' in sys.modules, "
+            "'AsyncCobinhood' in dir(cobinhood))")
+        self.assertEqual(out.split(), ["True", "True"])
+
+    def test_first_call_imports_requests(self):
+        """!
+        Test requests is imported by the first network call only.
+        """
+        out, _ = run_python(
+            "-c", "import sys, cobinhood; cob = cobinhood.Cobinhood(); "
+            "before = 'requests' in sys.modules; "
+            "cob.perform.session; print(before, 'requests' in sys.modules)")
+        self.assertEqual(out.split(), ["False", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood call metrics.
+"""
+
+from __future__ import print_function
+import unittest
+import mock
+import cobinhood
+from cobinhood.metrics import endpoint_label
+from cobinhood.testing import FakeTimer, MockCobinhoodServer
+
+
+class TestMetrics(unittest.TestCase):
+    """!
+    Unit tests for the Metrics registry.
+    """
+
+    def test_endpoint_label(self):
+        """!
+        Test resource ids are replaced in endpoint labels.
+        """
+        self.assertEqual(endpoint_label("market/tickers/BTC-USDT"),
+                         "market/tickers/{id}")
+        self.assertEqual(endpoint_label("trading/orders/abc/trades"),
+                         "trading/orders/{id}/trades")
+        self.assertEqual(endpoint_label("wallet/balances"), "wallet/balances")
+
+    def test_snapshot(self):
+        """!
+        Test counts, errors, histogram buckets and sizes.
+        """
+        metrics = cobinhood.Metrics(buckets=(0.1, 1.0))
+        metrics.observe("market/stats", "get", 0.05, size=100)
+        metrics.observe("market/stats", "get", 0.5, size=50)
+        metrics.observe("market/stats", "get", 5.0, error="timeout")
+        metrics.observe_cache_hit("market/stats", "get")
+        stats = metrics.snapshot()["market/stats"]["get"]
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["errors"], {"timeout": 1})
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["latency_buckets"],
+                         [(0.1, 1), (1.0, 2), (None, 3)])
+        self.assertAlmostEqual(stats["latency_mean"], 5.55 / 3)
+        self.assertEqual(stats["response_bytes"], 150)
+        self.assertEqual(stats["sized"], 2)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_to_prometheus(self):
+        """!
+        Test the Prometheus text exposition.
+        """
+        metrics = cobinhood.Metrics(buckets=(0.1,))
+        metrics.observe("market/tickers/{id}", "get", 0.05, size=10)
+        metrics.observe("market/tickers/{id}", "get", 0.2, error='bad "x"')
+        text = metrics.to_prometheus()
+        labels = 'endpoint="market/tickers/{id}",method="get"'
+        self.assertIn("# TYPE cobinhood_requests_total counter", text)
+        self.assertIn("cobinhood_requests_total{" + labels + "} 2", text)
+        self.assertIn("cobinhood_errors_total{" + labels +
+                      ',error="bad \\"x\\""} 1', text)
+        self.assertIn("cobinhood_request_duration_seconds_bucket{" + labels +
+                      ',le="0.1"} 1', text)
+        self.assertIn("cobinhood_request_duration_seconds_bucket{" + labels +
+                      ',le="+Inf"} 2', text)
+        self.assertIn("cobinhood_request_duration_seconds_count{" + labels +
+                      "} 2", text)
+        self.assertIn("cobinhood_response_bytes_total{" + labels + "} 10",
+                      text)
+
+
+class TestCobinhoodMetrics(unittest.TestCase):
+    """!
+    Unit tests for metrics recorded by Cobinhood._query_api.
+    """
+
+    def test_disabled_by_default(self):
+        """!
+        Test no metrics are kept unless asked for.
+        """
+        cob = cobinhood.Cobinhood(perform=mock.Mock(
+            return_value={"success": True}))
+        cob.get_system_time()
+        self.assertIsNone(cob.metrics)
+
+    def test_calls_and_errors(self):
+        """!
+        Test successes, api errors and transport failures are recorded per
+        endpoint.
+        """
+        perform = mock.Mock(side_effect=[
+            {"success": True, "result": {}},
+            {"success": False, "error": {"error_code": "invalid_nonce"}},
+            ValueError("boom"),
+            cobinhood.DeadlineExceeded("late"),
+        ])
+        metrics = cobinhood.Metrics(timer=FakeTimer(0.01))
+        cob = cobinhood.Cobinhood(perform=perform, metrics=metrics)
+        cob.get_ticker("BTC-USDT")
+        cob.get_ticker("ETH-BTC")
+        self.assertRaises(cobinhood.ExceptionCobinhood, cob.get_ticker, "A")
+        self.assertRaises(cobinhood.DeadlineExceeded, cob.get_ticker, "B")
+        stats = metrics.snapshot()["market/tickers/{id}"]["get"]
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["errors"], {"invalid_nonce": 1,
+                                           "transport_error": 1,
+                                           "DeadlineExceeded": 1})
+        self.assertAlmostEqual(stats["latency_sum"], 0.04)
+
+    def test_cache_hits(self):
+        """!
+        Test cached responses count as cache hits, not calls.
+        """
+        cob = cobinhood.Cobinhood(perform=mock.Mock(
+            return_value={"success": True, "result": {}}), metrics=True)
+        cob.get_currencies()
+        cob.get_currencies()
+        stats = cob.metrics.snapshot()["market/currencies"]["get"]
+        self.assertEqual((stats["count"], stats["cache_hits"]), (1, 1))
+
+    def test_response_bytes(self):
+        """!
+        Test the pooled transport reports response body sizes.
+        """
+        with MockCobinhoodServer() as server:
+            cob = cobinhood.Cobinhood(
+                base_url=server.url + "/{version}/{fn_call}?", metrics=True)
+            cob.get_system_time()
+            body = server.body_for("/v1/system/time")[1]
+            cob.close()
+        stats = cob.metrics.snapshot()["system/time"]["get"]
+        self.assertEqual(stats["response_bytes"], len(body))
+        self.assertEqual(stats["sized"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood typed records.
+"""
+
+from __future__ import print_function
+from decimal import Decimal
+import unittest
+import mock
+import cobinhood
+from cobinhood import models
+
+TRADE = {
+    "id": "09619448e48a3bd73d493a4195f9020c",
+    "price": "11.00000000",
+    "size": "0.02000000",
+    "maker_side": "buy",
+    "timestamp": 1504459806124,
+}
+
+
+class TestRecord(unittest.TestCase):
+    """!
+    Unit tests for Record classes.
+    """
+
+    def test_lazy_decimal(self):
+        """!
+        Test numeric fields stay strings until read, then are cached.
+        """
+        trade = models.Trade.from_dict(TRADE)
+        self.assertEqual(trade._price, "11.00000000")
+        self.assertEqual(trade.price, Decimal("11"))
+        self.assertTrue(isinstance(trade._price, Decimal))
+        self.assertTrue(trade.price is trade.price)
+        self.assertEqual(trade.maker_side, "buy")
+        self.assertEqual(trade.trading_pair_id, None)
+
+    def test_slots(self):
+        """!
+        Test records carry no per-instance dict.
+        """
+        trade = models.Trade.from_dict(TRADE)
+        self.assertFalse(hasattr(trade, "__dict__"))
+        with self.assertRaises(AttributeError):
+            trade.extra = 1
+
+    def test_renamed_fields(self):
+        """!
+        Test keys that are not identifiers map to renamed fields.
+        """
+        ticker = models.Ticker.from_dict({"24h_high": "23.4567", "lowest_ask": "1"})
+        self.assertEqual(ticker.high_24h, Decimal("23.4567"))
+        self.assertEqual(ticker.to_dict()["24h_high"], Decimal("23.4567"))
+
+    def test_round_trip(self):
+        """!
+        Test to_dict, equality and keyword construction.
+        """
+        trade = models.Trade.from_dict(TRADE)
+        self.assertEqual(models.Trade.from_dict(trade.to_dict()), trade)
+        self.assertEqual(models.Trade(**dict(TRADE, trading_pair_id=None)), trade)
+        self.assertNotEqual(models.Trade(id="x"), trade)
+
+    def test_decode_response(self):
+        """!
+        Test known result keys are decoded without touching the input.
+        """
+        response = {"success": True, "result": {"trades": [TRADE], "n": 1}}
+        decoded = models.decode_response(response)
+        self.assertTrue(isinstance(decoded["result"]["trades"][0], models.Trade))
+        self.assertEqual(decoded["result"]["n"], 1)
+        self.assertTrue(isinstance(response["result"]["trades"][0], dict))
+        self.assertTrue(models.decode_response({"success": False}) is not None)
+
+    def test_typed_client(self):
+        """!
+        Test typed clients return records.
+        """
+        perform = mock.Mock(return_value={"success": True, "result": {
+            "order": {"id": "1", "price": "5000.00", "filled": "0.69"}}})
+        cob = cobinhood.Cobinhood(perform=perform, typed=True)
+        order = cob.get_order("1")["result"]["order"]
+        self.assertEqual(order.filled, Decimal("0.69"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the local order book replica.
+"""
+
+from __future__ import print_function
+from decimal import Decimal
+import unittest
+import mock
+import cobinhood
+
+SNAPSHOT = {
+    "sequence": 100,
+    "bids": [["10.5", "2", "1.5"], ["10.4", "1", "3"], ["10.1", "1", "0.2"]],
+    "asks": [["10.6", "1", "0.5"], ["10.8", "3", "4"]],
+}
+
+
+class TestOrderBook(unittest.TestCase):
+    """!
+    Unit tests for OrderBook.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.client = mock.Mock()
+        self.client.get_order_book.return_value = {
+            "success": True,
+            "result": {"orderbook": dict(SNAPSHOT, sequence=105)}}
+        self.book = cobinhood.OrderBook("COB-USDT", client=self.client)
+        self.book.apply_snapshot(SNAPSHOT)
+
+    def test_snapshot(self):
+        """!
+        Test best prices, spread and ordering after a snapshot.
+        """
+        self.assertEqual(self.book.best_bid(), (Decimal("10.5"), 2, Decimal("1.5")))
+        self.assertEqual(self.book.best_ask(), (Decimal("10.6"), 1, Decimal("0.5")))
+        self.assertEqual(self.book.spread(), Decimal("0.1"))
+        self.assertEqual([level[0] for level in self.book.bids()],
+                         [Decimal("10.5"), Decimal("10.4"), Decimal("10.1")])
+        self.assertEqual([level[0] for level in self.book.asks(1)],
+                         [Decimal("10.6")])
+        self.assertEqual(self.book.bids(0), [])
+        self.assertEqual(self.book.depth_size("bid", 2), Decimal("4.5"))
+
+    def test_level(self):
+        """!
+        Test price level lookup.
+        """
+        self.assertEqual(self.book.level("ask", "10.80"), (Decimal("10.8"), 3, Decimal("4")))
+        self.assertEqual(self.book.level("bid", "10.45"), None)
+
+    def test_apply_update(self):
+        """!
+        Test diffs insert, change and remove levels.
+        """
+        applied = self.book.apply_update(
+            101,
+            bids=[["10.55", "1", "2"], ["10.5", "-2", "-1.5"]],
+            asks=[["10.6", "1", "0.25"]])
+        self.assertTrue(applied)
+        self.assertEqual(self.book.sequence, 101)
+        self.assertEqual(self.book.best_bid(), (Decimal("10.55"), 1, Decimal("2")))
+        self.assertEqual(self.book.level("bid", "10.5"), None)
+        self.assertEqual(self.book.best_ask(), (Decimal("10.6"), 2, Decimal("0.75")))
+
+    def test_stale_update(self):
+        """!
+        Test diffs already covered by the snapshot are ignored.
+        """
+        self.assertFalse(self.book.apply_update(100, bids=[["1", "1", "1"]]))
+        self.assertEqual(self.book.level("bid", "1"), None)
+
+    def test_gap_resync(self):
+        """!
+        Test a sequence gap reloads the book from the client.
+        """
+        self.assertFalse(self.book.apply_update(103, asks=[["9", "1", "1"]]))
+        self.client.get_order_book.assert_called_with("COB-USDT", 50)
+        self.assertEqual(self.book.sequence, 105)
+        self.assertEqual(self.book.resync_count, 1)
+        self.assertTrue(self.book.apply_update(106, asks=[["10.7", "1", "1"]]))
+
+    def test_gap_without_client(self):
+        """!
+        Test a gap without a client to resync from raises.
+        """
+        book = cobinhood.OrderBook()
+        book.apply_snapshot(SNAPSHOT)
+        with self.assertRaises(cobinhood.ExceptionCobinhood):
+            book.apply_update(102)
+
+
+if __name__ == "__main__":
+    unittest.main()
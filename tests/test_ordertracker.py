@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood order tracker.
+"""
+
+from __future__ import print_function
+import threading
+import unittest
+import mock
+import cobinhood
+from cobinhood.ordertracker import CANCELLED, FILLED, NEW, PARTIALLY_FILLED
+from cobinhood.testing import success
+
+
+def order(order_id, filled="0", state="open"):
+    return {"id": order_id, "trading_pair": "BTC-USDT", "state": state,
+            "side": "bid", "type": "limit", "price": "5000", "size": "2",
+            "filled": filled, "timestamp": 1504459805123}
+
+
+class FakeClient(object):
+    """!
+    Client answering from a dict of open orders and a dict of closed ones.
+    """
+
+    def __init__(self):
+        self.open = {}
+        self.closed = {}
+        self.get_trades_order = mock.Mock(
+            return_value=success({"trades": [{"id": "t"}]}))
+        self.get_order = mock.Mock(side_effect=lambda order_id: success(
+            {"order": self.closed[order_id]}))
+        self.place_order = mock.Mock(return_value=success({}))
+
+    def iter_all_orders(self, limit, prefetch):
+        return iter(list(self.open.values()))
+
+
+class TestOrderTracker(unittest.TestCase):
+    """!
+    Unit tests for OrderTracker.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.now = [0.0]
+        self.client = FakeClient()
+        self.tracker = cobinhood.OrderTracker(
+            self.client, min_interval=1, max_interval=8, backoff=2,
+            timer=lambda: self.now[0])
+        self.events = []
+        self.tracker.subscribe(self.events.append)
+
+    def kinds(self, events):
+        return [(event.kind, event.order_id) for event in events]
+
+    def test_diff_events(self):
+        """!
+        Test only changes become events and trades are fetched only for
+        orders whose filled size changed.
+        """
+        self.client.open = {"a": order("a"), "b": order("b")}
+        self.assertEqual(self.kinds(self.tracker.poll()),
+                         [(NEW, "a"), (NEW, "b")])
+        self.assertEqual(self.tracker.poll(), [])
+        self.client.get_trades_order.assert_not_called()
+
+        self.client.open["a"] = order("a", "0.5")
+        events = self.tracker.poll()
+        self.assertEqual(self.kinds(events), [(PARTIALLY_FILLED, "a")])
+        self.assertEqual(events[0].previous["filled"], "0")
+        self.assertEqual(events[0].trades, [{"id": "t"}])
+        self.client.get_trades_order.assert_called_once_with("a")
+
+        self.client.closed = {"a": order("a", "2", "filled"),
+                              "b": order("b", "0", "cancelled")}
+        self.client.open = {}
+        events = self.tracker.poll()
+        self.assertEqual(sorted(self.kinds(events)),
+                         [(CANCELLED, "b"), (FILLED, "a")])
+        self.assertEqual(self.client.get_trades_order.call_count, 2)
+        self.assertEqual(self.tracker.orders, {})
+        self.assertEqual(len(self.events), 5)
+
+    def test_unresolved_order_kept(self):
+        """!
+        Test an order that left the list stays tracked until get_order
+        answers.
+        """
+        self.client.open = {"a": order("a")}
+        self.tracker.poll()
+        self.client.open = {}
+        self.client.get_order.side_effect = cobinhood.RetryableError("down")
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertIn("a", self.tracker.orders)
+        self.client.get_order.side_effect = None
+        self.client.get_order.return_value = success(
+            {"order": order("a", "0", "cancelled")})
+        self.assertEqual(self.kinds(self.tracker.poll()), [(CANCELLED, "a")])
+
+    def test_adaptive_interval(self):
+        """!
+        Test the interval grows while quiet and drops after a change or an
+        order call.
+        """
+        self.tracker.poll()
+        intervals = []
+        for _ in range(4):
+            self.now[0] += self.tracker.next_poll()
+            self.tracker.poll()
+            intervals.append(self.tracker.interval)
+        self.assertEqual(intervals, [4, 8, 8, 8])
+        self.tracker.place_order("BTC-USDT", "bid", "limit", "1", "1")
+        self.client.place_order.assert_called_once_with(
+            "BTC-USDT", "bid", "limit", "1", "1")
+        self.assertEqual(self.tracker.next_poll(), 1)
+        self.client.open = {"a": order("a")}
+        self.tracker.poll()
+        self.assertEqual(self.tracker.interval, 1)
+
+    def test_run(self):
+        """!
+        Test run polls until stopped.
+        """
+        tracker = cobinhood.OrderTracker(self.client, min_interval=0.01,
+                                         max_interval=0.02)
+        stop = threading.Event()
+        thread = threading.Thread(target=tracker.run, args=(stop,))
+        thread.start()
+        self.client.open = {"a": order("a")}
+        while "a" not in tracker.orders:
+            stop.wait(0.01)
+        stop.set()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(tracker.polls > 1)
+
+    def test_run_survives_failed_poll(self):
+        """!
+        Test a failing poll backs off to max_interval and the next one
+        recovers.
+        """
+        tracker = cobinhood.OrderTracker(self.client, min_interval=0.01,
+                                         max_interval=0.02)
+        failures = [cobinhood.RetryableError("Error: request_url is incorrect"),
+                    IOError("connection reset")]
+        iter_all_orders = self.client.iter_all_orders
+
+        def flaky(limit, prefetch):
+            if failures:
+                raise failures.pop(0)
+            return iter_all_orders(limit, prefetch)
+
+        self.client.iter_all_orders = flaky
+        self.client.open = {"a": order("a")}
+        stop = threading.Event()
+        thread = threading.Thread(target=tracker.run, args=(stop,))
+        thread.start()
+        while "a" not in tracker.orders and thread.is_alive():
+            stop.wait(0.01)
+        stop.set()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(tracker.errors, 2)
+        self.assertEqual(list(tracker.orders), ["a"])
+
+    def test_failing_callback_skipped(self):
+        """!
+        Test a callback raising does not stop the other callbacks, the
+        poll or the run loop.
+        """
+        def broken(event):
+            raise ValueError("bad callback")
+
+        tracker = cobinhood.OrderTracker(self.client, min_interval=0.01,
+                                         max_interval=0.02)
+        events = []
+        tracker.subscribe(broken)
+        tracker.subscribe(events.append)
+        self.client.open = {"a": order("a")}
+        stop = threading.Event()
+        thread = threading.Thread(target=tracker.run, args=(stop,))
+        with mock.patch("cobinhood.ordertracker.logger"):
+            thread.start()
+            while len(events) < 2 and thread.is_alive():
+                self.client.open = {"a": order("a"), "b": order("b")}
+                stop.wait(0.01)
+            stop.set()
+            thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.kinds(events), [(NEW, "a"), (NEW, "b")])
+        self.assertEqual(tracker.callback_errors, 2)
+        self.assertEqual(tracker.errors, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
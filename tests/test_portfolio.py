@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood portfolio valuation.
+"""
+
+from __future__ import print_function
+import unittest
+import mock
+import cobinhood
+from cobinhood.testing import payloads, success
+
+PAIRS = success({"trading_pairs": [
+    {"id": "BTC-USDT", "base_currency_id": "BTC", "quote_currency_id": "USDT"},
+    {"id": "ETH-BTC", "base_currency_id": "ETH", "quote_currency_id": "BTC"},
+    {"id": "ETH-USDT", "base_currency_id": "ETH", "quote_currency_id": "USDT"},
+    {"id": "COB-ETH", "base_currency_id": "COB", "quote_currency_id": "ETH"},
+]})
+
+STATS = success({
+    "BTC-USDT": {"id": "BTC-USDT", "last_price": "10000"},
+    "ETH-BTC": {"id": "ETH-BTC", "last_price": "0.1"},
+    "ETH-USDT": {"id": "ETH-USDT", "last_price": "1000"},
+})
+
+BALANCES = success({"balances": [
+    {"currency": "BTC", "type": "exchange", "total": "2"},
+    {"currency": "ETH", "type": "exchange", "total": "3"},
+    {"currency": "USDT", "type": "exchange", "total": "50"},
+    {"currency": "COB", "type": "exchange", "total": "1000"},
+]})
+
+
+class TestPortfolio(unittest.TestCase):
+    """!
+    Unit tests for Portfolio.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.portfolio = cobinhood.Portfolio(PAIRS)
+        self.portfolio.load_trading_statistics(STATS)
+        self.portfolio.load_balances(BALANCES)
+
+    def test_values(self):
+        """!
+        Test positions are valued along the shortest conversion path, and
+        USDT is pegged to USD.
+        """
+        self.assertEqual(self.portfolio.values("USD"),
+                         {"BTC": 20000.0, "ETH": 3000.0, "USDT": 50.0,
+                          "COB": None})
+        self.assertEqual(self.portfolio.total("USD"), 23050.0)
+        self.assertEqual(self.portfolio.unpriced("USD"), ["COB"])
+        self.assertAlmostEqual(self.portfolio.total("BTC"), 2.305)
+        self.assertEqual(self.portfolio.path("COB", "USD"),
+                         (("COB-ETH", False), ("ETH-USDT", False),
+                          ("USDT-USD", False)))
+        self.assertEqual(self.portfolio.path("USDT", "BTC"),
+                         (("BTC-USDT", True),))
+        self.assertIsNone(self.portfolio.path("XYZ", "USD"))
+
+    def test_price_revalues_dependents_only(self):
+        """!
+        Test a price change revalues only the positions converted through
+        it, and an unchanged price none.
+        """
+        revaluations = self.portfolio.revaluations
+        self.assertEqual(self.portfolio.set_price("COB-ETH", "0.01"), 2)
+        self.assertEqual(self.portfolio.revaluations - revaluations, 2)
+        self.assertAlmostEqual(self.portfolio.value("COB", "USD"), 10000.0)
+        self.assertAlmostEqual(self.portfolio.total("USD"), 33050.0)
+        # In USD every position avoids ETH-BTC; in BTC, ETH and COB use it.
+        self.assertEqual(self.portfolio.set_price("ETH-BTC", "0.2"), 2)
+        self.assertEqual(self.portfolio.set_price("ETH-BTC", "0.2"), 0)
+        self.assertAlmostEqual(self.portfolio.total("USD"), 33050.0)
+        self.assertAlmostEqual(self.portfolio.value("ETH", "BTC"), 0.6)
+
+    def test_balances(self):
+        """!
+        Test balance changes revalue their position, and currencies left out
+        of a balances snapshot are dropped.
+        """
+        self.portfolio.set_balance("BTC", "1")
+        self.assertEqual(self.portfolio.total("USD"), 13050.0)
+        self.portfolio.load_balances(success({"balances": [
+            {"currency": "ETH", "type": "exchange", "total": "1"},
+            {"currency": "ETH", "type": "margin", "total": "1"}]}))
+        self.assertEqual(self.portfolio.values("USD"), {"ETH": 2000.0})
+        self.assertEqual(self.portfolio.total("USD"), 2000.0)
+        self.assertEqual(self.portfolio.value("BTC", "USD"), 0.0)
+        self.assertEqual(self.portfolio.set_price("BTC-USDT", "20000"), 0)
+
+    def test_any_target(self):
+        """!
+        Test any currency can be added as a target after loading.
+        """
+        self.assertEqual(self.portfolio.values("ETH")["BTC"], 20.0)
+        self.portfolio.load_ticker(success({"ticker": {
+            "trading_pair_id": "BTC-USDT", "last_trade_price": "5000"}}))
+        self.assertEqual(self.portfolio.value("BTC", "USD"), 10000.0)
+        self.assertEqual(self.portfolio.value("BTC", "ETH"), 20.0)
+        self.portfolio.set_price("ETH-BTC", "0.05")
+        self.assertEqual(self.portfolio.value("BTC", "ETH"), 40.0)
+
+    def test_refresh(self):
+        """!
+        Test refresh loads statistics and balances with a client.
+        """
+        client = mock.Mock()
+        client.get_trading_statistics.return_value = payloads.stats()
+        client.get_wallet_balances.return_value = payloads.balances()
+        portfolio = cobinhood.Portfolio(payloads.trading_pairs())
+        portfolio.refresh(client)
+        self.assertEqual(len(portfolio.balances), 20)
+        self.assertEqual(portfolio.unpriced("BTC"), [])
+        self.assertAlmostEqual(portfolio.total("BTC"), sum(
+            value for value in portfolio.values("BTC").values()))
+
+    def test_totals_do_not_drift(self):
+        """!
+        Test totals stay exact over many price changes of very different
+        magnitudes.
+        """
+        for index in range(1000):
+            self.portfolio.set_price("BTC-USDT", 1e20 if index % 2 else 0.1)
+            self.portfolio.total("USD")
+        self.portfolio.set_price("BTC-USDT", "10000")
+        self.assertEqual(self.portfolio.total("USD"), 23050.0)
+
+    def test_missing_price_skipped(self):
+        """!
+        Test statistics without the price field leave the price unset.
+        """
+        portfolio = cobinhood.Portfolio(PAIRS)
+        portfolio.load_trading_statistics(success({
+            "BTC-USDT": {"id": "BTC-USDT"},
+            "ETH-USDT": {"id": "ETH-USDT", "last_price": "1000"}}))
+        self.assertEqual(sorted(portfolio.prices),
+                         ["ETH-USDT", "USDT-USD"])
+
+    def test_failed_response(self):
+        """!
+        Test a failed response raises instead of emptying the portfolio.
+        """
+        self.assertRaises(cobinhood.ExceptionCobinhood,
+                          self.portfolio.load_trading_statistics,
+                          {"success": False, "error": {"error_code": "x"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood rate limiter and priority scheduler.
+"""
+
+from __future__ import print_function
+import threading
+import time
+import unittest
+import cobinhood
+from cobinhood import ratelimit
+from cobinhood.testing import FakeTimer
+
+
+class TestTokenBucket(unittest.TestCase):
+    """!
+    Unit tests for TokenBucket.
+    """
+
+    def test_refill(self):
+        """!
+        Test the burst is available at once and refills at the rate.
+        """
+        timer = FakeTimer()
+        bucket = ratelimit.TokenBucket(rate=2, capacity=2, timer=timer)
+        for _ in range(2):
+            self.assertEqual(bucket.wait_time(), 0)
+            bucket.take()
+        self.assertAlmostEqual(bucket.wait_time(), 0.5)
+        timer.now = 0.5
+        self.assertEqual(bucket.wait_time(), 0)
+        timer.now = 100
+        bucket.wait_time()
+        self.assertEqual(bucket.tokens, 2)
+
+
+class TestPriorityScheduler(unittest.TestCase):
+    """!
+    Unit tests for PriorityScheduler.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.served = []
+        self.lock = threading.Lock()
+
+        def perform(request_url, auth_token, request_type):
+            with self.lock:
+                self.served.append(request_type)
+            return {"success": True}
+
+        self.perform = perform
+
+    def test_endpoint_group(self):
+        """!
+        Test requests are classified by path and method.
+        """
+        base = "https://api.cobinhood.com/v1/"
+        self.assertEqual(ratelimit.endpoint_group(base + "trading/orders?", "post"),
+                         ratelimit.TRADING)
+        self.assertEqual(ratelimit.endpoint_group(base + "trading/orders/1?", "get"),
+                         ratelimit.TRADING)
+        self.assertEqual(ratelimit.endpoint_group(base + "trading/order_history?", "get"),
+                         ratelimit.ACCOUNT)
+        self.assertEqual(ratelimit.endpoint_group(base + "trading/trades?", "get"),
+                         ratelimit.ACCOUNT)
+        self.assertEqual(ratelimit.endpoint_group(base + "trading/trades/1?", "get"),
+                         ratelimit.ACCOUNT)
+        self.assertEqual(ratelimit.endpoint_group(base + "market/tickers/A-B?", "get"),
+                         ratelimit.MARKET)
+        self.assertEqual(ratelimit.endpoint_group(base + "wallet/balances?", "get"),
+                         ratelimit.ACCOUNT)
+
+    def test_trading_jumps_queue(self):
+        """!
+        Test a trading call is served ahead of queued market data reads.
+        """
+        scheduler = ratelimit.PriorityScheduler(
+            self.perform, global_budget=(20, 1), max_wait={})
+        url = "https://api.cobinhood.com/v1/market/tickers/COB-USDT?"
+        threads = [threading.Thread(target=scheduler, args=(url, "", "get"))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.02)
+        start = time.time()
+        scheduler("https://api.cobinhood.com/v1/trading/orders?", "", "post")
+        latency = time.time() - start
+        for thread in threads:
+            thread.join()
+        self.assertTrue(self.served.index("post") <= 2)
+        self.assertTrue(latency < 0.15)
+
+    def test_deadline_drops_reads(self):
+        """!
+        Test market reads queued past their deadline are dropped.
+        """
+        scheduler = ratelimit.PriorityScheduler(
+            self.perform, global_budget=(1, 1),
+            max_wait={ratelimit.MARKET: 0.05})
+        cob = cobinhood.Cobinhood(perform=scheduler)
+        cob.get_ticker("COB-USDT")
+        start = time.time()
+        with self.assertRaises(cobinhood.DeadlineExceeded):
+            cob.get_ticker("COB-USDT")
+        self.assertTrue(time.time() - start < 0.5)
+        self.assertEqual(scheduler.dropped, 1)
+        self.assertEqual(len(self.served), 1)
+        self.assertEqual(scheduler._waiters, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for Cobinhood traffic recording and replay.
+"""
+
+from __future__ import print_function
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+import cobinhood
+from cobinhood.replay import load_recording
+from cobinhood.testing import payloads
+
+
+class TestReplay(unittest.TestCase):
+    """!
+    Unit tests for RecordingTransport and ReplayTransport.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "session.jsonl.gz")
+
+    def tearDown(self):
+        """!
+        Remove the recording.
+        """
+        shutil.rmtree(self.directory)
+
+    def record(self, perform, calls):
+        recorder = cobinhood.RecordingTransport(perform, self.path)
+        with cobinhood.Cobinhood(api_key="secret", perform=recorder,
+                                 cache_ttls={}) as cob:
+            for call in calls:
+                try:
+                    call(cob)
+                except cobinhood.ExceptionCobinhood:
+                    pass
+        return recorder
+
+    def test_roundtrip(self):
+        """!
+        Test replayed calls get the recorded responses in order, and the api
+        key is not recorded.
+        """
+        first = payloads.success({"ticker": {"last_trade_price": "1"}})
+        second = payloads.success({"ticker": {"last_trade_price": "2"}})
+        perform = mock.Mock(side_effect=[first, second, payloads.trades(3)])
+        recorder = self.record(perform, [
+            lambda cob: cob.get_ticker("BTC-USDT"),
+            lambda cob: cob.get_ticker("BTC-USDT"),
+            lambda cob: cob.get_recent_trades("BTC-USDT", 3)])
+        self.assertEqual(recorder.calls, 3)
+        with open(self.path, "rb") as stream:
+            self.assertNotIn(b"secret", stream.read())
+
+        replay = cobinhood.ReplayTransport(self.path)
+        cob = cobinhood.Cobinhood(perform=replay, cache_ttls={})
+        self.assertEqual(cob.get_recent_trades("BTC-USDT", 3),
+                         payloads.trades(3))
+        self.assertEqual(cob.get_ticker("BTC-USDT"), first)
+        self.assertEqual(cob.get_ticker("BTC-USDT"), second)
+        self.assertEqual(cob.get_ticker("BTC-USDT"), first)
+        replay.rewind()
+        cob.get_ticker("BTC-USDT")
+        self.assertEqual(cob.get_ticker("BTC-USDT"), second)
+
+    def test_errors(self):
+        """!
+        Test recorded errors are replayed with their classification, and
+        unrecorded calls fail.
+        """
+        perform = mock.Mock(side_effect=[IOError("reset"), ValueError("bad")])
+        self.record(perform, [lambda cob: cob.get_ticker("BTC-USDT"),
+                              lambda cob: cob.get_order_book("BTC-USDT")])
+        replay = cobinhood.ReplayTransport(self.path)
+        cob = cobinhood.Cobinhood(perform=replay, cache_ttls={})
+        self.assertRaises(cobinhood.RetryableError, cob.get_ticker, "BTC-USDT")
+        self.assertRaises(cobinhood.FatalError, cob.get_order_book, "BTC-USDT")
+        self.assertRaises(cobinhood.ExceptionCobinhood, cob.get_candles,
+                          "BTC-USDT")
+        self.assertEqual((replay.calls, replay.misses), (3, 1))
+
+    def test_error_class(self):
+        """!
+        Test recorded errors are raised again with their own class.
+        """
+        perform = mock.Mock(side_effect=cobinhood.DeadlineExceeded(
+            "Error: request deadline exceeded"))
+        self.record(perform, [lambda cob: cob.get_ticker("BTC-USDT")])
+        self.assertEqual(load_recording(self.path)[0]["error"]["type"],
+                         "cobinhood.exceptions.DeadlineExceeded")
+        cob = cobinhood.Cobinhood(perform=cobinhood.ReplayTransport(self.path),
+                                  cache_ttls={})
+        self.assertRaises(cobinhood.DeadlineExceeded, cob.get_ticker,
+                          "BTC-USDT")
+
+    def test_unclosed_recording(self):
+        """!
+        Test a recording cut short is readable up to its last call, and a
+        closed recording refuses more calls.
+        """
+        recorder = cobinhood.RecordingTransport(
+            mock.Mock(return_value=payloads.success({})), self.path)
+        recorder("url", "", "get")
+        recorder("url", "", "get")
+        copy = os.path.join(self.directory, "crashed.jsonl.gz")
+        shutil.copy(self.path, copy)
+        with open(copy, "ab") as stream:
+            stream.write(b"\x00\x01")
+        self.assertEqual(len(load_recording(copy)), 2)
+        recorder.close()
+        self.assertRaises(ValueError, recorder, "url", "", "get")
+        self.assertRaises(ValueError, recorder._write, {})
+
+    def test_payload(self):
+        """!
+        Test payloads are recorded and part of the replay lookup.
+        """
+        perform = mock.Mock(side_effect=lambda *args: payloads.success(
+            {"order": {"price": args[3]["price"]}}))
+        order = ("BTC-USDT", "bid", "limit", "1", "1")
+        self.record(perform, [lambda cob: cob.place_order(*order),
+                              lambda cob: cob.place_order(*order[:3] +
+                                                          ("2", "1"))])
+        cob = cobinhood.Cobinhood(perform=cobinhood.ReplayTransport(self.path))
+        response = cob.place_order(*order[:3] + ("2", "1"))
+        self.assertEqual(response["result"]["order"]["price"], "2")
+
+    def test_raw_bytes(self):
+        """!
+        Test undecoded bodies are recorded and replayed as bytes.
+        """
+        self.record(mock.Mock(return_value=b"\x00{}"),
+                    [lambda cob: cob.get_system_time()])
+        cob = cobinhood.Cobinhood(perform=cobinhood.ReplayTransport(self.path))
+        self.assertEqual(cob.get_system_time(), b"\x00{}")
+
+    def test_timing(self):
+        """!
+        Test recorded latency is reproduced divided by speed, or skipped.
+        """
+        ticks = iter([0.0, 1.0, 3.0])
+        recorder = cobinhood.RecordingTransport(
+            mock.Mock(return_value=payloads.success({})), self.path,
+            timer=lambda: next(ticks))
+        recorder("url", "", "get")
+        recorder.close()
+        self.assertEqual(load_recording(self.path)[0]["duration"], 2.0)
+        sleep = mock.Mock()
+        cobinhood.ReplayTransport(self.path, speed=100, sleep=sleep)(
+            "url", "", "get")
+        sleep.assert_called_once_with(0.02)
+        sleep = mock.Mock()
+        cobinhood.ReplayTransport(self.path, sleep=sleep)("url", "", "get")
+        sleep.assert_not_called()
+
+    def test_not_a_recording(self):
+        """!
+        Test files without the recording header are rejected.
+        """
+        with gzip.open(self.path, "wb") as stream:
+            stream.write(b'{"format": "other"}\n')
+        self.assertRaises(cobinhood.ExceptionCobinhood,
+                          cobinhood.ReplayTransport, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood candle resampler.
+"""
+
+from __future__ import print_function
+import random
+import unittest
+from cobinhood.resample import CandleResampler, FIVE_MINUTES, ONE_HOUR
+from cobinhood.testing import payloads
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TIMEFRAMES = (FIVE_MINUTES, ONE_HOUR)
+
+
+def reference(candles, timeframe):
+    """!
+    Aggregate candles with a plain loop.
+    """
+    bars = {}
+    for candle in sorted(candles, key=lambda candle: candle["timestamp"]):
+        start = candle["timestamp"] - candle["timestamp"] % timeframe
+        values = [float(candle[name]) for name in
+                  ("open", "high", "low", "close", "volume")]
+        bar = bars.get(start)
+        if bar is None:
+            bars[start] = values
+        else:
+            bar[1] = max(bar[1], values[1])
+            bar[2] = min(bar[2], values[2])
+            bar[3] = values[3]
+            bar[4] += values[4]
+    return [tuple([start] + bars[start]) for start in sorted(bars)]
+
+
+def rows(array):
+    return [tuple(row) for row in array.tolist()]
+
+
+def candle(timestamp, open_, high, low, close, volume):
+    return {"timestamp": timestamp, "open": str(open_), "high": str(high),
+            "low": str(low), "close": str(close), "volume": str(volume)}
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestCandleResampler(unittest.TestCase):
+    """!
+    Unit tests for CandleResampler.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.candles = payloads.candles(600)["result"]["candles"]
+        self.resampler = CandleResampler(TIMEFRAMES)
+
+    def assertBars(self, resampler, candles):
+        for timeframe in TIMEFRAMES:
+            expected = reference(candles, timeframe)
+            actual = rows(resampler.bars(timeframe))
+            self.assertEqual(len(actual), len(expected))
+            for bar, row in zip(actual, expected):
+                self.assertEqual(bar[0], row[0])
+                for value, other in zip(bar[1:], row[1:]):
+                    self.assertAlmostEqual(value, other)
+
+    def test_update(self):
+        """!
+        Test candles merged one by one match a full aggregation.
+        """
+        for row in self.candles:
+            self.assertTrue(self.resampler.update(row))
+        self.assertBars(self.resampler, self.candles)
+        latest = self.resampler.latest(ONE_HOUR)
+        self.assertEqual(latest["close"], float(self.candles[-1]["close"]))
+        self.assertEqual(latest["timestamp"],
+                         reference(self.candles, ONE_HOUR)[-1][0])
+
+    def test_out_of_order(self):
+        """!
+        Test recent candles arriving out of order give the same bars.
+        """
+        late = self.candles[-60:]
+        random.Random(5).shuffle(late)
+        for row in self.candles[:-60] + late:
+            self.resampler.update(row)
+        self.assertEqual(self.resampler.stale, 0)
+        self.assertBars(self.resampler, self.candles)
+
+    def test_revisions(self):
+        """!
+        Test the open candle sent again as it changes is not counted twice,
+        and a revision narrowing its range rebuilds the bar.
+        """
+        start = 1520290800000
+        self.resampler.update(candle(start, 10, 12, 9, 11, 1))
+        self.resampler.update(candle(start + 60000, 11, 13, 10, 12, 1))
+        self.resampler.update(candle(start + 60000, 11, 14, 10, 13, 2))
+        bar = self.resampler.latest(FIVE_MINUTES)
+        self.assertEqual((bar["high"], bar["close"], bar["volume"]),
+                         (14.0, 13.0, 3.0))
+        self.assertEqual(self.resampler.rebuilds, 0)
+        self.resampler.update(candle(start + 60000, 11, 11.5, 10.5, 11, 2))
+        bar = self.resampler.latest(FIVE_MINUTES)
+        self.assertEqual((bar["high"], bar["low"], bar["close"]),
+                         (12.0, 9.0, 11.0))
+        self.assertEqual(bar["count"], 2)
+        self.assertEqual(self.resampler.rebuilds, len(TIMEFRAMES))
+
+    def test_stale(self):
+        """!
+        Test candles older than the previous bar of the largest timeframe
+        are dropped.
+        """
+        for row in self.candles:
+            self.resampler.update(row)
+        self.assertFalse(self.resampler.update(self.candles[0]))
+        self.assertEqual(self.resampler.stale, 1)
+        self.assertBars(self.resampler, self.candles)
+
+    def test_trades(self):
+        """!
+        Test trades in any order give bars opening and closing by timestamp.
+        """
+        trades = payloads.trades(600)["result"]["trades"]
+        self.resampler.add_trades(trades)
+        bar = self.resampler.latest(FIVE_MINUTES)
+        newest = [trade for trade in trades
+                  if trade["timestamp"] >= bar["timestamp"]]
+        self.assertEqual(bar["count"], len(newest))
+        self.assertEqual(bar["close"], float(newest[0]["price"]))
+        self.assertEqual(bar["open"], float(newest[-1]["price"]))
+        self.assertAlmostEqual(bar["volume"], sum(
+            float(trade["size"]) for trade in newest))
+
+    def test_keep(self):
+        """!
+        Test only the newest keep bars are kept.
+        """
+        resampler = CandleResampler(TIMEFRAMES, keep=3)
+        for row in self.candles:
+            resampler.update(row)
+        self.assertEqual(len(resampler._bars[FIVE_MINUTES]), 3)
+        self.assertEqual(resampler.latest(FIVE_MINUTES)["timestamp"],
+                         reference(self.candles, FIVE_MINUTES)[-1][0])
+
+    def test_timeframe_multiple_of_base(self):
+        """!
+        Test timeframes must be multiples of the base candle.
+        """
+        self.assertRaises(ValueError, CandleResampler, (90000,))
+
+    def test_backfill(self):
+        """!
+        Test a bulk backfill followed by updates and revisions matches a
+        full aggregation.
+        """
+        self.assertEqual(self.resampler.backfill(self.candles[:500]), 500)
+        for row in self.candles[500:]:
+            self.resampler.update(row)
+        self.assertEqual(self.resampler.backfill(self.candles[-10:]), 10)
+        self.assertBars(self.resampler, self.candles)
+
+    def test_gaps(self):
+        """!
+        Test gaps are left out, or filled flat at the previous close.
+        """
+        start = 1520290800000
+        self.resampler.backfill([candle(start, 10, 12, 9, 11, 1),
+                                 candle(start + 3 * FIVE_MINUTES,
+                                        11, 13, 10, 12, 1)])
+        self.assertEqual(len(self.resampler.bars(FIVE_MINUTES)), 2)
+        filled = rows(self.resampler.bars(FIVE_MINUTES, fill=True))
+        self.assertEqual(filled[1:3], [
+            (start + FIVE_MINUTES, 11.0, 11.0, 11.0, 11.0, 0.0),
+            (start + 2 * FIVE_MINUTES, 11.0, 11.0, 11.0, 11.0, 0.0)])
+        self.assertEqual(filled[3][0], start + 3 * FIVE_MINUTES)
+
+
+if __name__ == "__main__":
+    unittest.main()
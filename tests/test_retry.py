@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for Cobinhood retries and hedged requests.
+"""
+
+from __future__ import print_function
+import threading
+import time
+import unittest
+import mock
+import cobinhood
+from cobinhood.retry import is_retryable, is_retryable_response
+
+URL = "https://api.cobinhood.com/v1/market/tickers/COB-ETH?"
+
+BUSY = {"success": False, "error": {"error_code": "service_unavailable"}}
+
+OK = {"success": True, "result": {}}
+
+
+class TestClassification(unittest.TestCase):
+    """!
+    Unit tests for retryable and fatal error classification.
+    """
+
+    def test_exceptions(self):
+        """!
+        Test connection errors are retryable and bad input is fatal.
+        """
+        self.assertTrue(is_retryable(IOError("reset")))
+        self.assertTrue(is_retryable(cobinhood.RetryableError("busy")))
+        self.assertFalse(is_retryable(ValueError("bad json")))
+        self.assertFalse(is_retryable(cobinhood.FatalError("bad")))
+        self.assertFalse(is_retryable(cobinhood.DeadlineExceeded("late")))
+
+    def test_responses(self):
+        """!
+        Test only failure responses with a transient error_code are retryable.
+        """
+        self.assertTrue(is_retryable_response(BUSY))
+        self.assertFalse(is_retryable_response(OK))
+        self.assertFalse(is_retryable_response(
+            {"success": False, "error": {"error_code": "insufficient_balance"}}))
+        self.assertFalse(is_retryable_response(b"raw"))
+
+    def test_query_api_errors(self):
+        """!
+        Test _query_api raises RetryableError or FatalError by cause.
+        """
+        cause = IOError("connection reset")
+        cob = cobinhood.Cobinhood(perform=mock.Mock(side_effect=cause))
+        with self.assertRaises(cobinhood.RetryableError) as context:
+            cob.get_ticker("COB-ETH")
+        self.assertIn("connection reset", str(context.exception))
+        self.assertIs(context.exception.__cause__, cause)
+        cob = cobinhood.Cobinhood(perform=mock.Mock(side_effect=ValueError()))
+        self.assertRaises(cobinhood.FatalError, cob.get_ticker, "COB-ETH")
+
+    def test_delay(self):
+        """!
+        Test exponential backoff is capped and jittered.
+        """
+        policy = cobinhood.RetryPolicy(backoff=0.1, multiplier=2,
+                                       max_backoff=0.3, jitter=0.5)
+        self.assertAlmostEqual(policy.delay(0, lambda: 0), 0.1)
+        self.assertAlmostEqual(policy.delay(1, lambda: 0), 0.2)
+        self.assertAlmostEqual(policy.delay(5, lambda: 0), 0.3)
+        self.assertAlmostEqual(policy.delay(1, lambda: 1), 0.1)
+
+
+class TestRetryingTransport(unittest.TestCase):
+    """!
+    Unit tests for RetryingTransport.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.sleep = mock.Mock()
+
+    def transport(self, perform, **policy):
+        return cobinhood.RetryingTransport(
+            perform, cobinhood.RetryPolicy(**policy), sleep=self.sleep,
+            rand=lambda: 0)
+
+    def test_retry_until_success(self):
+        """!
+        Test transient failures are retried with growing waits.
+        """
+        perform = mock.Mock(side_effect=[IOError("reset"), BUSY, OK])
+        transport = self.transport(perform, backoff=0.1)
+        self.assertEqual(transport(URL, "", "get"), OK)
+        self.assertEqual(perform.call_count, 3)
+        self.assertEqual(transport.retries, 2)
+        self.assertEqual([args[0][0] for args in self.sleep.call_args_list],
+                         [0.1, 0.2])
+
+    def test_attempts_exhausted(self):
+        """!
+        Test the last failure is returned or raised after max_attempts.
+        """
+        transport = self.transport(mock.Mock(return_value=BUSY),
+                                   max_attempts=2)
+        self.assertEqual(transport(URL, "", "get"), BUSY)
+        transport = self.transport(mock.Mock(side_effect=IOError("reset")),
+                                   max_attempts=2)
+        self.assertRaises(IOError, transport, URL, "", "get")
+        self.assertEqual(transport.perform.call_count, 2)
+
+    def test_fatal_not_retried(self):
+        """!
+        Test fatal errors are raised at once.
+        """
+        perform = mock.Mock(side_effect=ValueError("bad json"))
+        transport = self.transport(perform)
+        self.assertRaises(ValueError, transport, URL, "", "get")
+        self.assertEqual(perform.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_non_idempotent_not_retried(self):
+        """!
+        Test order placement, modification and cancellation are never
+        repeated.
+        """
+        perform = mock.Mock(side_effect=IOError("reset"))
+        cob = cobinhood.Cobinhood(perform=self.transport(perform,
+                                                         hedge_after=0))
+        self.assertRaises(cobinhood.RetryableError, cob.cancel_order, "1")
+        self.assertRaises(cobinhood.RetryableError, cob.place_order,
+                          "COB-ETH", "bid", "limit", "1", "1")
+        self.assertRaises(cobinhood.RetryableError, cob.modify_order, "1", 1, 1)
+        self.assertEqual(perform.call_count, 3)
+
+    def test_hedge(self):
+        """!
+        Test a slow call is raced against a duplicate and the first answer
+        wins.
+        """
+        calls = []
+        lock = threading.Lock()
+
+        def perform(request_url, auth_token, request_type):
+            with lock:
+                calls.append(request_url)
+                first = len(calls) == 1
+            if first:
+                time.sleep(0.5)
+                return {"success": True, "result": "slow"}
+            return {"success": True, "result": "fast"}
+
+        transport = self.transport(perform, hedge_after=0.05)
+        start = time.time()
+        response = transport(URL, "", "get")
+        self.assertTrue(time.time() - start < 0.4)
+        self.assertEqual(response["result"], "fast")
+        self.assertEqual((transport.hedges, transport.hedge_wins), (1, 1))
+        transport.close()
+
+    def test_fast_call_not_hedged(self):
+        """!
+        Test calls answering before hedge_after are not duplicated.
+        """
+        perform = mock.Mock(return_value=OK)
+        transport = self.transport(perform, hedge_after=1.0)
+        self.assertEqual(transport(URL, "", "get"), OK)
+        self.assertEqual(perform.call_count, 1)
+        self.assertEqual(transport.hedges, 0)
+        transport.close()
+
+    def test_hedge_failure_retried(self):
+        """!
+        Test a hedged attempt that fails on both requests is retried.
+        """
+        perform = mock.Mock(side_effect=[IOError("reset"), OK])
+        transport = self.transport(perform, hedge_after=1.0)
+        self.assertEqual(transport(URL, "", "get"), OK)
+        self.assertEqual(transport.retries, 1)
+        transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
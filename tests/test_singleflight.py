@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for coalescing of identical in-flight Cobinhood calls.
+"""
+
+from __future__ import print_function
+import threading
+import time
+import unittest
+import cobinhood
+
+
+class SlowPerform(object):
+    """!
+    perform counting calls and answering after a delay.
+    """
+
+    def __init__(self, delay=0.1, exception=None):
+        self.delay = delay
+        self.exception = exception
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, request_url, auth_token, request_type):
+        with self.lock:
+            self.urls.append(request_url)
+        time.sleep(self.delay)
+        if self.exception is not None:
+            raise self.exception
+        return {"success": True, "result": {"url": request_url}}
+
+
+def call_concurrently(function, count):
+    """!
+    Call a function from count threads at once.
+
+    @return: list of (response, exception) per thread.
+    """
+    outcomes = [None] * count
+    barrier = threading.Barrier(count) if hasattr(threading, "Barrier") \
+        else None
+
+    def worker(index):
+        if barrier is not None:
+            barrier.wait()
+        try:
+            outcomes[index] = (function(), None)
+        except Exception as exception:
+            outcomes[index] = (None, exception)
+
+    threads = [threading.Thread(target=worker, args=(index,))
+               for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+class TestSingleFlight(unittest.TestCase):
+    """!
+    Unit tests for SingleFlight on the threaded client.
+    """
+
+    def test_disabled_by_default(self):
+        """!
+        Test identical calls are not coalesced unless asked for.
+        """
+        perform = SlowPerform(delay=0.05)
+        cob = cobinhood.Cobinhood(perform=perform)
+        call_concurrently(lambda: cob.get_ticker("BTC-USDT"), 4)
+        self.assertEqual(len(perform.urls), 4)
+
+    def test_identical_calls_share_request(self):
+        """!
+        Test concurrent identical GETs send one request and share its result.
+        """
+        perform = SlowPerform()
+        cob = cobinhood.Cobinhood(perform=perform, singleflight=True)
+        outcomes = call_concurrently(lambda: cob.get_ticker("BTC-USDT"), 8)
+        self.assertEqual(len(perform.urls), 1)
+        responses = [response for response, _ in outcomes]
+        self.assertTrue(all(response is responses[0] for response in responses))
+        self.assertEqual(cob.singleflight.stats(),
+                         {"requests": 1, "saved": 7, "in_flight": 0})
+
+    def test_different_calls_not_shared(self):
+        """!
+        Test calls for different urls or request types are not coalesced.
+        """
+        perform = SlowPerform()
+        cob = cobinhood.Cobinhood(perform=perform, singleflight=True)
+        calls = [lambda: cob.get_order_book("BTC-USDT", 50),
+                 lambda: cob.get_order_book("BTC-USDT", 10),
+                 lambda: cob.cancel_order("1"),
+                 lambda: cob.cancel_order("1")]
+        threads = [threading.Thread(target=call) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(perform.urls), 4)
+        self.assertEqual(cob.singleflight.stats()["saved"], 0)
+
+    def test_public_calls_shared_between_keys(self):
+        """!
+        Test clients with different api keys share public calls only.
+        """
+        perform = SlowPerform()
+        flight = cobinhood.SingleFlight()
+        clients = [cobinhood.Cobinhood(api_key=key, perform=perform,
+                                       singleflight=flight)
+                   for key in ("key1", "key2")]
+        threads = [threading.Thread(target=call) for cob in clients
+                   for call in (lambda cob=cob: cob.get_ticker("BTC-USDT"),
+                                lambda cob=cob: cob.get_order("1"))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum("tickers" in url for url in perform.urls), 1)
+        self.assertEqual(sum("orders" in url for url in perform.urls), 2)
+
+    def test_exception_shared(self):
+        """!
+        Test waiting callers receive the failure of the shared request.
+        """
+        perform = SlowPerform(exception=IOError("reset"))
+        cob = cobinhood.Cobinhood(perform=perform, singleflight=True)
+        outcomes = call_concurrently(lambda: cob.get_ticker("BTC-USDT"), 4)
+        self.assertEqual(len(perform.urls), 1)
+        for _, exception in outcomes:
+            self.assertTrue(isinstance(exception, cobinhood.ExceptionCobinhood))
+
+    def test_sequential_calls_not_shared(self):
+        """!
+        Test a finished request is not reused by later calls.
+        """
+        perform = SlowPerform(delay=0)
+        cob = cobinhood.Cobinhood(perform=perform, singleflight=True)
+        cob.get_ticker("BTC-USDT")
+        cob.get_ticker("BTC-USDT")
+        self.assertEqual(len(perform.urls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
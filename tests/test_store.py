@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood disk-backed market store.
+"""
+
+from __future__ import print_function
+import shutil
+import tempfile
+import unittest
+import cobinhood
+from cobinhood import store
+from cobinhood.testing import payloads
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def trade(identifier, timestamp, price="10", pair="BTC-USDT"):
+    return {"id": identifier, "trading_pair_id": pair, "price": price,
+            "size": "1", "maker_side": "bid", "timestamp": timestamp}
+
+
+class FakeApi(object):
+    """!
+    perform callable answering trades, candles and trade history from lists.
+    """
+
+    def __init__(self):
+        self.trades = []
+        self.candles = []
+        self.history = []
+        self.urls = []
+
+    def __call__(self, request_url, auth_token, request_type):
+        self.urls.append(request_url)
+        if "/market/trades/" in request_url:
+            return payloads.success({"trades": self.trades})
+        if "/chart/candles/" in request_url:
+            return payloads.success({"candles": self.candles})
+        return payloads.success({"trades": self.history})
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestMarketStore(unittest.TestCase):
+    """!
+    Unit tests for MarketStore.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.root = tempfile.mkdtemp()
+        self.api = FakeApi()
+        self.client = cobinhood.Cobinhood(perform=self.api, cache_ttls={})
+        self.store = cobinhood.MarketStore(self.root, self.client,
+                                           trades_limit=3)
+
+    def tearDown(self):
+        """!
+        Remove the store directory.
+        """
+        shutil.rmtree(self.root)
+
+    def test_trades_incremental(self):
+        """!
+        Test only trades newer than the last sync are appended, oldest
+        first, including new trades sharing the last timestamp.
+        """
+        self.api.trades = [trade("c", 3), trade("b", 2), trade("a", 1)]
+        self.assertEqual(self.store.sync("BTC-USDT", (store.TRADES,)),
+                         {"trades": 3})
+        self.api.trades = [trade("e", 4), trade("d", 3), trade("c", 3)]
+        self.assertEqual(self.store.sync("BTC-USDT", (store.TRADES,)),
+                         {"trades": 2})
+        self.assertEqual(self.store.sync("BTC-USDT", (store.TRADES,)),
+                         {"trades": 0})
+        trades = self.store.trades("BTC-USDT")
+        self.assertEqual(list(trades["timestamp"]), [1, 2, 3, 3, 4])
+        meta = self.store.meta("BTC-USDT")["trades"]
+        self.assertEqual((meta["count"], meta["last_timestamp"],
+                          meta["last_ids"], meta["gaps"]), (5, 4, ["e"], 0))
+
+    def test_trades_gap(self):
+        """!
+        Test a sync finding every recent trade new is counted as a gap.
+        """
+        self.api.trades = [trade("a", 1)]
+        self.store.sync("BTC-USDT", (store.TRADES,))
+        self.api.trades = [trade("d", 4), trade("c", 3), trade("b", 2)]
+        self.store.sync("BTC-USDT", (store.TRADES,))
+        self.assertEqual(self.store.meta("BTC-USDT")["trades"]["gaps"], 1)
+
+    def test_candles_closed_only(self):
+        """!
+        Test the candle still forming is not appended until a newer one
+        exists.
+        """
+        rows = payloads.candles(5)["result"]["candles"]
+        self.api.candles = rows[:3]
+        self.assertEqual(self.store.sync("BTC-USDT", (store.CANDLES,)),
+                         {"candles": 2})
+        self.api.candles = rows
+        self.assertEqual(self.store.sync("BTC-USDT", (store.CANDLES,)),
+                         {"candles": 2})
+        candles = self.store.candles("BTC-USDT")
+        self.assertEqual(list(candles["timestamp"]),
+                         [row["timestamp"] for row in rows[:4]])
+        self.assertEqual(candles["close"][3], float(rows[3]["close"]))
+
+    def test_own_trades(self):
+        """!
+        Test own trades of the pair are read from the history until the last
+        synced one.
+        """
+        self.api.history = [trade("b", 2), trade("x", 2, pair="ETH-USDT"),
+                            trade("a", 1)]
+        self.assertEqual(self.store.sync("BTC-USDT", (store.OWN_TRADES,)),
+                         {"own_trades": 2})
+        self.api.history = [trade("c", 3)] + self.api.history
+        self.assertEqual(self.store.sync("BTC-USDT", (store.OWN_TRADES,)),
+                         {"own_trades": 1})
+        self.assertEqual(list(self.store.own_trades("BTC-USDT")["timestamp"]),
+                         [1, 2, 3])
+
+    def test_reader_is_zero_copy(self):
+        """!
+        Test readers get read-only memory maps and an empty array before the
+        first sync.
+        """
+        self.assertEqual(len(self.store.trades("BTC-USDT")), 0)
+        self.api.trades = [trade("a", 1, "11.5")]
+        self.store.sync("BTC-USDT", (store.TRADES,))
+        trades = self.store.trades("BTC-USDT")
+        self.assertIsInstance(trades, numpy.memmap)
+        self.assertFalse(trades.flags.writeable)
+        self.assertEqual(trades["price"][0], 11.5)
+
+    def test_uncommitted_records_dropped(self):
+        """!
+        Test records written past the committed count are discarded by the
+        next sync.
+        """
+        self.api.trades = [trade("a", 1)]
+        self.store.sync("BTC-USDT", (store.TRADES,))
+        with open(self.store._path("BTC-USDT", "trades.dat"), "ab") as stream:
+            stream.write(b"\0" * 7)
+        self.api.trades = [trade("b", 2)]
+        self.store.sync("BTC-USDT", (store.TRADES,))
+        self.assertEqual(list(self.store.trades("BTC-USDT")["timestamp"]),
+                         [1, 2])
+
+    def test_reopen(self):
+        """!
+        Test a new store over the same directory resumes from the last sync.
+        """
+        self.api.trades = [trade("a", 1)]
+        self.store.sync("BTC-USDT", (store.TRADES,))
+        reopened = cobinhood.MarketStore(self.root, self.client)
+        self.assertEqual(reopened.sync("BTC-USDT", (store.TRADES,)),
+                         {"trades": 0})
+        self.assertEqual(len(reopened.trades("BTC-USDT")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
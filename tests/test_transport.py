@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""!
+ Unit Tests for the Cobinhood http transport.
+"""
+
+from __future__ import print_function
+import json
+import unittest
+import requests
+import cobinhood
+from cobinhood.testing import MockCobinhoodServer, payloads
+
+
+class TestHTTPTransport(unittest.TestCase):
+    """!
+    Unit tests for the pooled keep-alive HTTPTransport.
+    """
+
+    def setUp(self):
+        """!
+        Initial setUp function for testcases.
+        """
+        self.server = MockCobinhoodServer().start()
+        self.transport = cobinhood.HTTPTransport()
+
+    def tearDown(self):
+        """!
+        Close the transport and stop the stand-in server.
+        """
+        self.transport.close()
+        self.server.stop()
+
+    def test_call(self):
+        """!
+        Test a call returns the decoded json response.
+        """
+        response = self.transport(self.server.url + "/v1/system/time", "", "get")
+        self.assertEqual(response["result"]["time"], 1520288666216)
+
+    def test_payload(self):
+        """!
+        Test a payload is sent as the json body over the pooled connection.
+        """
+        url = self.server.url + "/v1/system/time"
+        self.transport(url, "", "post", {"side": "bid", "size": "1"})
+        self.assertEqual(json.loads(self.server.last_body.decode("utf-8")),
+                         {"side": "bid", "size": "1"})
+        self.transport(url, "", "get")
+        self.assertEqual(self.server.connection_count, 1)
+
+    def test_connection_reuse(self):
+        """!
+        Test sequential calls share a single connection.
+        """
+        for _ in range(5):
+            self.transport(self.server.url + "/v1/system/time", "", "get")
+        self.assertEqual(self.server.request_count, 5)
+        self.assertEqual(self.server.connection_count, 1)
+
+    def test_no_keep_alive(self):
+        """!
+        Test keep_alive=False opens a connection per call.
+        """
+        with cobinhood.HTTPTransport(keep_alive=False) as transport:
+            for _ in range(3):
+                transport(self.server.url + "/v1/system/time", "", "get")
+        self.assertEqual(self.server.connection_count, 3)
+
+    def test_read_timeout(self):
+        """!
+        Test a slow server trips the read timeout.
+        """
+        self.server.latency = 0.5
+        transport = cobinhood.HTTPTransport(read_timeout=0.05)
+        with self.assertRaises(requests.exceptions.Timeout):
+            transport(self.server.url + "/v1/system/time", "", "get")
+        transport.close()
+
+    def test_invalid_request_type(self):
+        """!
+        Test an unknown request type is rejected before any request is made.
+        """
+        with self.assertRaises(cobinhood.ExceptionCobinhood):
+            self.transport(self.server.url + "/v1/system/time", "", "abcd")
+        self.assertEqual(self.server.request_count, 0)
+
+    def test_gateway_errors_retryable(self):
+        """!
+        Test a 5xx or 429 page from a gateway raises RetryableError and is
+        retried, while the api's own json errors are returned.
+        """
+        self.server.routes["/v1/gateway"] = (502, b"<html>Bad Gateway</html>")
+        self.server.routes["/v1/busy"] = (429, b"")
+        self.server.routes["/v1/api_error"] = (503, {
+            "success": False, "error": {"error_code": "service_unavailable"}})
+        retrying = cobinhood.RetryingTransport(
+            self.transport, cobinhood.RetryPolicy(max_attempts=3),
+            sleep=lambda seconds: None)
+        with self.assertRaises(cobinhood.RetryableError):
+            retrying(self.server.url + "/v1/gateway", "", "get")
+        self.assertEqual(self.server.request_count, 3)
+        with self.assertRaises(cobinhood.RetryableError):
+            self.transport(self.server.url + "/v1/busy", "", "get")
+        response = self.transport(self.server.url + "/v1/api_error", "", "get")
+        self.assertEqual(response["error"]["error_code"], "service_unavailable")
+
+    def test_raw_bytes(self):
+        """!
+        Test the raw bytes decoder returns the body undecoded.
+        """
+        transport = cobinhood.HTTPTransport(decoder=cobinhood.raw_bytes)
+        body = transport(self.server.url + "/v1/system/time", "", "get")
+        transport.close()
+        self.assertEqual(json.loads(body.decode("utf-8"))["result"]["time"],
+                         1520288666216)
+
+    def test_cobinhood_decoder(self):
+        """!
+        Test Cobinhood passes its decoder to the default transport and does
+        not cache undecoded bodies.
+        """
+        cob = cobinhood.Cobinhood(
+            base_url=self.server.url + "/{version}/{fn_call}?",
+            decoder=cobinhood.raw_bytes)
+        self.assertTrue(isinstance(cob.get_system_info(), bytes))
+        cob.get_system_info()
+        cob.close()
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_cobinhood_default_perform(self):
+        """!
+        Test Cobinhood uses a pooled transport by default.
+        """
+        cob = cobinhood.Cobinhood(
+            base_url=self.server.url + "/{version}/{fn_call}?")
+        self.assertTrue(isinstance(cob.perform, cobinhood.HTTPTransport))
+        response = cob.get_system_info()
+        self.assertEqual(response["result"]["info"]["phase"], "production")
+
+
+class TestMockCobinhoodServer(unittest.TestCase):
+    """!
+    Unit tests for the routes served by MockCobinhoodServer.
+    """
+
+    def test_wildcard_route(self):
+        """!
+        Test a "*" segment matches exactly one path segment.
+        """
+        with MockCobinhoodServer({"/v1/market/tickers/*": {"ok": 1}}) as server:
+            self.assertEqual(server.body_for("/v1/market/tickers/BTC-USDT"),
+                             (200, b'{"ok": 1}'))
+            self.assertEqual(server.body_for("/v1/market/tickers/a/b")[0], 404)
+            self.assertEqual(server.body_for("/v1/market/tickers")[0], 404)
+
+    def test_api_routes(self):
+        """!
+        Test the benchmark routes answer every Cobinhood endpoint.
+        """
+        with MockCobinhoodServer(payloads.api_routes()) as server:
+            cob = cobinhood.Cobinhood(
+                base_url=server.url + "/{version}/{fn_call}?", cache_ttls={})
+            for response in (cob.get_ticker("ETH-BTC"),
+                             cob.get_trades_order("order"),
+                             cob.get_order("order"),
+                             cob.get_all_deposits(),
+                             cob.get_deposit("deposit")):
+                self.assertTrue(response["success"])
+            self.assertEqual(len(cob.get_candles("ETH-BTC")["result"]
+                                 ["candles"]), 500)
+            cob.close()
+
+
+if __name__ == "__main__":
+    unittest.main()